@@ -0,0 +1,179 @@
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from core_classes import Game
+from event_pool import event_pools
+from game_store import NullGameStore
+
+
+class RunnerBusy(Exception):
+    """Raised when the rounds queue is full and the caller asked not to wait"""
+    pass
+
+
+# Function executed in the worker processes
+# The round is played on a detached copy of the game: events (or the path of the events file, loaded once per worker
+# through the events pool registry), roster, seed and round number are sent to the worker, the rendered events, the
+# indexes of the tributes hit during the round, the round params and the new roster buffers are sent back
+def _simulate_round(events_source, events, roster, minimum_events: int, max_events: int, engine: str, seed: int,
+                    round_number: int):
+    game = Game(store=NullGameStore(), seed=seed)
+    if events_source is not None:
+        pool = event_pools.get(events_source)
+        game._events, game._events_source, game._event_sampler = pool.events, events_source, pool.sampler
+    else:
+        game._events = events
+    game._players = roster
+    game._rebuild_alive_pool()
+    game._rounds_played = round_number
+    game._meta_pending = False
+
+    pulled_events = game._play_round(minimum_events, max_events, engine)
+    results = [
+        {"event": event["event"], "passive": [player.index for player in event["passive"]]}
+        for event in pulled_events
+    ]
+    game._batch_engine = None
+
+    return results, game._round_params, roster.hp, roster.alive
+
+
+class AsyncGameRunner:
+    """
+    Non-blocking game execution for the discord.py event loop
+    Game.execute_game() and Game.save_players_stats() are synchronous CPU and disk work, calling them from a command
+    handler stalls the whole bot (heartbeats included) while the round runs.
+
+    With the runner:
+    - rounds are simulated in a process pool (no GIL contention with the event loop)
+    - saves are written in a thread pool
+    - every game has its own lock, two commands can't run the same game at once (different games run in parallel)
+    - rounds wait in a bounded queue, when the queue is full run_round() waits for a free place (backpressure) or
+      raises RunnerBusy if called with wait=False
+
+    Usage:
+    runner = AsyncGameRunner()
+    await runner.start()
+    events = await runner.run_round(game)
+    await runner.close()
+    """
+
+    def __init__(self, max_queued: int = 32, concurrent_rounds: int = None, process_workers: int = None,
+                 io_workers: int = 4) -> None:
+        self._process_pool = ProcessPoolExecutor(max_workers=process_workers)
+        self._thread_pool = ThreadPoolExecutor(max_workers=io_workers, thread_name_prefix="game-io")
+        self._concurrent_rounds = concurrent_rounds or process_workers or os.cpu_count() or 1
+        self._max_queued = max_queued
+        self._queue = None
+        self._workers = []
+        self._locks = {}
+
+    @property
+    def queued(self):
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def start(self) -> None:
+        if self._queue is not None:
+            return
+        self._queue = asyncio.Queue(maxsize=self._max_queued)
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self._concurrent_rounds)]
+
+    # The rounds still waiting in the queue are cancelled, their run_round() calls raise asyncio.CancelledError
+    async def close(self) -> None:
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        if self._queue is not None:
+            while not self._queue.empty():
+                while not self._queue.empty():
+                    *_, future = self._queue.get_nowait()
+                    future.cancel()
+                # Every freed place lets a round blocked on a full queue in, they are cancelled by the next pass
+                await asyncio.sleep(0)
+        self._queue = None
+
+        # Shut down in a thread, waiting for the running jobs (saves included) must not block the event loop
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._process_pool.shutdown)
+        await loop.run_in_executor(None, self._thread_pool.shutdown)
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def _lock(self, game: Game) -> asyncio.Lock:
+        if game.id not in self._locks:
+            self._locks[game.id] = asyncio.Lock()
+        return self._locks[game.id]
+
+    async def run_round(self, game: Game, minimum_events: int = 8, max_events: int = 12, engine: str = "classic",
+                        wait: bool = True) -> list:
+        """
+        Plays and saves a round of the game without blocking the event loop
+        Returns the same list of rendered events returned by Game.execute_game()
+        """
+        await self.start()
+        future = asyncio.get_running_loop().create_future()
+        job = (game, minimum_events, max_events, engine, future)
+
+        if wait:
+            await self._queue.put(job)
+        else:
+            try:
+                self._queue.put_nowait(job)
+            except asyncio.QueueFull:
+                raise RunnerBusy(f"Too many rounds requested, {self._max_queued} rounds are already waiting")
+
+        return await future
+
+    async def _worker(self) -> None:
+        while True:
+            game, minimum_events, max_events, engine, future = await self._queue.get()
+            try:
+                if not future.cancelled():
+                    result = await self._execute(game, minimum_events, max_events, engine)
+                    if not future.cancelled():
+                        future.set_result(result)
+            except asyncio.CancelledError:
+                future.cancel()
+                raise
+            except Exception as error:
+                if not future.cancelled():
+                    future.set_exception(error)
+            finally:
+                self._queue.task_done()
+
+    async def _execute(self, game: Game, minimum_events: int, max_events: int, engine: str) -> list:
+        loop = asyncio.get_running_loop()
+
+        async with self._lock(game):
+            # Events loaded from a file are loaded by the workers themselves, the other ones are sent with the job
+            events = None if game._events_source is not None else tuple(game.events)
+            game._capture_meta()
+            results, params, hp, alive = await loop.run_in_executor(
+                self._process_pool, _simulate_round, game._events_source, events, game.players, minimum_events,
+                max_events, engine, game.seed, game.rounds_played
+            )
+
+            # Applying the round to the game, the worker roster has the same layout of the game roster
+            game._batch_engine = None
+            game.players.hp[:] = hp
+            game.players.alive[:] = alive
+            game._rebuild_alive_pool()
+            game._round_params = params
+            game._rounds_played += 1
+
+            pulled_events = [
+                {"event": event["event"], "passive": [game.players[index] for index in event["passive"]]}
+                for event in results
+            ]
+            for event in results:
+                game._dirty.update(event["passive"])
+            await loop.run_in_executor(self._thread_pool, game.save_players_stats, pulled_events)
+
+        return pulled_events
@@ -0,0 +1,225 @@
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from event_pack import EventPack
+from roster import TributeList
+
+# Smallest rounds (max events) played by the batch engine
+MIN_EVENTS = 500
+# Alive tributes needed for every event of a round played by the batch engine
+ALIVE_RATIO = 5
+
+
+class BatchEngine:
+    """
+    NumPy round engine for the Game class
+    This is the engine used by Game.execute_game(engine="batch"), made for tournament-sized arenas (10k+ tributes)
+
+    The tributes hp and alive status and the events probability, severity and slot counts are stored as NumPy arrays.
+    Every random number of a round is drawn in bulk:
+    - event picks:..............one uniform pick from the events pool for each draw of the round
+    - probability deciders:.....one decider for each draw, compared with the probability of the picked event
+    - participants:.............one alive tribute index for each slot of the executed events, all the events of a pass
+    ............................are drawn together (only the events with a duplicated tribute are drawn again)
+
+    The events of a round are resolved in passes: the participants of the pending events are drawn in bulk from the
+    alive tributes and the events are applied in order up to the first one with a tribute killed earlier in the pass,
+    the following events are drawn again in the next pass. As with the classic engine, a tribute killed by an event
+    never takes part in the following events of the round.
+
+    DIFFERENCES WITH THE CLASSIC ENGINE:
+    The random numbers are drawn differently, the two engines give different rounds with the same seed but have the
+    same statistical behaviour (check benchmarks/batch_engine_equivalence.py).
+    NumPy has a fixed cost for every call, the batch engine is faster only for big rounds in big arenas: the rounds
+    with less than MIN_EVENTS events or with less than ALIVE_RATIO alive tributes per event (every death starts a new
+    pass) are played by the classic engine, check suits(). The round params of the game record the engine that played
+    the round. A batch round is about 1.1 to 2.4 times faster than a classic one from 500 events and 2.5k tributes on
+    (rendering included, 1.4 to 1.5 times on the 60k tributes rounds of benchmarks/batch_engine_equivalence.py), while
+    the default 8-12 events rounds would be about 6 times slower.
+
+    The tributes arrays are zero-copy NumPy views of the TributeRoster buffers of the game (check roster.py), so the
+    damage is written straight into the roster. The killed tributes are removed from the alive pool of the game with a
+    single bulk swap-remove at the end of the round, and the participants are given back as lazy TributeList objects.
+    The Game class drops the engine whenever the roster or the events pool change outside the engine.
+    """
+
+    def __init__(self, game, seed: int = None) -> None:
+        if np is None:
+            raise ImportError("The batch engine requires NumPy, install it with: pip install numpy")
+
+        self._game = game
+        self._rng = np.random.default_rng(seed)
+
+        # Tributes arrays (views of the roster buffers)
+        self._players = game.players
+        self.hp = np.frombuffer(self._players.hp, dtype=np.float64)
+        self.alive = np.frombuffer(self._players.alive, dtype=np.bool_)
+
+        # Events arrays, read from the index of an events pack without decoding its events (check event_pack.py)
+        events = game.events
+        if isinstance(events, EventPack):
+            self._events = events
+            self.probability = np.frombuffer(events.probability, dtype=np.float64)
+            self.severity = np.frombuffer(events.severity, dtype=np.int32).astype(np.float64)
+            self.actives = np.frombuffer(events.actives, dtype=np.uint16).astype(np.int64)
+            self.passives = np.frombuffer(events.passives, dtype=np.uint16).astype(np.int64)
+        else:
+            self._events = list(events)
+            self.probability = np.array([event.probability for event in self._events], dtype=np.float64)
+            self.severity = np.array([event.severity for event in self._events], dtype=np.float64)
+            self.actives = np.array([event.template.actives for event in self._events], dtype=np.int64)
+            self.passives = np.array([event.template.passives for event in self._events], dtype=np.int64)
+        # As in the classic engine, the events without active or without passive tributes are never executed
+        self.playable = (self.actives > 0) & (self.passives > 0)
+
+    # True if a round is faster with the batch engine than with the classic one
+    @staticmethod
+    def suits(max_events: int, alive_count: int) -> bool:
+        return max_events >= MIN_EVENTS and max_events * ALIVE_RATIO <= alive_count
+
+    # The Game seeds the engine again at the start of every round
+    def reseed(self, seed: int) -> None:
+        self._rng = np.random.default_rng(seed)
+
+    # Internal function to draw distinct alive tributes for every event, all the events are drawn together
+    # slots -> tributes of every event; returns the drawn tributes (flat, event after event) and the event of every one
+    # Tributes are drawn with replacement and only the events with duplicates are drawn again
+    def _draw_participants(self, alive_index, slots):
+        rows = np.repeat(np.arange(len(slots)), slots)
+        picks = self._rng.integers(0, len(alive_index), size=len(rows))
+        while True:
+            order = np.lexsort((picks, rows))
+            ordered_rows, ordered_picks = rows[order], picks[order]
+            duplicated = (ordered_rows[1:] == ordered_rows[:-1]) & (ordered_picks[1:] == ordered_picks[:-1])
+            if not duplicated.any():
+                break
+            redraw = np.isin(rows, ordered_rows[1:][duplicated])
+            picks[redraw] = self._rng.integers(0, len(alive_index), size=int(np.count_nonzero(redraw)))
+        return alive_index[picks], rows
+
+    # Internal function to apply the events in order until an event has a tribute killed by an earlier event of the
+    # same pass, returns the number of events applied (at least one, the first event only has alive tributes) and the
+    # killed tributes
+    def _resolve(self, events, slots, tributes, rows):
+        # Position of every participant in its event, the passive ones come first
+        positions = np.arange(len(tributes)) - np.repeat(np.cumsum(slots) - slots, slots)
+        hit = positions < np.repeat(self.passives[events], slots)
+        hit_rows, hit_tributes = rows[hit], tributes[hit]
+        hit_damage = self.severity[events][hit_rows]
+
+        # Damage taken by every tribute up to every event that hits it -> event that kills it
+        order = np.lexsort((hit_rows, hit_tributes))
+        ordered_tributes, ordered_rows = hit_tributes[order], hit_rows[order]
+        taken = np.cumsum(hit_damage[order])
+        first_hits = np.flatnonzero(np.diff(ordered_tributes, prepend=-1))
+        taken -= np.repeat(taken[first_hits] - hit_damage[order][first_hits], np.diff(np.r_[first_hits, len(order)]))
+        dying = self.hp[ordered_tributes] - taken < 0
+        dead, first_death = np.unique(ordered_tributes[dying], return_index=True)
+        death_rows = ordered_rows[dying][first_death]
+
+        # The first event with a tribute killed before it stops the pass
+        resolved = len(events)
+        if len(dead):
+            found = np.minimum(np.searchsorted(dead, tributes), len(dead) - 1)
+            stale = (dead[found] == tributes) & (death_rows[found] < rows)
+            if stale.any():
+                resolved = int(rows[stale].min())
+
+        # Damage application -> every passive slot of the applied events is scattered on the hp array
+        applied = hit_rows < resolved
+        np.subtract.at(self.hp, hit_tributes[applied], hit_damage[applied])
+        hit_tributes = np.unique(hit_tributes[applied])
+        self._game._dirty.update(hit_tributes.tolist())
+        # Same rule of the classic engine, a tribute dies only when its hp go below 0
+        killed = hit_tributes[self.alive[hit_tributes] & (self.hp[hit_tributes] < 0)]
+        self.hp[hit_tributes] = np.maximum(self.hp[hit_tributes], 0)
+        self.alive[killed] = False
+        return resolved, killed
+
+    # Internal function to remove the killed tributes from the alive pool of the game with a single bulk swap-remove:
+    # the alive tributes at the end of the pool take the slots of the killed ones (the same result for the same pool,
+    # the replays stay reproducible)
+    def _remove_killed(self, killed) -> None:
+        if not len(killed):
+            return
+        game = self._game
+        pool = np.frombuffer(game._alive_pool, dtype=np.int64)
+        slots = np.frombuffer(game._alive_slots, dtype=np.int64)
+        size = len(pool) - len(killed)
+        holes = slots[killed]
+        slots[killed] = -1
+        holes = np.sort(holes[holes < size])
+        movers = pool[size:][slots[pool[size:]] >= 0]
+        pool[holes] = movers
+        slots[movers] = holes
+        # The NumPy views must be released before the pool is resized
+        del pool, slots
+        del game._alive_pool[size:]
+
+    def play_round(self, minimum_events: int, max_events: int) -> list:
+        if not self._events:
+            return []
+
+        draws = int(self._rng.integers(minimum_events, max_events + 1))
+
+        # Event picks and probability deciders for the whole round
+        picks = self._rng.integers(0, len(self._events), size=draws)
+        deciders = self._rng.random(size=draws)
+        pending = picks[(deciders <= self.probability[picks]) & self.playable[picks]]
+        discarded = draws - len(pending)
+
+        # Passes: the participants of the pending events are drawn in bulk from the alive tributes, the events are
+        # applied up to the first one with a tribute killed during the pass, the following ones are drawn again
+        executed, executed_slots, executed_tributes, killed = [], [], [], []
+        no_players = 0
+        # Copy of the alive pool of the game, the pool of the game is updated once at the end of the round
+        alive_index = np.frombuffer(self._game._alive_pool, dtype=np.int64).copy()
+        while len(pending):
+            # The alive tributes only decrease, an event without enough tributes is never executed
+            slots = self.actives[pending] + self.passives[pending]
+            feasible = slots <= len(alive_index)
+            no_players += len(pending) - int(np.count_nonzero(feasible))
+            pending, slots = pending[feasible], slots[feasible]
+            if not len(pending):
+                break
+
+            tributes, rows = self._draw_participants(alive_index, slots)
+            resolved, pass_killed = self._resolve(pending, slots, tributes, rows)
+            executed.append(pending[:resolved])
+            executed_slots.append(slots[:resolved])
+            executed_tributes.append(tributes[rows < resolved])
+            killed.append(pass_killed)
+            pending = pending[resolved:]
+            if len(pending):
+                alive_index = alive_index[self.alive[alive_index]]
+        if killed:
+            self._remove_killed(np.concatenate(killed))
+
+        profiler = self._game._profiler
+        executed = np.concatenate(executed) if executed else np.empty(0, dtype=np.int64)
+        if profiler is not None:
+            profiler.count_draw("executed", len(executed))
+            profiler.count_draw("no players", no_players)
+            profiler.count_draw("discarded", discarded)
+        if not len(executed):
+            return []
+
+        # Same result format as the classic engine, the participants are lazy lists of the roster indexes
+        slots = np.concatenate(executed_slots)
+        ends = np.cumsum(slots)
+        starts = ends - slots
+        splits = starts + self.passives[executed]
+        tributes = np.concatenate(executed_tributes).tolist()
+        pulled_events = []
+        for event, start, split, end in zip(executed.tolist(), starts.tolist(), splits.tolist(), ends.tolist()):
+            pulled_events.append(
+                {
+                    "event": self._events[event],
+                    "active": TributeList(self._players, tributes[split:end]),
+                    "passive": TributeList(self._players, tributes[start:split])
+                }
+            )
+
+        return pulled_events
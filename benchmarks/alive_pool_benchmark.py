@@ -0,0 +1,93 @@
+"""
+Before/after benchmark of the participant selection used by Game.execute_game()
+The "before" function is the old rejection-sampling extraction, kept here only for comparison.
+The roster has 10k tributes and the benchmark is repeated with a shrinking number of survivors.
+
+Run it from the repository root:
+python benchmarks/alive_pool_benchmark.py
+"""
+
+import sys
+import time
+from random import choice, seed
+
+sys.path.insert(0, ".")
+from core_classes import Game, Tribute  # noqa: E402
+
+ROSTER_SIZE = 10_000
+DRAWS = 2_000
+
+
+def legacy_alive_players(players):
+    alive = []
+    for player in players:
+        if player.alive:
+            alive.append(player)
+    return alive
+
+
+def legacy_get_event_players(players, actives, passives):
+    event_active_players = []
+    event_passive_players = []
+
+    if actives + passives > len(legacy_alive_players(players)):
+        return [], []
+
+    while len(event_passive_players) < passives:
+        new_player = choice(legacy_alive_players(players))
+        while new_player in event_active_players:
+            new_player = choice(legacy_alive_players(players))
+        event_passive_players.append(new_player)
+
+    while len(event_active_players) < actives:
+        new_player = choice(legacy_alive_players(players))
+        while new_player in event_active_players or new_player in event_passive_players:
+            new_player = choice(legacy_alive_players(players))
+        event_active_players.append(new_player)
+
+    return event_active_players, event_passive_players
+
+
+# The old Game kept the roster as a plain list of Tribute objects
+def build_legacy_players(survivors):
+    players = [Tribute(id=index, name=f"Tribute {index}", district=str(index % 12)) for index in range(ROSTER_SIZE)]
+    for player in players[survivors:]:
+        player.hp = 0
+        player.alive = False
+    return players
+
+
+def build_game(survivors):
+    game = Game(game_id=-1)
+    for index in range(ROSTER_SIZE):
+        game._enroll_player(Tribute(id=index, name=f"Tribute {index}", district=str(index % 12)))
+    # Kill everyone beyond the survivors count (the views update the alive pool of the game)
+    for player in game.players[survivors:]:
+        player.hp = 0
+        player.alive = False
+    return game
+
+
+def run(survivors):
+    players = build_legacy_players(survivors)
+    game = build_game(survivors)
+
+    start = time.perf_counter()
+    for _ in range(DRAWS):
+        legacy_get_event_players(players, 1, 1)
+    before = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(DRAWS):
+        game._draw_alive(2)
+    after = time.perf_counter() - start
+
+    print(f"{survivors:>6} alive | before: {before * 1000:9.2f}ms | after: {after * 1000:7.2f}ms "
+          f"| speedup: {before / after:7.1f}x")
+
+
+if __name__ == "__main__":
+    seed(0)
+    print(f"Roster of {ROSTER_SIZE} tributes, {DRAWS} events with 1 active and 1 passive tribute")
+    for alive_count in (10_000, 1_000, 100, 10):
+        run(alive_count)
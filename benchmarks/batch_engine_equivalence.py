@@ -0,0 +1,92 @@
+"""
+Seeded statistical-equivalence check between the classic and the batch (NumPy) round engines
+Both engines play the same number of rounds on identical fresh rosters and the following statistics are compared:
+- average number of executed events per round
+- fire rate (executions per round) of every event of the pool
+- average damage dealt per round
+The time of the rounds of both engines is printed as well (rendering included).
+
+The check fails (exit code 1) if the averages differ by more than TOLERANCE or if an event fire count differs by more
+than MAX_Z standard deviations (fire counts are compared as two Poisson samples).
+
+Run it from the repository root:
+python benchmarks/batch_engine_equivalence.py
+"""
+
+import math
+import sys
+import time
+
+sys.path.insert(0, ".")
+from core_classes import Game, Tribute  # noqa: E402
+from game_store import NullGameStore  # noqa: E402
+
+ROSTER_SIZE = 60_000
+ROUNDS = 100
+# Rounds big enough to be played by the batch engine (check BatchEngine.suits())
+EVENTS_PER_ROUND = (4_000, 5_000)
+TOLERANCE = 0.05
+MAX_Z = 4
+SEED = 1234
+
+
+def new_game():
+    game = Game(game_id=-1, events_pool="./testing_files/events_test.json", store=NullGameStore(), seed=SEED)
+    for index in range(ROSTER_SIZE):
+        game._enroll_player(Tribute(id=index, name=f"Tribute {index}", district=str(index % 12)))
+    return game
+
+
+def play(engine):
+    game = new_game()
+    fired = {event.description: 0 for event in game.events}
+    executed = 0
+
+    # Rounds are played without saving them, the replay data is captured before the timer starts
+    game._capture_meta()
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        for event in game._play_round(*EVENTS_PER_ROUND, engine=engine):
+            fired[event["arena_event"].description] += 1
+            executed += 1
+    elapsed = time.perf_counter() - start
+
+    damage = sum(100 - player.hp for player in game.players)
+    statistics = {
+        "events per round": executed / ROUNDS,
+        "damage per round": damage / ROUNDS,
+        "alive": game.alive_count,
+        "seconds": elapsed,
+    }
+    for description, count in fired.items():
+        statistics[f"rate: {description}"] = count / ROUNDS
+    return statistics, fired
+
+
+def relative_difference(a, b):
+    return abs(a - b) / max(abs(a), abs(b), 1e-9)
+
+
+if __name__ == "__main__":
+    classic, classic_fired = play("classic")
+    batch, batch_fired = play("batch")
+
+    failed = False
+    for statistic in classic:
+        if statistic == "seconds":
+            continue
+        difference = relative_difference(classic[statistic], batch[statistic])
+        if statistic.startswith("rate: "):
+            description = statistic[len("rate: "):]
+            a, b = classic_fired[description], batch_fired[description]
+            passed = abs(a - b) <= MAX_Z * math.sqrt(max(a + b, 1))
+        else:
+            passed = difference <= TOLERANCE
+        status = "OK" if passed else "FAIL"
+        failed |= not passed
+        print(f"{statistic[:40]:<40} classic: {classic[statistic]:12.2f} | batch: {batch[statistic]:12.2f} "
+              f"| diff: {difference:6.2%} {status}")
+
+    print(f"{'time':<40} classic: {classic['seconds']:11.3f}s | batch: {batch['seconds']:11.3f}s "
+          f"| speedup: {classic['seconds'] / batch['seconds']:.2f}x")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,218 @@
+"""
+Performance regression suite of core_classes and event_manager
+Synthetic rosters and events pools are generated for every size (100 to 100k tributes by default), then:
+- game_load:..............Game.__init__ of a saved game (roster and events pool loaded from disk)
+- execute_game:...........rounds per second of Game.execute_game() (NullGameStore, the game logic only)
+- rounds_to_completion:...time to play a whole game until one tribute is left (events per round scale with the size)
+- save_players_stats:.....latency of Game.save_players_stats() with the selected store
+- csv_conversion:.........EventManager.create_players_from_csv() of a roster CSV
+
+Every benchmark is repeated and the median time is kept. Results can be saved as a JSON baseline and compared later:
+python benchmarks/benchmark_suite.py --save baseline.json
+python benchmarks/benchmark_suite.py --compare baseline.json --threshold 15
+
+In compare mode the exit status is 1 when a benchmark is more than threshold percent slower than the baseline.
+
+Run it from the repository root:
+python benchmarks/benchmark_suite.py [--sizes 100,1000,10000,100000] [--repeat 5] [--store json|journal|sqlite]
+"""
+
+import argparse
+import csv
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from statistics import median
+
+sys.path.insert(0, ".")
+sys.path.insert(0, "./event_manager")
+from core_classes import Game, Tribute  # noqa: E402
+from event_manager import EventManager  # noqa: E402
+from game_store import NullGameStore  # noqa: E402
+from migrate_store import open_store  # noqa: E402
+
+SIZES = (100, 1_000, 10_000, 100_000)
+EVENTS = 200
+ROUNDS = 50
+MAX_ROUNDS = 10_000
+SEED = 1234
+STORE_BENCHMARKS = ("game_load", "save_players_stats")
+
+
+# SYNTHETIC DATA
+def synthetic_events(count: int = EVENTS, seed: int = SEED) -> dict:
+    generator = random.Random(seed)
+    shapes = (("#TRIBUTE sings a song {n}", 0), ("#OPPRESSED gets a cut {n}", 30),
+              ("#TRIBUTE kills #OPPRESSED {n}", 100), ("#TRIBUTE and #TRIBUTE hunt #OPPRESSED {n}", 60),
+              ("#TRIBUTE talks with #TRIBUTE {n}", 0))
+    events = []
+    for number in range(count):
+        description, severity = shapes[number % len(shapes)]
+        events.append({
+            "description": description.format(n=number),
+            "probability": round(generator.uniform(0.05, 1.0), 2),
+            "tributes involved": description.count("#"),
+            "severity": severity
+        })
+    return {"events": events}
+
+
+def synthetic_players(size: int) -> list:
+    return [Tribute(id=index, name=f"Tribute {index}", district=str(index % 12)) for index in range(size)]
+
+
+def new_game(size: int, events: dict, store=None, seed: int = SEED) -> Game:
+    game = Game(store=store if store is not None else NullGameStore(), seed=seed)
+    game.import_events_from_json(events)
+    game.import_players_from_json({"players": [Game._export_tribute(player) for player in synthetic_players(size)]})
+    return game
+
+
+# BENCHMARKS, every function returns the measured seconds
+def bench_game_load(size: int, directory: str, events_path: str, store_kind: str) -> float:
+    store = open_store(store_kind, directory, os.path.join(directory, "games.sqlite3"))
+    if store.load_players(size) is None:
+        game = new_game(size, {"events": []}, store=store)
+        game._game_id = size
+        game.import_events_from_json(events_path)
+        game.execute_game()
+    store.close()
+
+    start = time.perf_counter()
+    store = open_store(store_kind, directory, os.path.join(directory, "games.sqlite3"))
+    Game(game_id=size, events_pool=events_path, store=store)
+    elapsed = time.perf_counter() - start
+    store.close()
+    return elapsed
+
+
+def bench_execute_game(size: int, events: dict) -> float:
+    game = new_game(size, events)
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        game.execute_game()
+    return (time.perf_counter() - start) / ROUNDS
+
+
+def bench_rounds_to_completion(size: int, events: dict) -> float:
+    game = new_game(size, events)
+    events_per_round = max(size // 10, 8)
+    start = time.perf_counter()
+    while game.alive_count > 1 and game.rounds_played < MAX_ROUNDS:
+        game.execute_game(events_per_round, events_per_round * 2)
+    return time.perf_counter() - start
+
+
+def bench_save_players_stats(size: int, directory: str, events: dict, store_kind: str) -> float:
+    store = open_store(store_kind, directory, os.path.join(directory, "saves.sqlite3"))
+    game = new_game(size, events, store=store)
+    game._game_id = -size
+    game.execute_game()
+
+    pulled_events = game._play_round(8, 12, "classic")
+    start = time.perf_counter()
+    game.save_players_stats(pulled_events)
+    elapsed = time.perf_counter() - start
+    store.close()
+    return elapsed
+
+
+def bench_csv_conversion(size: int, directory: str) -> float:
+    csv_path = os.path.join(directory, f"players_{size}.csv")
+    if not os.path.exists(csv_path):
+        with open(csv_path, mode="w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(("id", "name", "district", "hp", "alive"))
+            writer.writerows((player.id, player.name, player.district, player.hp, player.alive)
+                             for player in synthetic_players(size))
+
+    # The EventManager imports pandas lazily, imported here so the timing doesn't include the import
+    import pandas  # noqa: F401
+
+    start = time.perf_counter()
+    EventManager().create_players_from_csv(csv_path, os.path.join(directory, f"players_{size}.json"))
+    return time.perf_counter() - start
+
+
+def run(sizes: list, repeat: int, store_kind: str, only: list = None) -> dict:
+    events = synthetic_events()
+    results = {}
+
+    with tempfile.TemporaryDirectory() as directory:
+        events_path = os.path.join(directory, "events.json")
+        with open(events_path, mode="w") as file:
+            json.dump(events, file)
+
+        benchmarks = {
+            "game_load": lambda size: bench_game_load(size, directory, events_path, store_kind),
+            "execute_game": lambda size: bench_execute_game(size, events),
+            "rounds_to_completion": lambda size: bench_rounds_to_completion(size, events),
+            "save_players_stats": lambda size: bench_save_players_stats(size, directory, events, store_kind),
+            "csv_conversion": lambda size: bench_csv_conversion(size, directory)
+        }
+        for name, benchmark in benchmarks.items():
+            if only and name not in only:
+                continue
+            for size in sizes:
+                samples = [benchmark(size) for _ in range(repeat)]
+                # The store is part of the name of the benchmarks that depend on it
+                key = f"{name}[{store_kind},{size}]" if name in STORE_BENCHMARKS else f"{name}[{size}]"
+                results[key] = {"median": median(samples), "min": min(samples)}
+                print(f"{key:<30} {median(samples) * 1000:10.3f}ms", flush=True)
+
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """Prints the comparison with the baseline, returns the names of the benchmarks slower than the threshold"""
+    regressions = []
+    print(f"\n{'benchmark':<30} {'baseline':>12} {'current':>12} {'change':>9}")
+    for name, result in results.items():
+        if name not in baseline:
+            print(f"{name:<30} {'-':>12} {result['median'] * 1000:10.3f}ms {'new':>9}")
+            continue
+        before = baseline[name]["median"]
+        change = (result["median"] - before) / before * 100 if before else 0.0
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<30} {before * 1000:10.3f}ms {result['median'] * 1000:10.3f}ms {change:+8.1f}%{flag}")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Performance regression suite")
+    parser.add_argument("--sizes", default=",".join(str(size) for size in SIZES),
+                        help="comma separated roster sizes")
+    parser.add_argument("--repeat", type=int, default=5, help="runs of every benchmark, the median is kept")
+    parser.add_argument("--store", choices=["json", "journal", "sqlite"], default="json",
+                        help="store used by game_load and save_players_stats")
+    parser.add_argument("--only", help="comma separated benchmarks to run (default: all)")
+    parser.add_argument("--save", help="JSON file where the results are saved as a baseline")
+    parser.add_argument("--compare", help="JSON baseline to compare the results with")
+    parser.add_argument("--threshold", type=float, default=10.0, help="max slowdown (percent) allowed in compare mode")
+    arguments = parser.parse_args()
+
+    results = run(
+        [int(size) for size in arguments.sizes.split(",")],
+        arguments.repeat,
+        arguments.store,
+        arguments.only.split(",") if arguments.only else None
+    )
+
+    if arguments.save:
+        with open(arguments.save, mode="w") as file:
+            json.dump({"python": sys.version.split()[0], "store": arguments.store, "repeat": arguments.repeat,
+                       "results": results}, file, indent=4)
+
+    if arguments.compare:
+        with open(arguments.compare, mode="r") as file:
+            regressions = compare(results, json.load(file)["results"], arguments.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} benchmarks are more than {arguments.threshold}% slower: "
+                  f"{', '.join(regressions)}")
+            sys.exit(1)
@@ -0,0 +1,99 @@
+"""
+Benchmark of the CSV -> JSON conversion of the EventManager
+The "before" function is the old conversion (whole DataFrame, row by row indexing, list of Tribute objects, indented
+json.dump at the end), kept here only for comparison. It's run on a smaller file because it's really slow, its time
+per row is then compared with the streaming conversion on the full file.
+Peak memory is measured with tracemalloc (NumPy and pandas buffers included) in a second run, tracemalloc slows down
+the conversion a lot so the times come from a run without it.
+
+Run it from the repository root:
+python benchmarks/csv_conversion_benchmark.py [rows] [legacy rows]
+"""
+
+import gc
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+sys.path.insert(0, ".")
+sys.path.insert(0, "./event_manager")
+from core_classes import Tribute  # noqa: E402
+from event_manager import EventManager  # noqa: E402
+
+ROWS = 1_000_000
+LEGACY_ROWS = 50_000
+DISTRICTS = 12
+
+
+def write_players_csv(path: str, rows: int) -> None:
+    with open(path, mode="w") as file:
+        file.write("id,name,district,hp,alive\n")
+        for start in range(0, rows, 100_000):
+            file.write("".join(
+                f"{index},Tribute {index},{index % DISTRICTS},{index % 100},{'TRUE' if index % 3 else 'FALSE'}\n"
+                for index in range(start, min(start + 100_000, rows))
+            ))
+
+
+def legacy_create_players_from_csv(filepath, destination_path):
+    df = pd.read_csv(filepath)
+    players = []
+    for row in range(len(df)):
+        players.append(Tribute(id=df["id"][row], name=df["name"][row], district=df["district"][row],
+                               hp=df["hp"][row], alive=df["alive"][row]))
+
+    output = {"players": []}
+    for tribute in players:
+        output["players"].append({"id": int(tribute.id), "name": str(tribute.name), "district": str(tribute.district),
+                                  "hp": int(tribute.hp), "alive": bool(tribute.alive)})
+    with open(destination_path, mode="w") as file:
+        json.dump(output, file, indent=4)
+
+
+def measure(function, *args):
+    gc.collect()
+    start = time.perf_counter()
+    function(*args)
+    elapsed = time.perf_counter() - start
+
+    gc.collect()
+    tracemalloc.start()
+    function(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def report(name: str, rows: int, elapsed: float, peak: int) -> None:
+    print(f"{name:<10} {rows:>9} rows | {elapsed:8.2f}s | {elapsed / rows * 1e6:7.2f}us/row "
+          f"| peak {peak / 2 ** 20:8.2f} MiB")
+
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else ROWS
+    legacy_rows = int(sys.argv[2]) if len(sys.argv) > 2 else LEGACY_ROWS
+
+    with tempfile.TemporaryDirectory() as directory:
+        small_csv = os.path.join(directory, "players_small.csv")
+        big_csv = os.path.join(directory, "players_big.csv")
+        write_players_csv(small_csv, legacy_rows)
+        write_players_csv(big_csv, rows)
+        print(f"CSV files: {os.path.getsize(small_csv) / 2 ** 20:.1f} MiB and {os.path.getsize(big_csv) / 2 ** 20:.1f} "
+              f"MiB")
+
+        legacy_json = os.path.join(directory, "legacy.json")
+        report("before", legacy_rows, *measure(legacy_create_players_from_csv, small_csv, legacy_json))
+
+        manager = EventManager()
+        small_json = os.path.join(directory, "small.json")
+        report("streaming", legacy_rows, *measure(manager.create_players_from_csv, small_csv, small_json))
+        big_json = os.path.join(directory, "big.json")
+        report("streaming", rows, *measure(manager.create_players_from_csv, big_csv, big_json))
+
+        with open(legacy_json) as legacy, open(small_json) as streamed:
+            print(f"same output as before: {json.load(legacy) == json.load(streamed)}")
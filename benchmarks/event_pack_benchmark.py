@@ -0,0 +1,108 @@
+"""
+Benchmark of the binary events packs (check event_pack.py) against the json events files
+A synthetic catalogue (200k events by default) is written as json and converted to a pack, then:
+- build:..............EventManager.create_event_pack() of the json file
+- load:...............Game.import_events_from_json() in a fresh process, sampler included
+- rounds:.............rounds per second of the classic engine (the pack decodes the drawn events only)
+- memory:.............memory added to every worker process by loading the events and playing the rounds
+                      (Pss of /proc/self/smaps_rollup, the pages of a pack are shared by the workers)
+
+Every worker is a new process (spawn), so nothing is inherited from the benchmark process.
+
+Run it from the repository root:
+python benchmarks/event_pack_benchmark.py [--events 200000] [--workers 4] [--rounds 200]
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, ".")
+sys.path.insert(0, "./event_manager")
+from benchmark_suite import synthetic_events  # noqa: E402
+
+
+# Proportional set size of the process in kB (the shared pages are split between the processes that map them)
+def pss() -> int:
+    try:
+        with open("/proc/self/smaps_rollup", mode="r") as file:
+            for line in file:
+                if line.startswith("Pss:"):
+                    return int(line.split()[1])
+    except FileNotFoundError:
+        pass
+    return 0
+
+
+def worker(events_path: str, rounds: int, barrier) -> dict:
+    sys.path.insert(0, ".")
+    from core_classes import Game
+    from game_store import NullGameStore
+    from benchmark_suite import synthetic_players
+
+    players = {"players": [Game._export_tribute(player) for player in synthetic_players(1_000)]}
+    before = pss()
+    start = time.perf_counter()
+    game = Game(events_pool=events_path, store=NullGameStore(), seed=1)
+    game.event_sampler
+    loaded = time.perf_counter() - start
+
+    game.import_players_from_json(players)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        game._play_round(8, 12, "classic")
+    played = time.perf_counter() - start
+
+    # Every worker is measured while all of them have the events loaded
+    barrier.wait()
+    memory = pss() - before
+    barrier.wait()
+    return {"load": loaded, "round": played / rounds, "memory": memory,
+            "decoded": getattr(game.events, "decoded", len(game.events))}
+
+
+def measure(events_path: str, workers: int, rounds: int) -> list:
+    context = multiprocessing.get_context("spawn")
+    with context.Manager() as manager:
+        barrier = manager.Barrier(workers)
+        with context.Pool(workers) as pool:
+            return pool.starmap(worker, [(events_path, rounds, barrier)] * workers)
+
+
+def run(events: int, workers: int, rounds: int) -> None:
+    from event_manager import EventManager
+
+    with tempfile.TemporaryDirectory() as directory:
+        json_path = os.path.join(directory, "events.json")
+        pack_path = os.path.join(directory, "events.pack")
+        with open(json_path, mode="w") as file:
+            json.dump(synthetic_events(events), file)
+
+        start = time.perf_counter()
+        EventManager().create_event_pack(json_path, pack_path)
+        build = time.perf_counter() - start
+
+        print(f"{events} events, {workers} workers, {rounds} rounds per worker")
+        print(f"pack build: {build * 1000:.1f}ms | json: {os.path.getsize(json_path) / 1e6:.2f}MB | "
+              f"pack: {os.path.getsize(pack_path) / 1e6:.2f}MB")
+        print(f"{'format':<6} {'load':>10} {'round':>10} {'memory/worker':>15} {'decoded':>9}")
+        for label, path in (("json", json_path), ("pack", pack_path)):
+            results = measure(path, workers, rounds)
+            load = sum(result["load"] for result in results) / workers
+            round_time = sum(result["round"] for result in results) / workers
+            memory = sum(result["memory"] for result in results) / workers
+            print(f"{label:<6} {load * 1000:8.1f}ms {round_time * 1e6:8.1f}us {memory / 1024:12.1f}MB "
+                  f"{results[0]['decoded']:>9}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Binary events packs against json events files")
+    parser.add_argument("--events", type=int, default=200_000, help="events of the synthetic catalogue")
+    parser.add_argument("--workers", type=int, default=4, help="processes that load the events")
+    parser.add_argument("--rounds", type=int, default=200, help="rounds played by every worker")
+    arguments = parser.parse_args()
+    run(arguments.events, arguments.workers, arguments.rounds)
@@ -0,0 +1,120 @@
+"""
+Microbenchmark of the help command embeds
+The "before" function is the old embed construction of Help.help() (cogs and commands walked on every call), kept here
+only for comparison. The bot has 50 cogs with 20 commands each, the benchmark asks for the modules embed and for the
+embed of the last cog.
+The cache invalidation through the cog_add/cog_remove events is checked as well.
+
+Run it from the repository root:
+python benchmarks/help_embed_benchmark.py
+"""
+
+import asyncio
+import sys
+import time
+
+import discord
+from discord.ext import commands
+
+sys.path.insert(0, ".")
+from bot import HungerGamesBot  # noqa: E402
+from help_command import Help  # noqa: E402
+
+COGS = 50
+COMMANDS = 20
+CALLS = 2_000
+PREFIX = "%"
+
+
+def make_cog(index: int):
+    attributes = {"__doc__": f"\n    Module number {index}\n    "}
+    for number in range(COMMANDS):
+        async def callback(self, ctx):
+            pass
+        attributes[f"command_{number}"] = commands.command(
+            name=f"module{index}command{number}", help=f"\tCommand {number} of the module {index}"
+        )(callback)
+    return type(f"Module{index}", (commands.Cog,), attributes)
+
+
+def legacy_help_embed(bot, module, owner):
+    if module is None:
+        emb = discord.Embed(title='Modules', color=discord.Color.blue(),
+                            description=f'Use `{PREFIX}help <module>` or `/help <module>` to gain more information '
+                                        f'about that module :ice_cube:\n')
+        cogs_desc = ''
+        for cog in bot.cogs:
+            cogs_desc += f'`{cog}` {bot.cogs[cog].__doc__}\n'
+        emb.add_field(name='Modules', value=cogs_desc, inline=False)
+        commands_desc = ''
+        for command in bot.walk_commands():
+            if not command.cog_name and not command.hidden:
+                commands_desc += f'{command.name} - {command.help}\n'
+        if commands_desc:
+            emb.add_field(name='Not belonging to a module', value=commands_desc, inline=False)
+        emb.add_field(name="About", value=f"This embed was originally developed by Chriѕ#0001, based on discord.py.\n\
+                                    This version of it is maintained by {owner}\n")
+        emb.set_footer(text="Bot is running 1.0")
+    else:
+        for cog in bot.cogs:
+            if cog.lower() == module.lower():
+                emb = discord.Embed(title=f'{cog} - Commands', description=bot.cogs[cog].__doc__,
+                                    color=discord.Color.green())
+                for command in bot.get_cog(cog).get_commands():
+                    if not command.hidden:
+                        emb.add_field(name=f"`{PREFIX}{command.name}`", value=command.help, inline=False)
+                break
+        else:
+            emb = discord.Embed(title="What's that?!",
+                                description=f"I've never heard from a module called `{module}` before :scream:",
+                                color=discord.Color.orange())
+    return emb
+
+
+def timed(function, *args) -> float:
+    start = time.perf_counter()
+    for _ in range(CALLS):
+        function(*args)
+    return (time.perf_counter() - start) / CALLS
+
+
+async def main():
+    async with HungerGamesBot(command_prefix=PREFIX, intents=discord.Intents.none(), help_command=None) as bot:
+        await run(bot)
+
+
+async def run(bot):
+    help_cog = Help(bot)
+    await bot.add_cog(help_cog)
+    for index in range(COGS):
+        await bot.add_cog(make_cog(index)())
+    # Letting the cog_add listeners run
+    await asyncio.sleep(0)
+
+    owner = "@owner"
+    last_module = f"module{COGS - 1}"
+    start = time.perf_counter()
+    help_cog.get_embed(None, owner)
+    cold = time.perf_counter() - start
+
+    print(f"{COGS} cogs, {COGS * COMMANDS} commands, {CALLS} calls")
+    print(f"cache build: {cold * 1000:.3f}ms")
+    for label, module in (("modules embed", None), ("last module embed", last_module)):
+        before = timed(legacy_help_embed, bot, module, owner)
+        after = timed(help_cog.get_embed, module, owner)
+        same = legacy_help_embed(bot, module, owner).to_dict() == help_cog.get_embed(module, owner).to_dict()
+        print(f"{label:<18} before: {before * 1e6:8.1f}us | cached: {after * 1e6:8.1f}us | "
+              f"x{before / after:6.1f} | same embed: {same}")
+
+    # Invalidation
+    await bot.remove_cog(f"Module{COGS - 1}")
+    await asyncio.sleep(0)
+    removed = help_cog.get_embed(last_module).title == "What's that?!"
+    await bot.add_cog(make_cog(COGS - 1)())
+    await asyncio.sleep(0)
+    added = help_cog.get_embed(last_module).title == f"Module{COGS - 1} - Commands"
+    print(f"cache refreshed after remove_cog: {removed} | after add_cog: {added}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,115 @@
+"""
+Size and speed of the formats of the game files (check json_codec.py)
+A game with a large roster is played for some rounds, then the same game is saved and loaded with every format:
+- size:...............size of data_{id}.json
+- full save:..........first save of the game (the whole file is encoded)
+- round save:.........save of a single round (only the changed tributes and the new round are encoded)
+- load:...............JsonGameStore.load_players() + load_history() of a new store (the file is read and parsed)
+- json.load:..........the file loaded with the json module, as the store did before json_codec (indent format only)
+
+The indent format is the original one (json.dump(indent=4)), the other formats are compared with it (the loads with
+the json.load of the indent file).
+
+Run it from the repository root:
+python benchmarks/json_format_benchmark.py [--sizes 10000,100000] [--rounds 50] [--repeat 5]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from statistics import median
+
+sys.path.insert(0, ".")
+import json_codec  # noqa: E402
+from core_classes import Game  # noqa: E402
+from game_store import JsonGameStore  # noqa: E402
+from benchmark_suite import new_game, synthetic_events  # noqa: E402
+
+SIZES = (10_000, 100_000)
+
+
+def played_game(size: int, rounds: int) -> tuple:
+    """Plays the rounds of a game, returns the game and its saved rounds (nothing is written)"""
+    saved = []
+
+    class RecordingStore(JsonGameStore):
+        def save_rounds(self, game_id, players, new_rounds):
+            saved.extend(new_rounds)
+
+    game = new_game(size, synthetic_events(), store=RecordingStore())
+    events_per_round = max(size // 100, 8)
+    for _ in range(rounds):
+        game.execute_game(events_per_round, events_per_round * 2)
+    return game, saved
+
+
+def timed(function) -> float:
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+def bench_format(file_format: str, directory: str, game: Game, saved: list, repeat: int) -> dict:
+    players = lambda: [Game._export_tribute(player) for player in game.players]  # noqa: E731
+    path = os.path.join(directory, "data_1.json")
+    full_saves, round_saves, loads = [], [], []
+    for _ in range(repeat):
+        if os.path.exists(path):
+            os.remove(path)
+        store = JsonGameStore(directory, file_format=file_format)
+        # Every round but the latest one in a single save, the whole file is encoded
+        full_saves.append(timed(lambda: store.save_rounds(1, players, saved[:-1])))
+        round_saves.append(timed(lambda: store.save_rounds(1, players, saved[-1:])))
+
+        def load():
+            loader = JsonGameStore(directory)
+            loader.load_players(1)
+            loader.load_history(1)
+        loads.append(timed(load))
+
+    with open(path, mode="rb") as file:
+        detected = json_codec.detect_format(file.read())
+    result = {"size": os.path.getsize(path), "full save": median(full_saves), "round save": median(round_saves),
+              "load": median(loads), "detected": detected}
+
+    if file_format == "indent":
+        def legacy_load():
+            with open(path, mode="r") as file:
+                json.load(file)
+        result["json.load"] = median(timed(legacy_load) for _ in range(repeat))
+    return result
+
+
+def run(sizes: list, rounds: int, repeat: int) -> None:
+    print(f"codec: {'orjson' if json_codec.orjson is not None else 'json (standard library)'}")
+    for size in sizes:
+        game, saved = played_game(size, rounds)
+        print(f"\n{size} tributes, {len(saved)} rounds")
+        print(f"{'format':<9} {'size':>12} {'full save':>12} {'round save':>12} {'load':>12}  detected")
+        results = {}
+        with tempfile.TemporaryDirectory() as directory:
+            for file_format in json_codec.FORMATS:
+                result = results[file_format] = bench_format(file_format, directory, game, saved, repeat)
+                baseline = results["indent"]
+                print(f"{file_format:<9} {result['size'] / 1e6:10.2f}MB "
+                      f"{result['full save'] * 1000:10.1f}ms {result['round save'] * 1000:10.1f}ms "
+                      f"{result['load'] * 1000:10.1f}ms  {result['detected']}")
+                if file_format == "indent":
+                    print(f"{'':<9} {'':>12} {'':>12} {'json.load':>12} {result['json.load'] * 1000:10.1f}ms")
+                if file_format != "indent":
+                    print(f"{'':<9} {baseline['size'] / result['size']:11.1f}x "
+                          f"{baseline['full save'] / result['full save']:11.1f}x "
+                          f"{baseline['round save'] / result['round save']:11.1f}x "
+                          f"{baseline['json.load'] / result['load']:11.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Size and speed of the formats of the game files")
+    parser.add_argument("--sizes", default=",".join(str(size) for size in SIZES), help="comma separated roster sizes")
+    parser.add_argument("--rounds", type=int, default=50, help="rounds played before the game is saved")
+    parser.add_argument("--repeat", type=int, default=5, help="runs of every benchmark, the median is kept")
+    arguments = parser.parse_args()
+    run([int(size) for size in arguments.sizes.split(",")], arguments.rounds, arguments.repeat)
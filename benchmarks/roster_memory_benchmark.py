@@ -0,0 +1,64 @@
+"""
+Memory benchmark of the tributes roster
+Compares the old representation (list of Tribute dataclasses) with the TributeRoster used by the Game class.
+Memory is measured with tracemalloc, the time of a full hp scan is measured as well.
+
+Run it from the repository root:
+python benchmarks/roster_memory_benchmark.py
+"""
+
+import gc
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, ".")
+from core_classes import Tribute  # noqa: E402
+from roster import TributeRoster  # noqa: E402
+
+ROSTER_SIZE = 100_000
+DISTRICTS = 12
+
+
+def tribute_rows():
+    for index in range(ROSTER_SIZE):
+        yield index, f"Tribute {index}", str(index % DISTRICTS)
+
+
+def build_list():
+    return [Tribute(id=index, name=name, district=district) for index, name, district in tribute_rows()]
+
+
+def build_roster():
+    roster = TributeRoster()
+    for index, name, district in tribute_rows():
+        roster.add(index, name, district)
+    return roster
+
+
+def measure(builder):
+    gc.collect()
+    tracemalloc.start()
+    players = builder()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return players, size
+
+
+if __name__ == "__main__":
+    players, list_size = measure(build_list)
+    start = time.perf_counter()
+    total = sum(player.hp for player in players)
+    list_scan = time.perf_counter() - start
+    del players
+
+    roster, roster_size = measure(build_roster)
+    start = time.perf_counter()
+    total = sum(roster.hp)
+    roster_scan = time.perf_counter() - start
+
+    print(f"{ROSTER_SIZE} tributes")
+    print(f"list of Tribute: {list_size / 2 ** 20:7.2f} MiB | {list_size / ROSTER_SIZE:6.1f} bytes/tribute "
+          f"| hp scan: {list_scan * 1000:6.2f}ms")
+    print(f"TributeRoster:   {roster_size / 2 ** 20:7.2f} MiB | {roster_size / ROSTER_SIZE:6.1f} bytes/tribute "
+          f"| hp scan: {roster_scan * 1000:6.2f}ms")
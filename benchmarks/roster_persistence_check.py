@@ -0,0 +1,68 @@
+"""
+Check of the tribute changes made through the roster views (game.players[i].hp = ..., game.players[i].alive = ...)
+For every store a game is created, a tribute is killed and another one is healed through the views, a round is played
+and the game is loaded again. The check fails (exit code 1) if:
+- the killed tribute takes part in the round or is still in the alive pool
+- the loaded roster is different from the roster of the game
+- the replay of the round is different from the saved one (the view writes need new replay data)
+
+Run it from the repository root:
+python benchmarks/roster_persistence_check.py
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, ".")
+from core_classes import Game  # noqa: E402
+from migrate_store import open_store  # noqa: E402
+
+STORES = ("json", "journal", "sqlite")
+EVENTS_POOL = "./testing_files/events_test.json"
+PLAYERS = "./testing_files/players_test.json"
+SEED = 1234
+
+
+def check(kind: str, directory: str) -> list:
+    errors = []
+    store = open_store(kind, directory, os.path.join(directory, "games.sqlite3"))
+    game = Game(game_id=1, events_pool=EVENTS_POOL, store=store, seed=SEED)
+    game.import_players_from_json(PLAYERS)
+    game.execute_game()
+
+    killed, healed = game.alive_players[:2]
+    killed.hp = 0
+    killed.alive = False
+    healed.hp = 1000
+    if killed in game.alive_players:
+        errors.append("the killed tribute is still in the alive pool")
+
+    events = game.execute_game()
+    if any(killed.name in event for event in events):
+        errors.append("the killed tribute took part in the round")
+
+    expected = [Game._export_tribute(player) for player in game.players]
+    history = game.event_history
+    store.close()
+
+    store = open_store(kind, directory, os.path.join(directory, "games.sqlite3"))
+    loaded = Game(game_id=1, events_pool=EVENTS_POOL, store=store)
+    if [Game._export_tribute(player) for player in loaded.players] != expected:
+        errors.append("the loaded roster is different")
+    if loaded.get_player(killed.id) in loaded.alive_players:
+        errors.append("the killed tribute is alive after the load")
+    if loaded.replay_history(start=-1) != history[-1:]:
+        errors.append("the replayed round is different")
+    store.close()
+    return errors
+
+
+if __name__ == "__main__":
+    failed = False
+    for kind in STORES:
+        with tempfile.TemporaryDirectory() as directory:
+            errors = check(kind, directory)
+        failed |= bool(errors)
+        print(f"{kind:<10} {'FAIL: ' + ', '.join(errors) if errors else 'OK'}")
+    sys.exit(1 if failed else 0)
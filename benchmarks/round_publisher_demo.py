@@ -0,0 +1,117 @@
+"""
+Rate limiting check of the RoundPublisher (check round_publisher.py) against a fake Discord channel
+The fake channel answers with a 429 when more than 5 messages are sent in a second, like Discord does. 400 events are
+published as plain text and as embeds, with token buckets slower and faster than the channel limit: the faster ones
+get 429 responses, which are retried.
+
+The check fails (exit code 1) if a message could not be sent, if a message is over the Discord limits (check
+round_publisher.py) or if the sent content is not the 400 events in order.
+
+Run it from the repository root:
+python benchmarks/round_publisher_demo.py
+"""
+
+import asyncio
+import random
+import sys
+import time
+from collections import deque
+from types import SimpleNamespace
+
+from discord.errors import HTTPException
+
+sys.path.insert(0, ".")
+from round_publisher import (EMBED_FIELD_LIMIT, EMBED_FIELDS, EMBED_TOTAL_LIMIT, EMBEDS_PER_MESSAGE,  # noqa: E402
+                             MESSAGE_LIMIT, RoundPublisher, pack_embeds, pack_messages)
+
+
+class FakeChannel:
+    """Channel stand-in that answers with a 429 when more than limit messages are sent in window seconds"""
+
+    def __init__(self, channel_id: int, window: float = 1.0, limit: int = 5, delay: float = 0.02) -> None:
+        self.id = channel_id
+        self.window = window
+        self.limit = limit
+        self.delay = delay
+        self.sent = []
+        self._times = deque()
+        self.rejected = 0
+
+    async def send(self, content: str = None, embeds: list = None):
+        await asyncio.sleep(self.delay * random.uniform(0.5, 1.5))
+        now = time.monotonic()
+        while self._times and now - self._times[0] > self.window:
+            self._times.popleft()
+        if len(self._times) >= self.limit:
+            self.rejected += 1
+            response = SimpleNamespace(status=429, reason="Too Many Requests",
+                                       headers={"Retry-After": f"{self.window - (now - self._times[0]):.3f}"})
+            raise HTTPException(response, {"message": "You are being rate limited.", "code": 0})
+        self._times.append(now)
+        self.sent.append(content if embeds is None else embeds)
+        return len(self.sent)
+
+
+class FakeContext:
+    def __init__(self, channel: FakeChannel) -> None:
+        self.channel = channel
+
+    async def send(self, **kwargs):
+        return await self.channel.send(**kwargs)
+
+
+# Checks the messages received by the channel, returns the errors
+def check(channel: FakeChannel, lines: list, use_embeds: bool) -> list:
+    errors = []
+    if use_embeds:
+        values = []
+        for embeds in channel.sent:
+            if len(embeds) > EMBEDS_PER_MESSAGE:
+                errors.append(f"{len(embeds)} embeds in a message")
+            size = 0
+            for embed in embeds:
+                if len(embed.fields) > EMBED_FIELDS:
+                    errors.append(f"{len(embed.fields)} fields in an embed")
+                size += len(embed.title or "")
+                for field in embed.fields:
+                    if len(field.value) > EMBED_FIELD_LIMIT:
+                        errors.append(f"{len(field.value)} characters in a field")
+                    size += len(field.name) + len(field.value)
+                    values.append(field.value)
+            if size > EMBED_TOTAL_LIMIT:
+                errors.append(f"{size} characters in the embeds of a message")
+    else:
+        values = channel.sent
+        errors += [f"{len(content)} characters in a message" for content in values if len(content) > MESSAGE_LIMIT]
+    if "\n".join(values) != "\n".join(lines):
+        errors.append("the sent content is not the events in order")
+    return errors
+
+
+async def main() -> bool:
+    failed = False
+    lines = [f"Tribute {index} does something quite dramatic in the arena, round event number {index}."
+             for index in range(400)]
+    print(f"{len(lines)} events -> {len(pack_messages(lines))} text messages, "
+          f"{len(pack_embeds(lines, 'Round 1'))} embed messages")
+
+    # Time is scaled down, the fake channel allows 5 messages per second
+    # A bucket faster than the channel limits gets 429 responses, which are retried
+    for use_embeds, rate, burst in ((False, 25.0, 10), (False, 5.0, 5), (True, 25.0, 10)):
+        channel = FakeChannel(1)
+        publisher = RoundPublisher(rate=rate, burst=burst, use_embeds=use_embeds)
+        started = time.monotonic()
+        await publisher.publish(FakeContext(channel), lines, title="Round 1")
+        print(f"embeds={use_embeds} rate={rate}/s burst={burst}: {len(channel.sent)} messages in "
+              f"{time.monotonic() - started:.1f}s, {channel.rejected} rejected by the channel")
+        print(f"\t{publisher.stats}")
+        errors = check(channel, lines, use_embeds)
+        if publisher.failed:
+            errors.append(f"{publisher.failed} messages not sent")
+        failed |= bool(errors)
+        print(f"\t{'FAIL: ' + ', '.join(errors) if errors else 'OK'}")
+    return not failed
+
+
+if __name__ == "__main__":
+    sys.exit(0 if asyncio.run(main()) else 1)
@@ -0,0 +1,97 @@
+"""
+Cold start benchmark of the bot and the tools
+Every module is imported in a fresh interpreter started with "-X importtime", the cumulative import time of the module
+and the wall time of the interpreter are collected (median of the runs).
+The heaviest imports of every module are listed, to spot a dependency loaded too early.
+
+Results can be saved and compared with a previous release:
+python benchmarks/startup_benchmark.py --save startup_baseline.json
+python benchmarks/startup_benchmark.py --compare startup_baseline.json
+
+Run it from the repository root:
+python benchmarks/startup_benchmark.py [--runs 5] [--top 5]
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import time
+from statistics import median
+
+# Module -> extra paths needed to import it from the repository root
+TARGETS = {
+    "bot": [],
+    "general_commands": [],
+    "help_command": [],
+    "core_classes": [],
+    "async_runner": [],
+    "simulator": [],
+    "event_manager": ["./event_manager"],
+}
+
+
+def import_time(module: str, paths: list) -> tuple:
+    """Imports the module in a new interpreter, returns (wall time, module cumulative time, {import: self time})"""
+    code = "import sys\n" + "".join(f"sys.path.insert(0, {path!r})\n" for path in paths) + f"import {module}"
+    start = time.perf_counter()
+    process = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True)
+    wall = time.perf_counter() - start
+    if process.returncode:
+        raise RuntimeError(f"import {module} failed:\n{process.stderr.splitlines()[-1]}")
+
+    cumulative = 0.0
+    self_times = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        self_times[name.strip()] = int(self_us) / 1e6
+        if name.strip() == module:
+            cumulative = int(cumulative_us) / 1e6
+    return wall, cumulative, self_times
+
+
+def run(runs: int) -> tuple:
+    results = {}
+    heaviest = {}
+    for module, paths in TARGETS.items():
+        samples = [import_time(module, paths) for _ in range(runs)]
+        results[module] = {
+            "wall": round(median(sample[0] for sample in samples), 4),
+            "import": round(median(sample[1] for sample in samples), 4)
+        }
+        heaviest[module] = samples[-1][2]
+    return results, heaviest
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cold start benchmark")
+    parser.add_argument("--runs", type=int, default=5, help="interpreters started for every module")
+    parser.add_argument("--top", type=int, default=5, help="heaviest imports listed for every module")
+    parser.add_argument("--save", help="JSON file where the results are saved")
+    parser.add_argument("--compare", help="JSON file with the results of a previous run")
+    arguments = parser.parse_args()
+
+    results, heaviest = run(arguments.runs)
+    baseline = {}
+    if arguments.compare:
+        with open(arguments.compare, mode="r") as file:
+            baseline = json.load(file)["modules"]
+
+    print(f"{'module':<18} {'wall':>9} {'import':>9} {'baseline':>9} {'change':>8}")
+    for module, result in results.items():
+        line = f"{module:<18} {result['wall'] * 1000:7.1f}ms {result['import'] * 1000:7.1f}ms"
+        if module in baseline:
+            before = baseline[module]["import"]
+            line += f" {before * 1000:7.1f}ms {(result['import'] - before) / before * 100:+7.1f}%"
+        print(line)
+
+    if arguments.top:
+        for module, self_times in heaviest.items():
+            top = sorted(self_times.items(), key=lambda item: item[1], reverse=True)[:arguments.top]
+            print(f"\n{module}: " + ", ".join(f"{name} {seconds * 1000:.1f}ms" for name, seconds in top))
+
+    if arguments.save:
+        with open(arguments.save, mode="w") as file:
+            json.dump({"python": sys.version.split()[0], "runs": arguments.runs, "modules": results}, file, indent=4)
@@ -1,16 +1,102 @@
+import hashlib
+import json
+import os
+
 import discord
 from discord.ext import commands
-import os
-from general_commands import General
-from help_command import Help
 
 
 # CONSTANTS AND PARAMETERS
-TOKEN = os.environ["DS_TOKEN"]
+# Cogs are loaded as extensions in setup_hook(), their modules (and dependencies) are imported only at that point
+EXTENSIONS = ("general_commands", "help_command")
+# Hash of the latest application commands synced with Discord
+TREE_HASH_PATH = "./files/command_tree_hash.txt"
+# Events file of the scheduled games
+EVENTS_POOL = os.environ.get("DS_EVENTS_POOL")
+
+
+class HungerGamesBot(commands.Bot):
+    """
+    Bot of the Hunger Games
+    - setup_hook() runs once per process (on_ready runs again after every reconnection): the cogs are loaded there
+    - the application commands tree is synced with Discord only when the commands changed since the latest sync
+    ..(set the DS_FORCE_SYNC environment variable to sync anyway)
+    - the "cog_add" and "cog_remove" events are dispatched after a cog is added or removed (listeners:
+    ..on_cog_add(cog) and on_cog_remove(cog)), the help cog uses them to refresh its cached embeds
+    - game_scheduler runs the scheduled rounds of every game (check game_scheduler.py), cogs schedule their games with
+    ..bot.game_scheduler.schedule(game_id, every=..., on_round=...); it's created by setup_hook() (None before)
+    """
+
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.tree_synced = False
+        self.game_scheduler = None
+
+    async def setup_hook(self) -> None:
+        # Imported here like the cogs, the games modules are loaded only when the bot starts
+        from game_scheduler import GameScheduler
+        self.game_scheduler = GameScheduler(events_pool=EVENTS_POOL)
+        self.game_scheduler.start()
+        for extension in EXTENSIONS:
+            await self.load_extension(extension)
+        await self.sync_tree()
+
+    async def close(self) -> None:
+        if self.game_scheduler is not None:
+            await self.game_scheduler.stop()
+        await super().close()
+
+    async def add_cog(self, cog, /, **kwargs) -> None:
+        await super().add_cog(cog, **kwargs)
+        self.dispatch("cog_add", cog)
+
+    async def remove_cog(self, name: str, /, **kwargs):
+        cog = await super().remove_cog(name, **kwargs)
+        if cog is not None:
+            self.dispatch("cog_remove", cog)
+        return cog
+
+    # Internal function to get a command in the form it's sent to Discord
+    # discord.py 2.4 added the tree argument of to_dict(), the older versions take no arguments
+    def _command_payload(self, command) -> dict:
+        try:
+            return command.to_dict(self.tree)
+        except TypeError:
+            return command.to_dict()
+
+    # Hash of the global application commands, in the form they are sent to Discord
+    def command_tree_hash(self) -> str:
+        commands_payload = sorted(
+            (self._command_payload(command) for command in self.tree.get_commands()),
+            key=lambda payload: (payload.get("type", 1), payload["name"])
+        )
+        content = json.dumps({"application": self.application_id, "commands": commands_payload}, sort_keys=True)
+        return hashlib.sha256(content.encode()).hexdigest()
+
+    async def sync_tree(self) -> bool:
+        """Syncs the application commands tree if it changed since the latest sync, returns True if it was synced"""
+        current_hash = self.command_tree_hash()
+        try:
+            with open(TREE_HASH_PATH, mode="r") as file:
+                synced_hash = file.read().strip()
+        except FileNotFoundError:
+            synced_hash = None
+
+        if synced_hash == current_hash and not os.environ.get("DS_FORCE_SYNC"):
+            return False
+
+        await self.tree.sync()
+        os.makedirs(os.path.dirname(TREE_HASH_PATH), exist_ok=True)
+        with open(TREE_HASH_PATH, mode="w") as file:
+            file.write(current_hash)
+        self.tree_synced = True
+        return True
+
+
 intents = discord.Intents.all()
 help_command = commands.DefaultHelpCommand(no_category='Non sorted commands')
 
-bot = commands.Bot(
+bot = HungerGamesBot(
     command_prefix=commands.when_mentioned_or('%'),
     case_insensitive=True,
     intents=intents,
@@ -23,11 +109,8 @@ bot.remove_command("help")
 # START
 @bot.event
 async def on_ready():
-    await bot.add_cog(General(bot))
-    await bot.add_cog(Help(bot))
-    await bot.tree.sync()
-    await bot.wait_until_ready()
     print(f'Logged in as {bot.user} (ID: {bot.user.id})')
 
 
-bot.run(TOKEN)
+if __name__ == "__main__":
+    bot.run(os.environ["DS_TOKEN"])
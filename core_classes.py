@@ -1,9 +1,60 @@
-import json
-from random import choice, random, randint
-from dataclasses import dataclass
+import hashlib
+import re
+from array import array
+from collections import deque
+from itertools import islice
+from random import Random, randrange
+from time import perf_counter
+from dataclasses import dataclass, field
+import json_codec
+from event_sampler import EventSampler
+from event_pool import event_pools
+from game_store import GameStore, JsonGameStore, NullGameStore
+from roster import TributeList, TributeRoster, TributeView
+from round_profiler import RoundProfiler
+
+
+class EventTemplate:
+    """
+    Compiled event description
+    The description is parsed once: the #TRIBUTE and #OPPRESSED placeholders are counted and the text between them is
+    stored as literal segments, so rendering an event is a single join.
+
+    - segments:...........literal text around the placeholders (always one more than the placeholders)
+    - placeholders:.......placeholders in order of appearance
+    - actives:............number of #TRIBUTE placeholders (active tributes)
+    - passives:...........number of #OPPRESSED placeholders (passive tributes)
+    """
 
+    __slots__ = ("segments", "placeholders", "actives", "passives")
 
-@dataclass
+    ACTIVE = "#TRIBUTE"
+    PASSIVE = "#OPPRESSED"
+    _SPLITTER = re.compile(f"({ACTIVE}|{PASSIVE})")
+
+    def __init__(self, description: str) -> None:
+        parts = self._SPLITTER.split(description)
+        self.segments = tuple(parts[0::2])
+        self.placeholders = tuple(parts[1::2])
+        self.actives = self.placeholders.count(self.ACTIVE)
+        self.passives = len(self.placeholders) - self.actives
+
+    @property
+    def slots(self):
+        return self.actives + self.passives
+
+    # The n-th #TRIBUTE is replaced with the n-th active name, same goes for #OPPRESSED and the passive names
+    def render(self, active_names: list, passive_names: list) -> str:
+        actives = iter(active_names)
+        passives = iter(passive_names)
+        parts = [self.segments[0]]
+        for placeholder, segment in zip(self.placeholders, self.segments[1:]):
+            parts.append(next(actives) if placeholder == self.ACTIVE else next(passives))
+            parts.append(segment)
+        return "".join(parts)
+
+
+@dataclass(frozen=True, slots=True)
 class ArenaEvent:
     """
     - description:........description of the event.
@@ -24,6 +75,13 @@ class ArenaEvent:
     probability: float
     tributes_involved: int
     severity: int
+    template: EventTemplate = field(default=None, repr=False, compare=False)
+
+    # The description is compiled when the event is loaded, rounds only use the compiled template
+    # Events are frozen (they can be shared between games), hence the object.__setattr__
+    def __post_init__(self):
+        if self.template is None:
+            object.__setattr__(self, "template", EventTemplate(self.description))
 
 
 @dataclass
@@ -56,24 +114,82 @@ class Game:
     The tool provided in the event_manager.py file provides the possibility to auto-create these json files from a csv
     This allows to create all the necessary data with applications like Google Sheets or Microsoft Excel
     Check event_manager.py for a detailed description.
+
+    Only the latest history_window rounds of the history are kept in memory, get_round() and get_rounds() read the
+    older ones from the store when they are asked for.
     """
 
-    def __init__(self, game_id: int = 0, events_pool: str = None) -> None:
+    def __init__(self, game_id: int = 0, events_pool: str = None, store: GameStore = None, seed: int = None,
+                 history_window: int = 50) -> None:
         self._game_id = game_id
-        self._players = []
+        # Struct-of-arrays roster (check roster.py), iterating it gives Tribute-like views
+        # The game owns the roster: the changes made through the views are sent to _tribute_changed()
+        self._players = TributeRoster()
+        self._players.owner = self
+        # Tribute id -> roster index
+        self._player_index = {}
+        # Roster indexes of the tributes changed since the latest save, only these ones are written by the stores that
+        # support it
+        self._dirty = set()
         self._events = []
-        self._event_history = []
+        # Path of the events file, None if the events have not been loaded from a file
+        self._events_source = None
+        # Digest of the events pool (check _get_events_digest()), None until it's needed
+        self._events_digest = None
+        # Rendered events of the latest saved rounds (the oldest ones are dropped) and number of saved rounds
+        self._history_window = deque(maxlen=history_window)
+        self._history_end = 0
+
+        # Storage backend (check game_store.py), by default the whole game is saved in data_{id}.json
+        self._store = store if store is not None else JsonGameStore()
+        self._roster_replaced = False
+
+        # Alive pool -> swap-remove array of the roster indexes of the alive tributes plus the slot of every tribute of
+        # the roster in the pool (-1 if dead), both arrays can be updated in bulk by the batch engine
+        # Kept up to date incrementally so participants can be drawn without scanning the whole roster
+        self._alive_pool = array("q")
+        self._alive_slots = array("q")
+
+        # Weighted event sampler, built again only when the events pool changes
+        self._event_sampler = None
+
+        # NumPy round engine, created on the first batch round
+        self._batch_engine = None
+
+        # Every game has its own random generator, seeded again at the start of every round with the game seed and the
+        # round number: the seed and the number of played rounds are all it takes to resume or replay a game
+        self._seed = seed
+        self._rng = Random()
+        self._rounds_played = 0
+        self._round_params = None
+        # Replay data: seed, first replayable round and the roster at that round (check replay_history())
+        self._meta = None
+        self._meta_pending = True
+        self._meta_changed = False
+        # True when the alive pool has been rebuilt in roster order since the last round (replays must do the same)
+        self._pool_rebuilt = True
+        # Opt-in instrumentation (check enable_profiling()), None -> nothing is measured
+        self._profiler = None
 
         if events_pool:
             self.import_events_from_json(events_pool)
 
-        try:
-            with open(f"./hunger_games_files/data_{self._game_id}.json", mode="r") as datafile:
-                data = json.load(datafile)
-                self.import_players_from_json(data["players"])
-                self._event_history = data["history"]
-        except FileNotFoundError:
-            pass
+        # The history is read from the store only when requested
+        players = self._store.load_players(self._game_id)
+        if players is not None:
+            self.import_players_from_json({"players": players})
+            self._roster_replaced = False
+
+        meta = self._store.load_meta(self._game_id)
+        if meta is not None:
+            self._meta = meta
+            # The events pool changed since the latest replay data, the next round stores new replay data
+            digest = meta.get("events digest")
+            self._meta_pending = digest is not None and digest != self._get_events_digest()
+            self._seed = meta["seed"]
+        self._rounds_played = self._history_end = self._store.round_count(self._game_id)
+        if self._seed is None:
+            self._seed = randrange(2 ** 63)
 
     # GAME PROPERTIES PLAYERS AND EVENTS
     @property
@@ -84,13 +200,19 @@ class Game:
     def events(self):
         return self._events
 
+    @property
+    def event_sampler(self):
+        if self._event_sampler is None:
+            self._event_sampler = EventSampler(self._events)
+        return self._event_sampler
+
     @property
     def alive_players(self):
-        alive = []
-        for player in self.players:
-            if player.alive:
-                alive.append(player)
-        return alive
+        return [self._players[index] for index in self._alive_pool]
+
+    @property
+    def alive_count(self):
+        return len(self._alive_pool)
 
     @property
     def game_size(self):
@@ -100,16 +222,135 @@ class Game:
     def id(self):
         return self._game_id
 
+    @property
+    def seed(self):
+        return self._seed
+
+    @property
+    def rounds_played(self):
+        return self._rounds_played
+
+    # Returns the tribute with the given id, None if it's not in the roster
+    def get_player(self, tribute_id: int):
+        index = self._player_index.get(tribute_id)
+        return None if index is None else self._players[index]
+
+    @property
+    def profiler(self):
+        return self._profiler
+
+    # Every round of the game, read from the store (or replayed) on every access and never kept in memory
     @property
     def event_history(self):
-        return self._event_history
+        return self.get_rounds(0)
+
+    def get_rounds(self, start: int, stop: int = None) -> list:
+        """
+        Returns the rendered events of the saved rounds from start to stop (excluded, default: the latest round)
+        Rounds start from 0, negative numbers count from the latest round like the list indexes.
+        The rounds of the in-memory window are returned straight away, the older ones are read from the store (or
+        replayed if the store doesn't keep the history, check replay_history() for the errors).
+        """
+        start, stop, _ = slice(start, stop).indices(self._history_end)
+        if start >= stop:
+            return []
+        window_start = self._history_end - len(self._history_window)
+        history = []
+        if start < window_start:
+            if self._store.keeps_history:
+                history = self._store.load_history_range(self._game_id, start, min(stop, window_start))
+            else:
+                history = self.replay_history(start=start, stop=min(stop, window_start))
+        if stop > window_start:
+            history += islice(self._history_window, max(start - window_start, 0), stop - window_start)
+        return history
+
+    # Returns the rendered events of a saved round, raises IndexError if the round has not been played
+    def get_round(self, round_number: int) -> list:
+        if not -self._history_end <= round_number < self._history_end:
+            raise IndexError(f"Round {round_number} has not been played")
+        return self.get_rounds(round_number, round_number + 1 or None)[0]
+
+    @staticmethod
+    def _export_tribute(tribute) -> dict:
+        return {
+            "id": int(tribute.id),
+            "name": str(tribute.name),
+            "district": str(tribute.district),
+            "hp": int(tribute.hp),
+            "alive": bool(tribute.alive)
+        }
 
     # Internal function to enroll player into the players list (that contains the events data in dict form)
-    def _enroll_player(self, player: Tribute) -> None:
-        self._players.append(player)
+    def _enroll_player(self, player: Tribute) -> TributeView:
+        # The batch engine arrays share the roster buffers, they must be released before the roster grows
+        self._batch_engine = None
+        self._meta_pending = True
+        view = self._players.append(player)
+        self._player_index[view.id] = view.index
+        self._dirty.add(view.index)
+        self._alive_slots.append(-1)
+        if player.alive:
+            self._add_alive(view.index)
+        return view
+
+    # ALIVE POOL
+    # Internal function to add a tribute (roster index) to the alive pool
+    def _add_alive(self, index: int) -> None:
+        self._alive_slots[index] = len(self._alive_pool)
+        self._alive_pool.append(index)
+
+    # Internal function to remove a tribute (roster index) from the alive pool in O(1)
+    # The last tribute of the pool takes the slot of the removed one
+    def _remove_alive(self, index: int) -> None:
+        slot = self._alive_slots[index]
+        if slot < 0:
+            return
+        self._alive_slots[index] = -1
+        last = self._alive_pool.pop()
+        if last != index:
+            self._alive_pool[slot] = last
+            self._alive_slots[last] = slot
+
+    # Internal function called by the roster when hp or alive are changed through a view (alive is None if only the hp
+    # changed): the tribute is saved by the next save and the alive pool follows its status
+    # The replays can't know about these changes, the next round stores new replay data
+    def _tribute_changed(self, index: int, alive) -> None:
+        self._dirty.add(index)
+        self._meta_pending = True
+        if alive is True and self._alive_slots[index] < 0:
+            self._add_alive(index)
+        elif alive is False:
+            self._remove_alive(index)
+
+    # Internal function to rebuild the alive pool from scratch (used after a roster load)
+    def _rebuild_alive_pool(self) -> None:
+        self._alive_pool = array("q", (index for index, alive in enumerate(self._players.alive) if alive))
+        self._alive_slots = array("q", [-1]) * len(self._players)
+        for slot, index in enumerate(self._alive_pool):
+            self._alive_slots[index] = slot
+        self._pool_rebuilt = True
+
+    # Internal function to draw k distinct alive tributes in O(k)
+    # Partial Fisher-Yates shuffle on the alive pool: every pick is swapped to the front of the pool
+    def _draw_alive(self, k: int) -> TributeList:
+        pool = self._alive_pool
+        slots = self._alive_slots
+        size = len(pool)
+        for i in range(k):
+            j = self._rng.randrange(i, size)
+            if i != j:
+                pool[i], pool[j] = pool[j], pool[i]
+                slots[pool[i]] = i
+                slots[pool[j]] = j
+        return TributeList(self._players, pool[:k].tolist())
 
     # Internal function to load evens from a list
     def _load_events(self, source: list) -> None:
+        # Events shared with a pool are never modified in place
+        self._events = list(self._events)
+        self._events_source = None
+        self._events_digest = None
         for item in source:
             new_event = ArenaEvent(
                 description=item["description"],
@@ -118,43 +359,72 @@ class Game:
                 severity=item["severity"]
             )
             self._events.append(new_event)
+        self._event_sampler = None
+        # The replay data of the previous events can't replay the next rounds
+        self._meta_pending = True
+
+    # Internal function to get the digest of the events pool, stored with the replay data
+    # Events files have the digest of their pool (check event_pool.py), the events loaded from a dict are hashed here
+    def _get_events_digest(self) -> str:
+        if self._events_digest is None:
+            content = json_codec.dumps([
+                [event.description, event.probability, event.tributes_involved, event.severity]
+                for event in self._events
+            ])
+            self._events_digest = hashlib.blake2b(content.encode("utf-8"), digest_size=16).hexdigest()
+        return self._events_digest
 
     # Internal functions to load the players from a list (that contains the events data in dict form)
     def _load_players(self, source: list) -> None:
         for item in source:
-            new_tribute = Tribute(
-                id=item["id"],
+            view = self._players.add(
+                tribute_id=item["id"],
                 name=item["name"],
                 district=item["district"],
                 hp=item["hp"],
                 alive=item["alive"]
             )
-            self._players.append(new_tribute)
+            self._player_index[view.id] = view.index
+        self._rebuild_alive_pool()
 
     # Method to load an event list from a json
+    # Events files are loaded through the shared events pool registry (check event_pool.py), games using the same file
+    # share the same events and event sampler
+    # The file can also be a binary events pack (check event_pack.py), memory mapped and decoded one event at a time
     def import_events_from_json(self, source) -> None:
         self._events = []
+        self._events_source = None
+        self._events_digest = None
+        self._event_sampler = None
+        self._batch_engine = None
+        self._meta_pending = True
         if isinstance(source, str):
             try:
-                with open(source, mode="r") as file:
-                    data = json.load(file)
-            except FileNotFoundError:
+                pool = event_pools.get(source)
+            except (FileNotFoundError, KeyError):
                 pass
             else:
-                try:
-                    self._load_events(data["events"])
-                except KeyError:
-                    pass
+                self._events = pool.events
+                self._events_source = source
+                self._events_digest = pool.digest
+                self._event_sampler = pool.sampler
         elif isinstance(source, dict):
             self._load_events(source["events"])
 
     # Method to load players from a json
     def import_players_from_json(self, source) -> None:
-        self._players = []
+        self._players = TributeRoster()
+        self._players.owner = self
+        self._player_index = {}
+        # The whole roster is written by the next save
+        self._dirty = set()
+        self._roster_replaced = True
+        self._meta_pending = True
+        self._batch_engine = None
+        self._rebuild_alive_pool()
         if isinstance(source, str):
             try:
-                with open(source, mode="r") as file:
-                    data = json.load(file)
+                data = json_codec.read_file(source)
             except FileNotFoundError:
                 pass
             else:
@@ -165,102 +435,316 @@ class Game:
         elif isinstance(source, dict):
             self._load_players(source["players"])
 
-    def save_players_stats(self, latest_events):
-        for index, event in enumerate(latest_events):
-            latest_events[index] = event["event"]
-
-        output = {"id": self.id, "players": [], "history": self.event_history, "latest": latest_events}
-
-        for tribute in self.players:
-            output["players"].append({
-                "id": int(tribute.id),
-                "name": str(tribute.name),
-                "district": str(tribute.district),
-                "hp": int(tribute.hp),
-                "alive": bool(tribute.alive)
-            })
+    # params -> parameters of the saved round, by default the ones of the latest played round
+    def save_players_stats(self, latest_events, params: dict = None):
+        profiler = self._profiler
+        if profiler is not None:
+            started = perf_counter()
 
-        output["history"].append(latest_events)
+        # Tributes changed since the latest save, the stores that support it only write these ones
+        changed = [self._export_tribute(self._players[index]) for index in sorted(self._dirty)]
+        self._dirty.clear()
 
-        with open(f"./hunger_games_files/data_{self.id}.json", mode="w") as file:
-            json.dump(output, file, indent=4)
+        for index, event in enumerate(latest_events):
+            latest_events[index] = event["event"]
 
-    # Game execution
-    def execute_game(self, minimum_events: int = 8, max_events: int = 12) -> list:
-
-        pulled_events = []
-
-        def _understand_event(event: ArenaEvent):
-            event_actives = event.description.count("#TRIBUTE")
-            event_passives = event.description.count("#OPPRESSED")
-            return event_actives, event_passives
-
-        def _get_event_players(event: ArenaEvent):
-            actives, passives = _understand_event(event)
-
-            event_active_players = []
-            event_passive_players = []
-
-            # If not enough alive players the event can't be executed
-            if actives + passives > len(self.alive_players):
-                return [], []
-
-            # PASSIVE PLAYERS EXTRACTION
-            while len(event_passive_players) < passives:
-                new_player = choice(self.alive_players)
-                while new_player in event_active_players:
-                    new_player = choice(self.alive_players)
-                event_passive_players.append(new_player)
-
-            # ACTIVE PLAYERS EXTRACTION
-            while len(event_active_players) < actives:
-                new_player = choice(self.alive_players)
-                while new_player in event_active_players or new_player in event_passive_players:
-                    new_player = choice(self.alive_players)
-                event_active_players.append(new_player)
-
-            return event_active_players, event_passive_players
-
-        for _ in range(randint(minimum_events, max_events)):
-            new_event = choice(self.events)
-            active_players, passive_players = _get_event_players(new_event)
-
-            if not active_players or not passive_players:
-                continue
-
-            # Decider -> Random number that will be compared with the base event probability
-            # If the decider is less or equal to the probability the event will be pulled and executed
-            decider = random()
-            if decider <= new_event.probability:
-                pulled_events.append(
-                    {
-                        "event": new_event.description,
-                        "active": active_players,
-                        "passive": passive_players
-                    }
-                )
-
-                # Saving changes to main player stream
-                for player in passive_players:
-                    player.hp -= new_event.severity
-                    if player.hp < 0:
-                        player.hp = 0
-                        player.alive = False
-                    for index, entity in enumerate(self._players):
-                        if entity is player:
-                            self._players[index] = player
+        self._store.save_round(
+            self.id,
+            players=lambda: [self._export_tribute(tribute) for tribute in self.players],
+            changed=changed,
+            latest_events=latest_events,
+            roster_replaced=self._roster_replaced,
+            params=params if params is not None else self._round_params,
+            meta=self._meta if self._meta_changed else None
+        )
+        self._roster_replaced = False
+        self._meta_changed = False
+
+        self._history_window.append(latest_events)
+        self._history_end += 1
+
+        if profiler is not None:
+            profiler.add_time("persistence", perf_counter() - started)
+            profiler.saves += 1
+
+    # Classic round engine -> one event at a time, tributes are updated as soon as an event is executed
+    # Generator: every pulled event is given back as soon as it has been executed
+    def _iter_classic_round(self, minimum_events: int, max_events: int):
+        sampler = self.event_sampler
+
+        # The batch engine arrays don't know about these changes
+        self._batch_engine = None
+
+        for _ in range(self._rng.randint(minimum_events, max_events)):
+            # The sampler already takes care of the event probability and never returns an event that needs more
+            # tributes than the alive ones
+            new_event = sampler.draw(self.alive_count, self._rng.random)
+            if new_event is not None:
+                # Passive players are the first ones drawn, the active players follow
+                passives = new_event.template.passives
+                drawn = self._draw_alive(new_event.template.slots)
+                active_players, passive_players = drawn[passives:], drawn[:passives]
+
+                self._apply_damage(passive_players, new_event.severity)
+
+                yield {
+                    "event": new_event,
+                    "active": active_players,
+                    "passive": passive_players
+                }
+
+    # Same round of _iter_classic_round() (same random numbers, same results), with the timings and the draw outcomes
+    # recorded by the profiler
+    def _iter_classic_round_profiled(self, minimum_events: int, max_events: int):
+        profiler = self._profiler
+        sampler = self.event_sampler
+        self._batch_engine = None
+
+        for _ in range(self._rng.randint(minimum_events, max_events)):
+            started = perf_counter()
+            new_event, outcome = sampler.draw_outcome(self.alive_count, self._rng.random)
+            selected = perf_counter()
+            profiler.add_time("event selection", selected - started)
+            profiler.count_draw(outcome)
+
+            if new_event is not None:
+                passives = new_event.template.passives
+                drawn = self._draw_alive(new_event.template.slots)
+                active_players, passive_players = drawn[passives:], drawn[:passives]
+                sampled = perf_counter()
+                profiler.add_time("participant sampling", sampled - selected)
+
+                self._apply_damage(passive_players, new_event.severity)
+                profiler.add_time("damage", perf_counter() - sampled)
+
+                yield {
+                    "event": new_event,
+                    "active": active_players,
+                    "passive": passive_players
+                }
+
+    # Saving changes to main player stream
+    # The roster buffers are written directly (a round is not a change of the replay data), the changed tributes and
+    # the alive pool are updated here
+    def _apply_damage(self, passive_players: TributeList, severity: int) -> None:
+        hp = self._players.hp
+        for index in passive_players.indexes:
+            self._dirty.add(index)
+            hp[index] -= severity
+            # A tribute dies only when its hp go below 0 (a tribute with 0 hp is still alive)
+            if hp[index] < 0:
+                hp[index] = 0
+                self._players.alive[index] = False
+                self._remove_alive(index)
+
+    def _play_classic_round(self, minimum_events: int, max_events: int) -> list:
+        return list(self._iter_classic_round(minimum_events, max_events))
+
+    # Internal function to store the replay data if the roster or the events changed since the latest one
+    # The replays start from the roster order, so the alive pool is rebuilt in the same order
+    def _capture_meta(self) -> None:
+        if self._meta_pending:
+            self._rebuild_alive_pool()
+            self._meta = {
+                "seed": self._seed,
+                "start round": self._rounds_played,
+                "initial players": [self._export_tribute(tribute) for tribute in self.players],
+                "events digest": self._get_events_digest()
+            }
+            self._meta_pending = False
+            self._meta_changed = True
+
+    # Internal function to play a round without saving it
+    # Generator: gives back the pulled events, one at a time, with the rendered description in "event", the ArenaEvent
+    # in "arena_event" and the tributes in "active" and "passive"
+    # !! The round counts as played only when the generator is exhausted !!
+    def _iter_round(self, minimum_events: int, max_events: int, engine: str):
+        if engine not in ("classic", "batch"):
+            raise ValueError(f"Unknown game engine: {engine}")
+
+        self._capture_meta()
+        self._round_params = {
+            "minimum events": minimum_events,
+            "max events": max_events,
+            "engine": engine,
+            "fresh pool": self._pool_rebuilt
+        }
+        self._pool_rebuilt = False
+        self._rng.seed(f"{self._seed}:{self._rounds_played}")
+
+        profiler = self._profiler
+        if engine == "batch":
+            # Imported here, NumPy is loaded only by the games that use the batch engine
+            from batch_engine import BatchEngine
+            # Rounds the batch engine is not faster for are played by the classic one (check batch_engine.py)
+            if not BatchEngine.suits(max_events, self.alive_count):
+                engine = "classic"
+                self._round_params["engine"] = engine
+        if engine == "classic":
+            if profiler is None:
+                pulled_events = self._iter_classic_round(minimum_events, max_events)
+            else:
+                pulled_events = self._iter_classic_round_profiled(minimum_events, max_events)
+        else:
+            if self._batch_engine is None:
+                self._batch_engine = BatchEngine(self)
+            self._batch_engine.reseed(self._rng.getrandbits(63))
+            if profiler is not None:
+                started = perf_counter()
+            pulled_events = self._batch_engine.play_round(minimum_events, max_events)
+            if profiler is not None:
+                profiler.add_time("batch engine", perf_counter() - started)
 
         for event in pulled_events:
-            for i in range(len(event["active"])):
-                event["event"] = event["event"].replace("#TRIBUTE", event["active"][i].name, i + 1)
+            if profiler is not None:
+                started = perf_counter()
+            event["arena_event"] = event["event"]
+            event["event"] = event["event"].template.render(event["active"].names, event["passive"].names)
+            if profiler is not None:
+                profiler.add_time("rendering", perf_counter() - started)
+            yield event
+
+        self._rounds_played += 1
+        if profiler is not None:
+            profiler.rounds += 1
+
+    # Internal function to play a whole round without saving it, check _iter_round()
+    def _play_round(self, minimum_events: int, max_events: int, engine: str) -> list:
+        return list(self._iter_round(minimum_events, max_events, engine))
+
+    def replay_history(self, engine: str = None, start: int = 0, stop: int = None) -> list:
+        """
+        Rebuilds the rendered events of the played rounds from the seed, the replay data and the saved round params
+        Nothing is saved and the game is not modified.
+        - engine:.............replays every round with this engine instead of the original one (A/B comparisons)
+        - start, stop:........rounds returned, like get_rounds() (default: every round)
+
+        The replay stops at stop and only the rounds from start on are kept in memory.
+        Rounds played before the latest roster or events import can't be replayed and are returned as empty lists.
+        !! Raises ValueError if the events pool is not the one the rounds have been played with (its digest is stored
+        with the replay data), the replay would give back different rounds !!
+        """
+        start, stop, _ = slice(start, stop).indices(self._rounds_played)
+        if start >= stop:
+            return []
+        if self._meta is None:
+            return [[] for _ in range(start, stop)]
+        digest = self._meta.get("events digest")
+        if digest is not None and digest != self._get_events_digest():
+            raise ValueError(f"The rounds of game {self._game_id} have been played with another events pool")
+
+        first_round = self._meta["start round"]
+        replay = Game(game_id=self._game_id, store=NullGameStore(), seed=self._meta["seed"])
+        replay._events, replay._event_sampler = self._events, self.event_sampler
+        replay.import_players_from_json({"players": self._meta["initial players"]})
+        replay._rounds_played = first_round
+        replay._meta_pending = False
+
+        history = [[] for _ in range(start, min(stop, first_round))]
+        round_params = islice(self._store.load_round_params(self._game_id), first_round, stop)
+        for round_number, params in enumerate(round_params, start=first_round):
+            if params["fresh pool"]:
+                replay._rebuild_alive_pool()
+            pulled_events = replay._play_round(params["minimum events"], params["max events"],
+                                               engine or params["engine"])
+            if round_number >= start:
+                history.append([event["event"] for event in pulled_events])
+
+        return history
 
-            for i in range(len(event["passive"])):
-                event["event"] = event["event"].replace("#OPPRESSED", event["passive"][i].name, i + 1)
+    # Game execution
+    def enable_profiling(self, profiler: RoundProfiler = None) -> RoundProfiler:
+        """
+        Starts measuring the rounds of the game, check round_profiler.py for the collected stats
+        A profiler can be given to share it between many games, returns the profiler in use
+        """
+        self._profiler = profiler if profiler is not None else RoundProfiler()
+        return self._profiler
+
+    def disable_profiling(self) -> RoundProfiler:
+        """Stops measuring the rounds, returns the detached profiler (None if profiling was not enabled)"""
+        profiler, self._profiler = self._profiler, None
+        return profiler
+
+    # engine="classic" -> event by event execution (default)
+    # engine="batch"...-> NumPy round engine, check batch_engine.py for the differences between the two
+    def execute_game(self, minimum_events: int = 8, max_events: int = 12, engine: str = "classic") -> list:
+        pulled_events = self._play_round(minimum_events, max_events, engine)
 
         self.save_players_stats(pulled_events)
 
         return pulled_events
 
+    # Streaming game execution
+    def stream_game(self, minimum_events: int = 8, max_events: int = 12, engine: str = "classic", rounds: int = 1,
+                    checkpoint_every: int = None):
+        """
+        Generator version of execute_game(): every rendered event is given back as soon as it has been executed
+        The played rounds are saved all together at the end, or every checkpoint_every rounds.
+        - rounds:.............number of rounds to play
+        - checkpoint_every:...number of rounds between two saves (default: save only at the end)
+
+        If the caller stops iterating in the middle of a round, the round is completed (without giving back the
+        remaining events) and saved, so the saved game always contains whole rounds.
+        A round that raises an error is not saved (the rounds completed before it are), the error is raised again.
+        """
+        unsaved_rounds = []
+        try:
+            for _ in range(rounds):
+                pulled_events = []
+                round_events = self._iter_round(minimum_events, max_events, engine)
+                try:
+                    for event in round_events:
+                        pulled_events.append(event)
+                        yield event["event"]
+                except GeneratorExit:
+                    # Completing the round if the caller stopped iterating
+                    pulled_events.extend(round_events)
+                    unsaved_rounds.append((pulled_events, self._round_params))
+                    raise
+                # A round that raised is never queued, only whole rounds are saved
+                unsaved_rounds.append((pulled_events, self._round_params))
+
+                if checkpoint_every and len(unsaved_rounds) >= checkpoint_every:
+                    self._save_rounds(unsaved_rounds)
+        finally:
+            self._save_rounds(unsaved_rounds)
+
+    # Async version of stream_game(), the event loop gets back the control after every event and the saves are written
+    # in the default executor of the loop
+    async def astream_game(self, minimum_events: int = 8, max_events: int = 12, engine: str = "classic",
+                           rounds: int = 1, checkpoint_every: int = None):
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        unsaved_rounds = []
+        try:
+            for _ in range(rounds):
+                pulled_events = []
+                round_events = self._iter_round(minimum_events, max_events, engine)
+                try:
+                    for event in round_events:
+                        pulled_events.append(event)
+                        yield event["event"]
+                        await asyncio.sleep(0)
+                except (GeneratorExit, asyncio.CancelledError):
+                    pulled_events.extend(round_events)
+                    unsaved_rounds.append((pulled_events, self._round_params))
+                    raise
+                unsaved_rounds.append((pulled_events, self._round_params))
+
+                if checkpoint_every and len(unsaved_rounds) >= checkpoint_every:
+                    await loop.run_in_executor(None, self._save_rounds, unsaved_rounds)
+        finally:
+            if unsaved_rounds:
+                await loop.run_in_executor(None, self._save_rounds, unsaved_rounds)
+
+    # Internal function to save the rounds played by a stream, the list is emptied
+    def _save_rounds(self, unsaved_rounds: list) -> None:
+        while unsaved_rounds:
+            pulled_events, params = unsaved_rounds.pop(0)
+            self.save_players_stats(pulled_events, params)
+
 
 if __name__ == "__main__":
     game = Game(
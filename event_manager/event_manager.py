@@ -1,6 +1,8 @@
-import json
-import pandas as pd
+import os
+
+import json_codec
 from core_classes import ArenaEvent, Tribute
+from event_pack import write_event_pack
 
 
 class EventManager:
@@ -54,9 +56,32 @@ class EventManager:
         ]
     }
     
+    The create_*_from_csv() methods stream the conversion: the CSV is read in chunks of chunk_size rows, every chunk is
+    validated and converted column by column and written to the JSON file straight away, so the memory used doesn't
+    depend on the size of the CSV (the created_events and created_players lists are not filled by them).
+    A row with a missing or invalid value raises a ValueError with its line number in the CSV.
+
+    The created_events and created_players lists are written in the file_format format ("indent", "compact" or
+    "gzip", check json_codec.py), the Game loads all of them.
+
+    EVENTS PACK
+    create_event_pack() converts an events CSV or json file to the binary events pack format (check event_pack.py),
+    made for catalogues of hundreds of thousands of events: the Game memory maps the pack instead of building all the
+    events, and the processes that load the same pack share its memory.
     """
 
-    def __init__(self):
+    # Columns of the CSV files and the JSON key they are written to
+    EVENT_COLUMNS = {"description": "description", "probability": "probability",
+                     "tributes_involved": "tributes involved", "severity": "severity"}
+    PLAYER_COLUMNS = {"id": "id", "name": "name", "district": "district", "hp": "hp", "alive": "alive"}
+    TRUE_VALUES = ("true", "1", "yes", "y", "t")
+    FALSE_VALUES = ("false", "0", "no", "n", "f")
+
+    def __init__(self, chunk_size: int = 50_000, file_format: str = "indent"):
+        if file_format not in json_codec.FORMATS:
+            raise ValueError(f"Unknown file format: {file_format}")
+        self.chunk_size = chunk_size
+        self.file_format = file_format
         self.created_events = []
         self.created_players = []
 
@@ -91,8 +116,7 @@ class EventManager:
                 "severity": int(event.severity)
             })
 
-        with open(destination_filepath, mode="w") as file:
-            json.dump(output, file, indent=4)
+        json_codec.write_file(destination_filepath, output, self.file_format)
 
     def _dump_players(self, destination_filepath):
         output = {"players": []}
@@ -106,32 +130,123 @@ class EventManager:
                 "alive": bool(tribute.alive)
             })
 
-        with open(destination_filepath, mode="w") as file:
-            json.dump(output, file, indent=4)
-
-    # Method to create an event json file from csv
-    def create_events_from_csv(self, filepath, destination_path):
-        df = pd.read_csv(filepath)
-        for row in range(len(df)):
-            self._create_event(
-                description=df["description"][row],
-                probability=df["probability"][row],
-                tributes_involved=df["tributes_involved"][row],
-                severity=df["severity"][row]
-            )
-
-        self._dump_events(destination_path)
-
-    # Method to create a player json file from csv
-    def create_players_from_csv(self, filepath, destination_path):
-        df = pd.read_csv(filepath)
-        for row in range(len(df)):
-            self._create_player(
-                player_id=df["id"][row],
-                name=df["name"][row],
-                district=df["district"][row],
-                hp=df["hp"][row],
-                alive=df["alive"][row]
-            )
-
-        self._dump_players(destination_path)
+        json_codec.write_file(destination_filepath, output, self.file_format)
+
+    # INTERNAL FUNCTIONS FOR THE STREAMING CONVERSION
+    @staticmethod
+    def _check(chunk, invalid, column: str) -> None:
+        if invalid.any():
+            # Line number in the CSV file, the header is line 1
+            line = int(chunk.index[invalid.to_numpy()][0]) + 2
+            raise ValueError(f"Invalid or missing '{column}' value at line {line}")
+
+    def _to_number(self, chunk, column: str, integer: bool):
+        import pandas as pd
+
+        values = chunk[column]
+        # Columns already parsed as numbers by the CSV reader skip the string conversion
+        if not pd.api.types.is_numeric_dtype(values) or pd.api.types.is_bool_dtype(values):
+            values = pd.to_numeric(values, errors="coerce")
+        invalid = values.isna()
+        if integer:
+            invalid |= values.notna() & (values % 1 != 0)
+        self._check(chunk, invalid, column)
+        return values.astype("int64") if integer else values.astype("float64")
+
+    def _to_text(self, chunk, column: str):
+        self._check(chunk, chunk[column].isna(), column)
+        return chunk[column].astype(str)
+
+    def _to_bool(self, chunk, column: str):
+        values = chunk[column]
+        if values.dtype == bool:
+            return values
+        values = values.astype(str).str.strip().str.lower()
+        truth = values.isin(self.TRUE_VALUES)
+        self._check(chunk, ~(truth | values.isin(self.FALSE_VALUES)), column)
+        return truth
+
+    # Reads the CSV chunk by chunk
+    def _read_csv(self, filepath, columns: dict, text_columns: tuple):
+        # pandas takes a long time to import, it's imported only when a conversion is actually done
+        import pandas as pd
+
+        return pd.read_csv(filepath, usecols=list(columns), dtype={column: str for column in text_columns},
+                           keep_default_na=False, na_values=[""], chunksize=self.chunk_size)
+
+    # Reads the CSV chunk by chunk, converts every chunk with the converter and writes it as soon as it's ready
+    def _stream_csv(self, filepath, destination_path, key: str, columns: dict, text_columns: tuple, converter) -> int:
+        written = 0
+        reader = self._read_csv(filepath, columns, text_columns)
+
+        # Written to a temporary file renamed when it's complete, a bad row never leaves a truncated file behind
+        temporary_path = f"{destination_path}.tmp"
+        try:
+            with open(temporary_path, mode="w", encoding="utf-8") as file:
+                file.write(f'{{"{key}": [')
+                for chunk in reader:
+                    if chunk.empty:
+                        continue
+                    records = converter(chunk).rename(columns=columns)[list(columns.values())]
+                    # One JSON object per line, the lines of every chunk are then joined with commas
+                    lines = records.to_json(orient="records", lines=True, force_ascii=False).rstrip("\n")
+                    file.write(",\n" if written else "\n")
+                    file.write(lines.replace("\n", ",\n"))
+                    written += len(records)
+                file.write("\n]}\n" if written else "]}\n")
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temporary_path, destination_path)
+        except BaseException:
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+            raise
+
+        return written
+
+    def _convert_events(self, chunk):
+        import pandas as pd
+
+        return pd.DataFrame({
+            "description": self._to_text(chunk, "description"),
+            "probability": self._to_number(chunk, "probability", integer=False),
+            "tributes_involved": self._to_number(chunk, "tributes_involved", integer=True),
+            "severity": self._to_number(chunk, "severity", integer=True)
+        })
+
+    def _convert_players(self, chunk):
+        import pandas as pd
+
+        return pd.DataFrame({
+            "id": self._to_number(chunk, "id", integer=True),
+            "name": self._to_text(chunk, "name"),
+            "district": self._to_text(chunk, "district"),
+            "hp": self._to_number(chunk, "hp", integer=True),
+            "alive": self._to_bool(chunk, "alive")
+        })
+
+    # Method to create an event json file from csv, returns the number of events written
+    def create_events_from_csv(self, filepath, destination_path) -> int:
+        return self._stream_csv(filepath, destination_path, "events", self.EVENT_COLUMNS, ("description",),
+                                self._convert_events)
+
+    # Events of the CSV as dicts with the keys of the json events files, converted chunk by chunk
+    def _iter_csv_events(self, filepath):
+        for chunk in self._read_csv(filepath, self.EVENT_COLUMNS, ("description",)):
+            if chunk.empty:
+                continue
+            records = self._convert_events(chunk).rename(columns=self.EVENT_COLUMNS)
+            yield from records.to_dict(orient="records")
+
+    # Method to create a binary events pack from an events csv or json file, returns the number of events written
+    def create_event_pack(self, filepath, destination_path) -> int:
+        if str(filepath).lower().endswith(".csv"):
+            events = self._iter_csv_events(filepath)
+        else:
+            events = json_codec.read_file(filepath)["events"]
+        return write_event_pack(destination_path, events)
+
+    # Method to create a player json file from csv, returns the number of players written
+    def create_players_from_csv(self, filepath, destination_path) -> int:
+        return self._stream_csv(filepath, destination_path, "players", self.PLAYER_COLUMNS,
+                                ("name", "district"), self._convert_players)
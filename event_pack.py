@@ -0,0 +1,187 @@
+"""
+Binary events pool format, made for very large read-only events catalogues
+The file is memory mapped: the processes that load the same pack share its pages, and an ArenaEvent is built only when
+the event is pulled (the sampler and the batch engine only read the index).
+
+Layout (little endian, the only byte order the columns are read in):
+- header:.............magic "HGEP", version, flags, number of events, offset of the descriptions blob, blake2b digest
+                      of everything after the header
+- index:..............one fixed-width column for each field, every column starts at a multiple of 8 bytes
+    - probability:....float64
+    - offsets:........uint64, start of every description in the blob (one more than the events, the last one is the
+                      size of the blob)
+    - severity:.......int32
+    - tributes:.......uint16, "tributes involved" of the events file
+    - actives:........uint16, #TRIBUTE placeholders of the description
+    - passives:.......uint16, #OPPRESSED placeholders of the description
+- blob:...............UTF-8 descriptions, one after the other
+
+Packs are built by EventManager.create_event_pack() or write_event_pack(), and loaded by Game.import_events_from_json()
+like the json events files (the format is detected from the magic).
+"""
+
+import hashlib
+import mmap
+import struct
+import sys
+from array import array
+
+import json_codec
+
+MAGIC = b"HGEP"
+VERSION = 1
+# magic, version, flags, events, blob offset, digest
+HEADER = struct.Struct("<4sHHQQ16s")
+# Column name, array typecode
+COLUMNS = (("probability", "d"), ("offsets", "Q"), ("severity", "i"), ("tributes", "H"), ("actives", "H"),
+           ("passives", "H"))
+
+
+def is_event_pack(path: str) -> bool:
+    try:
+        with open(path, mode="rb") as file:
+            return file.read(len(MAGIC)) == MAGIC
+    except (FileNotFoundError, IsADirectoryError):
+        return False
+
+
+# Internal function to get the position of every column, returns ({column: (start, end)}, blob offset)
+def _layout(count: int) -> tuple:
+    positions = {}
+    position = HEADER.size
+    for name, typecode in COLUMNS:
+        length = (count + 1 if name == "offsets" else count) * array(typecode).itemsize
+        positions[name] = (position, position + length)
+        # Next column aligned to 8 bytes
+        position += length + (-length) % 8
+    return positions, position
+
+
+def write_event_pack(path: str, events) -> int:
+    """
+    Writes the events to a pack file (atomically), returns the number of events written
+    events: iterable of dicts with the keys of the json events files (description, probability, tributes involved,
+    severity)
+    Raises ValueError if the severity of an event is not an integer and OSError on big endian machines
+    """
+    # Imported here, core_classes imports event_pool which imports this module
+    from core_classes import EventTemplate
+
+    if sys.byteorder != "little":
+        raise OSError("Events packs can only be written on little endian machines")
+    columns = {name: array(typecode) for name, typecode in COLUMNS}
+    blob = bytearray()
+    columns["offsets"].append(0)
+    for item in events:
+        severity = item["severity"]
+        if severity != int(severity):
+            raise ValueError(f"The severity of an event must be an integer: {item['description']!r} has {severity}")
+        template = EventTemplate(item["description"])
+        blob += item["description"].encode("utf-8")
+        columns["probability"].append(float(item["probability"]))
+        columns["offsets"].append(len(blob))
+        columns["severity"].append(int(severity))
+        columns["tributes"].append(int(item["tributes involved"]))
+        columns["actives"].append(template.actives)
+        columns["passives"].append(template.passives)
+
+    count = len(columns["probability"])
+    positions, blob_offset = _layout(count)
+    body = bytearray(blob_offset - HEADER.size)
+    for name, _ in COLUMNS:
+        start, end = positions[name]
+        body[start - HEADER.size:end - HEADER.size] = columns[name].tobytes()
+    body += blob
+    digest = hashlib.blake2b(body, digest_size=16).digest()
+
+    json_codec.write_bytes(path, HEADER.pack(MAGIC, VERSION, 0, count, blob_offset, digest) + body)
+    return count
+
+
+class EventPack:
+    """
+    Read-only events pool backed by a memory mapped pack file, used as the events list of a Game
+    - probability, severity, tributes, actives, passives: columns of the index (memoryviews of the file)
+    - digest:.............hex digest of the file content
+
+    It behaves like a tuple of ArenaEvent objects: len(pack), pack[index] and iteration. An event is decoded the first
+    time it's asked for and then kept, so the same index always returns the same object.
+    The mapping stays valid if the file is replaced (write_event_pack() writes a new file and renames it), a pack file
+    must never be modified in place.
+    """
+
+    __slots__ = ("path", "digest", "probability", "severity", "tributes", "actives", "passives", "_offsets", "_blob",
+                 "_count", "_map", "_decoded")
+
+    def __init__(self, path: str) -> None:
+        if sys.byteorder != "little":
+            raise OSError("Events packs can only be read on little endian machines")
+        self.path = path
+        with open(path, mode="rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, _, count, blob_offset, digest = HEADER.unpack_from(self._map)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not an events pack")
+        if version != VERSION:
+            raise ValueError(f"Unsupported events pack version: {version}")
+        positions, expected_offset = _layout(count)
+        if blob_offset != expected_offset or len(self._map) < blob_offset:
+            raise ValueError(f"{path} is truncated or corrupted")
+
+        view = memoryview(self._map)
+        columns = {name: view[start:end].cast(typecode) for (name, typecode), (start, end)
+                   in zip(COLUMNS, positions.values())}
+        self.probability = columns["probability"]
+        self.severity = columns["severity"]
+        self.tributes = columns["tributes"]
+        self.actives = columns["actives"]
+        self.passives = columns["passives"]
+        self._offsets = columns["offsets"]
+        self._blob = view[blob_offset:]
+        self._count = count
+        self.digest = digest.hex()
+        self._decoded = {}
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        for index in range(self._count):
+            yield self[index]
+
+    def __getitem__(self, index: int):
+        if isinstance(index, slice):
+            return [self[position] for position in range(*index.indices(self._count))]
+        event = self._decoded.get(index)
+        if event is None:
+            event = self._decode(index)
+        return event
+
+    # Internal function to build the event the first time it's asked for
+    def _decode(self, index: int):
+        # Imported here, core_classes imports event_pool which imports this module
+        from core_classes import ArenaEvent
+
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("event index out of range")
+        event = self._decoded.get(index)
+        if event is None:
+            event = self._decoded[index] = ArenaEvent(
+                description=self.description(index),
+                probability=self.probability[index],
+                tributes_involved=self.tributes[index],
+                severity=self.severity[index]
+            )
+        return event
+
+    def description(self, index: int) -> str:
+        return bytes(self._blob[self._offsets[index]:self._offsets[index + 1]]).decode("utf-8")
+
+    # Tributes needed by every event
+    @property
+    def decoded(self):
+        """Events decoded so far"""
+        return len(self._decoded)
@@ -0,0 +1,132 @@
+import hashlib
+import os
+import threading
+
+import json_codec
+from event_pack import EventPack, MAGIC
+from event_sampler import EventSampler
+
+
+class EventPool:
+    """
+    Immutable events table shared by every Game that uses the same events file
+    - events:.............tuple of frozen ArenaEvent objects, or the EventPack of a binary events file
+    - digest:.............hash of the file content the pool has been built from
+    - sampler:............EventSampler of the pool, built on first use and shared as well
+    """
+
+    __slots__ = ("events", "digest", "_sampler")
+
+    def __init__(self, events: tuple, digest: str) -> None:
+        self.events = events
+        self.digest = digest
+        self._sampler = None
+
+    @property
+    def sampler(self) -> EventSampler:
+        if self._sampler is None:
+            if isinstance(self.events, EventPack):
+                # Built from the index of the pack, the events are not decoded
+                self._sampler = EventSampler(self.events, self.events.probability, self.events.actives,
+                                             self.events.passives)
+            else:
+                self._sampler = EventSampler(self.events)
+        return self._sampler
+
+    @classmethod
+    def from_json(cls, content: bytes, digest: str):
+        # Imported here, core_classes imports this module
+        from core_classes import ArenaEvent
+
+        data = json_codec.loads(content)
+        events = tuple(
+            ArenaEvent(
+                description=item["description"],
+                probability=item["probability"],
+                tributes_involved=item["tributes involved"],
+                severity=item["severity"]
+            )
+            for item in data["events"]
+        )
+        return cls(events, digest)
+
+    @classmethod
+    def from_pack(cls, path: str):
+        events = EventPack(path)
+        return cls(events, events.digest)
+
+
+class EventPoolRegistry:
+    """
+    Process-wide cache of the events pools, keyed by the real path of the events file
+    A cached pool is reused as long as the file doesn't change:
+    - same modification time and size:...the pool is returned without reading the file
+    - different modification time:.......the file is read and hashed, the pool is rebuilt only if the content changed
+    Binary events packs (check event_pack.py) are memory mapped instead of read, their digest is stored in the header.
+
+    Counters:
+    - hits:...............requests served with an already built pool
+    - misses:.............requests that had to parse the file
+    """
+
+    def __init__(self) -> None:
+        self._pools = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, path: str) -> EventPool:
+        """
+        Returns the pool of the events file
+        Raises FileNotFoundError if the file doesn't exist and KeyError if the file has no "events" list
+        """
+        key = os.path.realpath(path)
+        status = os.stat(key)
+        signature = (status.st_mtime_ns, status.st_size)
+
+        with self._lock:
+            cached = self._pools.get(key)
+            if cached is not None and cached[0] == signature:
+                self.hits += 1
+                return cached[1]
+
+        with open(key, mode="rb") as file:
+            if file.read(len(MAGIC)) == MAGIC:
+                content = None
+            else:
+                file.seek(0)
+                content = file.read()
+        if content is None:
+            pack_pool = EventPool.from_pack(key)
+            digest = pack_pool.digest
+        else:
+            digest = hashlib.blake2b(content, digest_size=16).hexdigest()
+
+        with self._lock:
+            cached = self._pools.get(key)
+            if cached is not None and cached[1].digest == digest:
+                # File touched but not changed
+                self._pools[key] = (signature, cached[1])
+                self.hits += 1
+                return cached[1]
+
+            pool = pack_pool if content is None else EventPool.from_json(content, digest)
+            self._pools[key] = (signature, pool)
+            self.misses += 1
+            return pool
+
+    def invalidate(self, path: str = None) -> None:
+        with self._lock:
+            if path is None:
+                self._pools.clear()
+            else:
+                self._pools.pop(os.path.realpath(path), None)
+
+    @property
+    def stats(self) -> dict:
+        with self._lock:
+            return {"pools": len(self._pools), "hits": self.hits, "misses": self.misses}
+
+
+# Registry shared by every Game of the process
+event_pools = EventPoolRegistry()
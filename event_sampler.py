@@ -0,0 +1,141 @@
+from array import array
+from bisect import bisect_right
+from random import random
+
+
+class AliasTable:
+    """
+    Walker/Vose alias table
+    Draws an index with probability proportional to its weight in O(1), whatever the number of weights.
+    The table is built in O(n) with Vose's method, the cutoffs and aliases are then kept in compact arrays.
+    """
+
+    __slots__ = ("items", "cutoffs", "aliases")
+
+    def __init__(self, items: list, weights: list) -> None:
+        size = len(items)
+        total = sum(weights)
+        self.items = items
+        self.cutoffs = [1.0] * size
+        self.aliases = list(range(size))
+
+        # Weights are scaled so that the average bucket is exactly 1
+        scaled = [weight * size / total for weight in weights]
+        small = [index for index, weight in enumerate(scaled) if weight < 1.0]
+        large = [index for index, weight in enumerate(scaled) if weight >= 1.0]
+
+        while small and large:
+            low = small.pop()
+            high = large.pop()
+            self.cutoffs[low] = scaled[low]
+            self.aliases[low] = high
+            scaled[high] = (scaled[high] + scaled[low]) - 1.0
+            if scaled[high] < 1.0:
+                small.append(high)
+            else:
+                large.append(high)
+
+        # Leftovers are full buckets (only floating point errors can leave something here)
+        for index in small + large:
+            self.cutoffs[index] = 1.0
+        self.cutoffs = array("d", self.cutoffs)
+        self.aliases = array("q", self.aliases)
+
+    def draw(self, rand=random):
+        position = rand() * len(self.items)
+        index = int(position)
+        if position - index < self.cutoffs[index]:
+            return self.items[index]
+        return self.items[self.aliases[index]]
+
+
+class EventSampler:
+    """
+    Weighted event sampler used by the classic round engine
+    The old engine picked an event uniformly and then executed it only if random() <= probability, wasting the draw
+    otherwise (and also when there were not enough alive tributes for the event).
+    This sampler gives exactly the same per-draw distribution:
+    - every event is executed with probability: probability / number of events in the pool
+    - nothing is executed with the remaining probability (kept so the number of events per round doesn't change)
+    As in the old engine, an event without a #TRIBUTE or without a #OPPRESSED placeholder is never executed (its draws
+    execute nothing).
+
+    Events are grouped by the number of tributes they need (slots), every group has its own alias table.
+    Groups are sorted by slots, so the groups that can be staffed with the alive tributes are always a prefix of the
+    list: a single random number picks "nothing" or a feasible group, then the alias table of the group picks the event.
+    Infeasible events are never drawn.
+
+    The sampler has to be built again only when the events pool changes.
+    The alias tables hold the positions of the events, the sampler can be built from the probability, actives and
+    passives columns of an events pack (check event_pack.py) without decoding its events: only the drawn events are
+    decoded.
+    """
+
+    def __init__(self, events, probabilities=None, actives=None, passives=None) -> None:
+        self._events = events
+        self._pool_size = len(events)
+        if probabilities is None:
+            probabilities = [event.probability for event in events]
+        if actives is None:
+            actives = [event.template.actives for event in events]
+        if passives is None:
+            passives = [event.template.passives for event in events]
+
+        groups = {}
+        for index, (probability, event_actives, event_passives) in enumerate(zip(probabilities, actives, passives)):
+            # Probabilities outside [0, 1] behave like the bounds (a decider is always in [0, 1))
+            weight = min(max(probability, 0.0), 1.0)
+            if weight > 0 and event_actives and event_passives:
+                groups.setdefault(event_actives + event_passives, []).append((index, weight))
+
+        self._slots = sorted(groups)
+        self._tables = []
+        self._cumulative_weights = []
+
+        total = 0.0
+        for slots in self._slots:
+            group_indexes = array("q", (index for index, _ in groups[slots]))
+            group_weights = [weight for _, weight in groups[slots]]
+            self._tables.append(AliasTable(group_indexes, group_weights))
+            total += sum(group_weights)
+            self._cumulative_weights.append(total)
+
+    @property
+    def pool_size(self):
+        return self._pool_size
+
+    # Total weight of the events that can be executed with alive_count tributes
+    def feasible_weight(self, alive_count: int) -> float:
+        feasible_groups = bisect_right(self._slots, alive_count)
+        if not feasible_groups:
+            return 0.0
+        return self._cumulative_weights[feasible_groups - 1]
+
+    # Returns the drawn event or None if this draw doesn't execute anything
+    def draw(self, alive_count: int, rand=random):
+        if not self._pool_size:
+            return None
+
+        position = rand() * self._pool_size
+        if position >= self.feasible_weight(alive_count):
+            return None
+
+        group = bisect_right(self._cumulative_weights, position)
+        return self._events[self._tables[group].draw(rand)]
+
+    # Same draw of draw(), also tells what happened:
+    # - "executed":.........an event has been drawn
+    # - "discarded":........the probability check of the event failed (or the event can't be executed)
+    # - "no players":.......the drawn event needs more tributes than the alive ones
+    def draw_outcome(self, alive_count: int, rand=random) -> tuple:
+        if not self._pool_size:
+            return None, "discarded"
+
+        position = rand() * self._pool_size
+        if position >= self.feasible_weight(alive_count):
+            if self._cumulative_weights and position < self._cumulative_weights[-1]:
+                return None, "no players"
+            return None, "discarded"
+
+        group = bisect_right(self._cumulative_weights, position)
+        return self._events[self._tables[group].draw(rand)], "executed"
@@ -0,0 +1,213 @@
+import threading
+import time
+from collections import OrderedDict
+
+from core_classes import Game
+from game_store import GameStore, JsonGameStore, WriteBehindGameStore
+
+# Rough memory used by a tribute (roster columns, view, alive pool and id index) and by a rendered event of the history
+TRIBUTE_BYTES = 120
+EVENT_BYTES = 160
+
+
+class GameCache:
+    """
+    Bounded LRU cache of the loaded games, a game is loaded from the store only the first time it's asked for
+    - store:..............store of the games (default: JsonGameStore)
+    - events_pool:........events file of the loaded games
+    - max_games:..........games kept in memory (None: no limit)
+    - max_bytes:..........estimated memory of the kept games (None: no limit), check estimate_size()
+    - write_behind:.......rounds are kept in memory and written by the flushes, instead of after every round
+    - flush_every:........seconds a round can wait in memory before flush_due() writes it
+    - max_pending:........rounds of a game that can wait in memory, flush_due() writes the games with more
+    - journal_directory:..directory of the pending rounds journals of the write behind store (None: no journal)
+
+    The least recently used games are dropped when a limit is passed, the games in use (acquire() / release()) are
+    skipped. A dropped game is flushed first, nothing is lost.
+    With write_behind the store is wrapped in a WriteBehindGameStore: the rounds are written by flush_due(), when a game
+    is dropped and by close() (called when the bot shuts down). Every flush of a game is a single atomic write of the
+    store (JsonGameStore writes a temporary file and renames it), a crash never leaves a broken file. The rounds not
+    flushed yet are appended to the pending journals of journal_directory (check WriteBehindGameStore), so a crash
+    doesn't lose them either: they are written to the store by the next GameCache. With journal_directory=None a crash
+    loses the rounds of the latest flush_every seconds (max_pending rounds per game at most).
+
+    Stats (check stats):
+    - hits, misses:.......games found in memory / loaded from the store
+    - hit rate:...........hits / (hits + misses)
+    - evictions:..........games dropped because of the limits
+    - flushes:............writes of buffered rounds
+    - loaded:.............games in memory
+    - estimated bytes:....estimated memory of the games in memory
+    - pending rounds:.....rounds waiting for a flush
+
+    Usage:
+    cache = GameCache(events_pool="./files/events.json", max_games=128)
+    game = cache.acquire(game_id)
+    try:
+        game.execute_game()
+    finally:
+        cache.release(game_id)
+    cache.close()
+    """
+
+    def __init__(self, store: GameStore = None, events_pool: str = None, max_games: int = 256, max_bytes: int = None,
+                 write_behind: bool = True, flush_every: float = 30, max_pending: int = 50,
+                 journal_directory: str = "./hunger_games_files") -> None:
+        store = store if store is not None else JsonGameStore()
+        self._store = WriteBehindGameStore(store, journal_directory) if write_behind else store
+        self._events_pool = events_pool
+        self.max_games = max_games
+        self.max_bytes = max_bytes
+        self.flush_every = flush_every
+        self.max_pending = max_pending
+
+        # game_id -> Game, least recently used first
+        self._games = OrderedDict()
+        self._in_use = {}
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def store(self):
+        return self._store
+
+    def __contains__(self, game_id: int):
+        return game_id in self._games
+
+    def __len__(self):
+        return len(self._games)
+
+    # Estimated memory of a game, the roster and the history window
+    @staticmethod
+    def estimate_size(game: Game) -> int:
+        events = sum(len(round_events) for round_events in game._history_window)
+        return game.game_size * TRIBUTE_BYTES + events * EVENT_BYTES
+
+    def get(self, game_id: int) -> Game:
+        """Returns the game, loaded from the store if it's not in memory"""
+        with self._lock:
+            game = self._games.get(game_id)
+            if game is not None:
+                self._games.move_to_end(game_id)
+                self.hits += 1
+                return game
+
+        # Loaded outside the lock, the other threads keep going
+        game = Game(game_id=game_id, events_pool=self._events_pool, store=self._store)
+        with self._lock:
+            self.misses += 1
+            # Loaded by another thread in the meantime
+            if game_id in self._games:
+                self._games.move_to_end(game_id)
+                return self._games[game_id]
+            self._games[game_id] = game
+            self._evict()
+            return game
+
+    def acquire(self, game_id: int) -> Game:
+        """Returns the game like get(), the game is never dropped until it's released"""
+        with self._lock:
+            self._in_use[game_id] = self._in_use.get(game_id, 0) + 1
+        try:
+            return self.get(game_id)
+        except Exception:
+            self.release(game_id)
+            raise
+
+    def release(self, game_id: int) -> None:
+        with self._lock:
+            count = self._in_use.get(game_id, 0) - 1
+            if count > 0:
+                self._in_use[game_id] = count
+                return
+            self._in_use.pop(game_id, None)
+            # Limits passed while the game was in use
+            self._evict()
+
+    # Drops the least recently used games over the limits, the games in use are skipped
+    def _evict(self) -> None:
+        if self.max_bytes is not None:
+            sizes = {game_id: self.estimate_size(game) for game_id, game in self._games.items()}
+            total = sum(sizes.values())
+        else:
+            sizes, total = None, 0
+
+        for game_id in list(self._games):
+            over_count = self.max_games is not None and len(self._games) > self.max_games
+            over_bytes = self.max_bytes is not None and total > self.max_bytes
+            if not over_count and not over_bytes:
+                break
+            if game_id in self._in_use:
+                continue
+            self._drop(game_id)
+            self.evictions += 1
+            if sizes is not None:
+                total -= sizes[game_id]
+
+    # Removes the game from memory, its buffered rounds are written first
+    def _drop(self, game_id: int) -> None:
+        self._store.release(game_id)
+        del self._games[game_id]
+
+    def evict(self, game_id: int) -> bool:
+        """Drops the game from memory (after a flush), returns False if it's not loaded or it's in use"""
+        with self._lock:
+            if game_id not in self._games or game_id in self._in_use:
+                return False
+            self._drop(game_id)
+            return True
+
+    def flush(self, game_id: int = None) -> None:
+        """Writes the buffered rounds of the game (of every game if None)"""
+        if isinstance(self._store, WriteBehindGameStore):
+            self._store.flush(game_id)
+
+    def flush_due(self, game_ids: list = None) -> int:
+        """
+        Writes the games with rounds older than flush_every or with more than max_pending rounds, returns how many
+        game_ids: games to check (default: every game)
+        """
+        if not isinstance(self._store, WriteBehindGameStore):
+            return 0
+        now = time.monotonic()
+        flushed = 0
+        for game_id in (game_ids if game_ids is not None else self._store.pending_games()):
+            since = self._store.pending_since(game_id)
+            if since is None:
+                continue
+            if now - since >= self.flush_every or self._store.pending_rounds(game_id) >= self.max_pending:
+                self._store.flush(game_id)
+                flushed += 1
+        return flushed
+
+    def clear(self) -> None:
+        """Flushes and drops every game not in use"""
+        with self._lock:
+            for game_id in list(self._games):
+                if game_id not in self._in_use:
+                    self._drop(game_id)
+
+    def close(self) -> None:
+        """Flushes every game, drops them and closes the store"""
+        with self._lock:
+            self._games.clear()
+            self._in_use.clear()
+            self._store.close()
+
+    @property
+    def stats(self) -> dict:
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit rate": round(self.hits / requests, 4) if requests else 0.0,
+                "evictions": self.evictions,
+                "flushes": self._store.flushes if isinstance(self._store, WriteBehindGameStore) else 0,
+                "loaded": len(self._games),
+                "estimated bytes": sum(self.estimate_size(game) for game in self._games.values()),
+                "pending rounds": (self._store.pending_rounds() if isinstance(self._store, WriteBehindGameStore)
+                                   else 0)
+            }
@@ -0,0 +1,212 @@
+import json
+import os
+from array import array
+from itertools import islice
+
+# Journal lines between two entries of the line-offset index
+INDEX_EVERY = 64
+
+
+class GameJournal:
+    """
+    Append-only persistence for a Game
+    Instead of rewriting the whole data_{id}.json file after every round, the journal mode writes:
+    - journal_{id}.jsonl:....one JSON line per round, appended at the end of the round
+    ..........................{"round": n, "events": [rendered events], "tributes": [tributes changed in the round]}
+    - snapshot_{id}.json:....compact roster snapshot, rewritten only every snapshot_every rounds
+    ..........................{"id": id, "round": n, "offset": journal size in bytes at round n, "players": [...]}
+    - meta_{id}.json:........replay data of the game (seed, first replayable round and its roster), rarely rewritten
+
+    Round lines may also have a "params" key with the parameters of the round (check Game.replay_history()).
+
+    On load the roster is rebuilt from the latest snapshot plus the journal lines written after it (the "offset" of the
+    snapshot is used to seek straight to them).
+    The event history is only read from the journal when it's actually requested: a sparse index with the byte offset
+    of every INDEX_EVERY-th line is kept in memory (built without decoding the lines, then extended with the new ones),
+    so reading a window of rounds seeks close to it and decodes only its lines.
+
+    A round line is appended with a single write, a line cut by a crash is ignored on load.
+    Snapshots are written to a temporary file and then renamed, so a snapshot is never half written.
+    """
+
+    def __init__(self, game_id: int, directory: str = "./hunger_games_files", snapshot_every: int = 50) -> None:
+        self._game_id = game_id
+        self._snapshot_every = snapshot_every
+        self.journal_path = os.path.join(directory, f"journal_{game_id}.jsonl")
+        self.snapshot_path = os.path.join(directory, f"snapshot_{game_id}.json")
+        self.meta_path = os.path.join(directory, f"meta_{game_id}.json")
+        self._round = None
+        self._repaired = False
+        # Line-offset index -> offsets of the lines 0, INDEX_EVERY, 2 * INDEX_EVERY..., complete lines indexed and
+        # offset of the end of the latest one
+        self._line_index = array("q")
+        self._indexed_lines = 0
+        self._indexed_end = 0
+
+    @property
+    def exists(self):
+        return os.path.exists(self.snapshot_path) or os.path.exists(self.journal_path)
+
+    # Internal function to read the raw journal lines from a byte offset, a trailing partial line is ignored
+    def _read_raw_lines(self, offset: int = 0):
+        try:
+            with open(self.journal_path, mode="rb") as file:
+                file.seek(offset)
+                for line in file:
+                    if not line.endswith(b"\n"):
+                        break
+                    yield line
+        except FileNotFoundError:
+            return
+
+    # Internal function to read the decoded journal lines from a byte offset
+    def _read_lines(self, offset: int = 0):
+        for line in self._read_raw_lines(offset):
+            yield json.loads(line)
+
+    # Internal function to add the lines written since the latest update to the line-offset index
+    # The journal is only appended to (a partial line cut by a crash is never indexed), the indexed lines never change
+    def _update_index(self) -> None:
+        position = self._indexed_end
+        for line in self._read_raw_lines(position):
+            if self._indexed_lines % INDEX_EVERY == 0:
+                self._line_index.append(position)
+            self._indexed_lines += 1
+            position += len(line)
+        self._indexed_end = position
+
+    def _read_snapshot(self) -> dict:
+        try:
+            with open(self.snapshot_path, mode="r") as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return {"id": self._game_id, "round": 0, "offset": 0, "players": []}
+
+    # Returns the roster (list of tributes in dict form) rebuilt from the latest snapshot and the journal tail
+    def load_players(self) -> list:
+        snapshot = self._read_snapshot()
+        players = snapshot["players"]
+        positions = {player["id"]: index for index, player in enumerate(players)}
+
+        self._round = snapshot["round"]
+        for line in self._read_lines(snapshot["offset"]):
+            for tribute in line["tributes"]:
+                if tribute["id"] in positions:
+                    players[positions[tribute["id"]]] = tribute
+                else:
+                    positions[tribute["id"]] = len(players)
+                    players.append(tribute)
+            self._round = line["round"]
+
+        return players
+
+    # Returns the rendered events of the rounds from start to stop (excluded, default: every round), oldest round first
+    def load_history(self, start: int = 0, stop: int = None) -> list:
+        self._update_index()
+        stop = self._indexed_lines if stop is None else min(stop, self._indexed_lines)
+        if start >= stop:
+            return []
+        # The lines between the indexed one and start are skipped without decoding them
+        skipped = start % INDEX_EVERY
+        lines = self._read_raw_lines(self._line_index[start // INDEX_EVERY])
+        return [json.loads(line)["events"] for line in islice(lines, skipped, skipped + stop - start)]
+
+    # Returns the parameters of every round, oldest round first
+    def load_round_params(self) -> list:
+        return [line.get("params") for line in self._read_lines()]
+
+    @property
+    def round_count(self):
+        return self._latest_round()
+
+    def load_meta(self):
+        try:
+            with open(self.meta_path, mode="r") as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return None
+
+    # Removes the journal, the snapshot and the replay data of the game
+    def delete(self) -> None:
+        for path in (self.journal_path, self.snapshot_path, self.meta_path):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        self._round = None
+        self._line_index = array("q")
+        self._indexed_lines = 0
+        self._indexed_end = 0
+
+    def write_meta(self, meta: dict) -> None:
+        temporary_path = f"{self.meta_path}.tmp"
+        with open(temporary_path, mode="w") as file:
+            json.dump(meta, file, separators=(",", ":"))
+        os.replace(temporary_path, self.meta_path)
+
+    # Internal function to get the number of the latest round without loading the roster
+    def _latest_round(self) -> int:
+        if self._round is None:
+            snapshot = self._read_snapshot()
+            self._round = snapshot["round"]
+            for line in self._read_lines(snapshot["offset"]):
+                self._round = line["round"]
+        return self._round
+
+    # Internal function to drop a line cut by a crash before appending after it
+    def _truncate_partial_line(self, file) -> None:
+        size = file.seek(0, os.SEEK_END)
+        if not size:
+            return
+        file.seek(max(size - 65536, 0))
+        tail = file.read()
+        if tail.endswith(b"\n"):
+            return
+        cut = tail.rfind(b"\n")
+        if cut == -1 and size > len(tail):
+            # A single line longer than the tail, read it all
+            file.seek(0)
+            tail = file.read()
+            cut = tail.rfind(b"\n")
+            file.truncate(cut + 1)
+        else:
+            file.truncate(size - len(tail) + cut + 1)
+        file.seek(0, os.SEEK_END)
+
+    def append_round(self, players, changed: list, latest_events: list, params: dict = None) -> None:
+        """
+        Appends the round to the journal
+        - players:............function that returns the whole roster in dict form (only called when a snapshot is due)
+        - changed:............the tributes changed during the round in dict form
+        - latest_events:......the rendered events of the round
+        - params:.............parameters of the round, saved only if given
+        """
+        current_round = self._latest_round() + 1
+        line = {"round": current_round, "events": latest_events, "tributes": changed}
+        if params is not None:
+            line["params"] = params
+        line = json.dumps(line, separators=(",", ":"))
+
+        mode = "r+b" if os.path.exists(self.journal_path) else "wb"
+        with open(self.journal_path, mode=mode) as file:
+            # Only the first append of the process can find a line cut by a crash
+            if not self._repaired:
+                self._truncate_partial_line(file)
+                self._repaired = True
+            file.seek(0, os.SEEK_END)
+            file.write(line.encode() + b"\n")
+            offset = file.tell()
+        self._round = current_round
+
+        if current_round % self._snapshot_every == 0:
+            self.write_snapshot(players(), offset)
+
+    def write_snapshot(self, players: list, offset: int = None) -> None:
+        if offset is None:
+            offset = os.path.getsize(self.journal_path) if os.path.exists(self.journal_path) else 0
+
+        temporary_path = f"{self.snapshot_path}.tmp"
+        with open(temporary_path, mode="w") as file:
+            json.dump({"id": self._game_id, "round": self._latest_round(), "offset": offset, "players": players},
+                      file, separators=(",", ":"))
+        os.replace(temporary_path, self.snapshot_path)
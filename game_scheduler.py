@@ -0,0 +1,252 @@
+import asyncio
+import heapq
+import itertools
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from game_cache import GameCache
+from game_store import GameStore
+
+
+class ScheduledGame:
+    """
+    Timer of a scheduled game
+    - game_id:............id of the game
+    - every:..............seconds between two rounds
+    - minimum_events, max_events, engine: parameters of Game.execute_game()
+    - on_round:...........coroutine function called with (game_id, rendered events) after every round, or None
+    """
+
+    __slots__ = ("game_id", "every", "minimum_events", "max_events", "engine", "on_round")
+
+    def __init__(self, game_id: int, every: float, minimum_events: int, max_events: int, engine: str,
+                 on_round) -> None:
+        self.game_id = game_id
+        self.every = every
+        self.minimum_events = minimum_events
+        self.max_events = max_events
+        self.engine = engine
+        self.on_round = on_round
+
+
+class GameScheduler:
+    """
+    Runs the rounds of many games on a timer, with a single asyncio task for all of them
+    - store:..............store of the games (default: JsonGameStore)
+    - events_pool:........events file of the games
+    - max_loaded:.........games kept in memory, the least recently played ones are dropped when the limit is passed
+    - max_bytes:..........estimated memory of the games kept in memory (None: no limit)
+    - workers:............threads that play the rounds
+    - batch_size:.........max rounds played by a worker in a single batch
+    - flush_every:........seconds a played round can wait in memory before it's written to the store
+    - journal_directory:..directory of the pending rounds journals, the rounds not written yet survive a crash (check
+                          GameCache)
+
+    The timers are kept in a heap ordered by due time, the timer task sleeps until the first one is due.
+    The due rounds are grouped in batches and every batch is played by a thread of the worker pool (the batches wait
+    for a free worker, these rounds are the queue depth).
+    A game is scheduled again only after its round is over, so the same game never runs twice at once; the next round
+    is due every seconds after the previous due time (or right away if the round was late by more than that). A timer
+    replaced by schedule() while the round of its game is running waits for the end of that round.
+
+    The games are kept in a GameCache and loaded from the store on their first round. The rounds are written behind:
+    after a batch the worker writes its games with rounds older than flush_every, a game dropped from memory is written
+    first and stop() writes every game and closes the store.
+
+    Stats (check stats):
+    - scheduled:..........games with a timer
+    - loaded:.............games in memory
+    - cache:..............stats of the GameCache (hit rate, evictions, flushes, pending rounds...)
+    - queue depth:........due rounds waiting for a free worker
+    - lag:................delay between due time and start time of the latest rounds (milliseconds)
+    - rounds, batches, errors: counters
+
+    Usage (from the event loop):
+    scheduler = GameScheduler(events_pool="./files/events.json")
+    scheduler.start()
+    scheduler.schedule(game_id, every=600, on_round=publish_round)
+    await scheduler.stop()
+    """
+
+    def __init__(self, store: GameStore = None, events_pool: str = None, max_loaded: int = 256, workers: int = 4,
+                 batch_size: int = 16, lag_samples: int = 1000, max_bytes: int = None, flush_every: float = 30,
+                 journal_directory: str = "./hunger_games_files") -> None:
+        self._cache = GameCache(store, events_pool, max_games=max_loaded, max_bytes=max_bytes, flush_every=flush_every,
+                                journal_directory=journal_directory)
+        self._workers = workers
+        self._batch_size = batch_size
+        self._executor = None
+
+        # Timers heap -> (due time, sequence number, ScheduledGame), entries of unscheduled games are skipped
+        self._heap = []
+        self._sequence = itertools.count()
+        self._jobs = {}
+        # Games with a round in progress, and the timers that came due meanwhile (game_id -> ScheduledGame)
+        self._running = set()
+        self._deferred = {}
+
+        self._task = None
+        self._wakeup = None
+        self._slots = None
+        self._batches = set()
+        self._waiting = 0
+        self._lags = deque(maxlen=lag_samples)
+        self.rounds = 0
+        self.batches = 0
+        self.errors = 0
+
+    # SCHEDULING
+    def schedule(self, game_id: int, every: float, first_in: float = None, minimum_events: int = 8,
+                 max_events: int = 12, engine: str = "classic", on_round=None) -> None:
+        """
+        Plays a round of the game every "every" seconds, the first one in first_in seconds (default: every)
+        Scheduling a game again replaces its timer.
+        """
+        job = ScheduledGame(game_id, every, minimum_events, max_events, engine, on_round)
+        self._jobs[game_id] = job
+        self._push(time.monotonic() + (every if first_in is None else first_in), job)
+
+    def unschedule(self, game_id: int) -> None:
+        self._jobs.pop(game_id, None)
+
+    @property
+    def scheduled(self):
+        return list(self._jobs)
+
+    @property
+    def cache(self):
+        return self._cache
+
+    def _push(self, due: float, job: ScheduledGame) -> None:
+        heapq.heappush(self._heap, (due, next(self._sequence), job))
+        # The timer task may be sleeping for a later timer
+        if self._wakeup is not None and self._heap[0][2] is job:
+            self._wakeup.set()
+
+    def start(self) -> None:
+        """Starts the timer task, must be called from the event loop"""
+        if self._task is not None:
+            return
+        self._executor = ThreadPoolExecutor(max_workers=self._workers, thread_name_prefix="game-scheduler")
+        self._wakeup = asyncio.Event()
+        self._slots = asyncio.Semaphore(self._workers)
+        self._task = asyncio.create_task(self._timer())
+
+    async def stop(self) -> None:
+        """
+        Stops the timers, waits for the running rounds, writes the rounds not saved yet, drops the games and closes the
+        store (the scheduler can't be started again)
+        """
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, *self._batches, return_exceptions=True)
+        self._task = None
+        # In a thread, the flush of every game must not block the event loop
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._executor.shutdown)
+        await loop.run_in_executor(None, self._cache.close)
+
+    async def _timer(self) -> None:
+        while True:
+            now = time.monotonic()
+            due = []
+            while self._heap and self._heap[0][0] <= now:
+                due_time, _, job = heapq.heappop(self._heap)
+                if self._jobs.get(job.game_id) is not job:
+                    continue
+                # Scheduled again while its round is running, the round is played when the running one is over
+                if job.game_id in self._running:
+                    self._deferred[job.game_id] = job
+                    continue
+                self._running.add(job.game_id)
+                due.append((due_time, job))
+
+            for start in range(0, len(due), self._batch_size):
+                batch = due[start:start + self._batch_size]
+                self._waiting += len(batch)
+                task = asyncio.create_task(self._run_batch(batch))
+                self._batches.add(task)
+                task.add_done_callback(self._batches.discard)
+
+            self._wakeup.clear()
+            timeout = self._heap[0][0] - time.monotonic() if self._heap else None
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _run_batch(self, batch: list) -> None:
+        async with self._slots:
+            started = time.monotonic()
+            self._waiting -= len(batch)
+            for due_time, _ in batch:
+                self._lags.append(started - due_time)
+            results = await asyncio.get_running_loop().run_in_executor(
+                self._executor, self._play_batch, [job for _, job in batch]
+            )
+            self.batches += 1
+
+        for (due_time, job), (events, error) in zip(batch, results):
+            self._running.discard(job.game_id)
+            current = self._jobs.get(job.game_id)
+            deferred = self._deferred.pop(job.game_id, None)
+            if deferred is not None and deferred is current:
+                self._push(time.monotonic(), current)
+            elif current is job:
+                self._push(max(due_time + job.every, time.monotonic()), job)
+            if error is not None:
+                self.errors += 1
+                continue
+            self.rounds += 1
+            if job.on_round is not None:
+                try:
+                    await job.on_round(job.game_id, events)
+                except Exception:
+                    self.errors += 1
+
+    # WORKER THREADS
+    # Plays a round of every game of the batch, returns (events, None) or (None, error) for every game
+    def _play_batch(self, jobs: list) -> list:
+        results = []
+        for job in jobs:
+            try:
+                game = self._cache.acquire(job.game_id)
+                try:
+                    events = game.execute_game(job.minimum_events, job.max_events, job.engine)
+                finally:
+                    self._cache.release(job.game_id)
+            except Exception as error:
+                results.append((None, error))
+            else:
+                results.append((events, None))
+        # Only the games of this batch, the other workers may be playing theirs
+        try:
+            self._cache.flush_due([job.game_id for job in jobs])
+        except Exception:
+            # Kept in memory for the next flush
+            self.errors += 1
+        return results
+
+    @property
+    def stats(self) -> dict:
+        lags = sorted(self._lags)
+        if lags:
+            lag = {
+                "mean": round(sum(lags) / len(lags) * 1000, 2),
+                "p95": round(lags[min(int(len(lags) * 0.95), len(lags) - 1)] * 1000, 2),
+                "max": round(lags[-1] * 1000, 2)
+            }
+        else:
+            lag = {"mean": 0.0, "p95": 0.0, "max": 0.0}
+        return {
+            "scheduled": len(self._jobs),
+            "loaded": len(self._cache),
+            "queue depth": self._waiting,
+            "lag": lag,
+            "rounds": self.rounds,
+            "batches": self.batches,
+            "errors": self.errors,
+            "cache": self._cache.stats
+        }
@@ -0,0 +1,843 @@
+import json
+import os
+import re
+import shutil
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+
+import json_codec
+from game_journal import GameJournal
+
+
+class GameStore(ABC):
+    """
+    Base class of the Game storage backends
+    A store saves and loads any number of games, identified by their game_id.
+    Tributes are exchanged in dict form (the same structure used in the players json files).
+
+    Available backends:
+    - JsonGameStore:......one data_{id}.json file per game, rewritten after every round (default, original format)
+    - JournalGameStore:...append-only round journal plus periodic roster snapshots (check game_journal.py)
+    - SQLiteGameStore:....single SQLite database with indexed tables for tributes, rounds and events
+    - NullGameStore:......nothing is loaded or saved (simulations and worker processes)
+
+    Every backend implements the abstract methods, a backend that misses one can't be created.
+    Stores created with keep_history=False don't save the rendered events: the Game rebuilds its history by replaying
+    the rounds from the seed (check Game.replay_history()).
+    """
+
+    keeps_history = True
+
+    # Returns the ids of the games saved in the store
+    @abstractmethod
+    def game_ids(self) -> list:
+        raise NotImplementedError
+
+    # Returns the roster of the game in dict form or None if the game doesn't exist
+    @abstractmethod
+    def load_players(self, game_id: int):
+        raise NotImplementedError
+
+    # Returns the rendered events of every round of the game, oldest round first
+    @abstractmethod
+    def load_history(self, game_id: int) -> list:
+        raise NotImplementedError
+
+    # Returns the rendered events of the rounds from start to stop (excluded), rounds start from 0
+    # 0 <= start <= stop <= round count, the stores that can read a part of the history override it
+    def load_history_range(self, game_id: int, start: int, stop: int) -> list:
+        return self.load_history(game_id)[start:stop]
+
+    # Returns the replay data of the game (seed, first replayable round and its roster) or None
+    @abstractmethod
+    def load_meta(self, game_id: int):
+        raise NotImplementedError
+
+    # Returns the parameters of every round of the game, oldest round first (None for rounds saved without them)
+    @abstractmethod
+    def load_round_params(self, game_id: int) -> list:
+        raise NotImplementedError
+
+    # Returns the number of rounds played by the game
+    @abstractmethod
+    def round_count(self, game_id: int) -> int:
+        raise NotImplementedError
+
+    @abstractmethod
+    def save_round(self, game_id: int, players, changed: list, latest_events: list,
+                   roster_replaced: bool = False, params: dict = None, meta: dict = None) -> None:
+        """
+        Saves the round of a game
+        - players:............function that returns the whole roster in dict form (called only if needed)
+        - changed:............the tributes changed during the round in dict form
+        - latest_events:......the rendered events of the round
+        - roster_replaced:....True if the roster has been loaded from outside the store since the last save
+        - params:.............parameters of the round (minimum and max events, engine...)
+        - meta:...............new replay data of the game, None if unchanged
+        """
+        raise NotImplementedError
+
+    # Saves many rounds of a game at once (flushes of WriteBehindGameStore)
+    # rounds -> list of dicts with the "changed", "latest_events", "roster_replaced", "params" and "meta" arguments of
+    # save_round(), oldest round first
+    def save_rounds(self, game_id: int, players, rounds: list) -> None:
+        for saved in rounds:
+            self.save_round(game_id, players, saved["changed"], saved["latest_events"], saved["roster_replaced"],
+                            saved["params"], saved["meta"])
+
+    @abstractmethod
+    def import_game(self, game_id: int, players: list, history: list, round_params: list = None,
+                    meta: dict = None) -> None:
+        """
+        Writes a whole game at once, used by the migration tool
+        - players:............the final roster in dict form
+        - history:............the rendered events of every round (empty lists if the source doesn't keep them)
+        - round_params:.......parameters of every round, same length of history (default: None for every round)
+        - meta:...............replay data of the game
+        """
+        raise NotImplementedError
+
+    # Drops the cached data of a game that is no longer loaded (its saved data is not touched)
+    def release(self, game_id: int) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class NullGameStore(GameStore):
+    """
+    Store that doesn't save anything, games using it live only in memory
+    """
+
+    def game_ids(self) -> list:
+        return []
+
+    def load_players(self, game_id: int):
+        return None
+
+    def load_history(self, game_id: int) -> list:
+        return []
+
+    def load_meta(self, game_id: int):
+        return None
+
+    def load_round_params(self, game_id: int) -> list:
+        return []
+
+    def round_count(self, game_id: int) -> int:
+        return 0
+
+    def save_round(self, game_id: int, players, changed: list, latest_events: list,
+                   roster_replaced: bool = False, params: dict = None, meta: dict = None) -> None:
+        pass
+
+    def import_game(self, game_id: int, players: list, history: list, round_params: list = None,
+                    meta: dict = None) -> None:
+        pass
+
+
+class JsonGameStore(GameStore):
+    """
+    Original storage format: one data_{id}.json file per game
+    {"id": id, "players": [...], "history": [[round events], ...], "latest": [latest round events],
+     "rounds": [round params, ...], "meta": replay data}
+    - file_format:........format of the written files, "indent", "compact" or "gzip" (check json_codec.py)
+    - history_segment:....rounds of every history segment file (None: every round stays in data_{id}.json)
+
+    The file is still rewritten after every round, but its pieces are kept already encoded: after the first save only
+    the changed tributes and the new round are encoded again (the output is the same of json_codec.write_file()).
+    The file is written to a temporary file and then renamed, a crash never leaves a half written file.
+    The files are loaded whatever their format is, a game saved in another format is rewritten in file_format by its
+    next save.
+
+    Paged rounds: when history_segment rounds are waiting in the game file, their rendered events and their params are
+    moved to history_{id}/segment_{first round}.json ({"history": [...], "rounds": [...]}) and written once. The game
+    file keeps only the latest rounds, plus "history start" (rounds moved to the segments) and "segments" (first round
+    of every segment), so neither the file nor the memory used by the store grow with the length of the game. The
+    segments are read only when the rounds are asked for (load_history(), load_history_range(), load_round_params()).
+    """
+
+    _FILENAME = re.compile(r"data_(-?\d+)\.json$")
+
+    def __init__(self, directory: str = "./hunger_games_files", keep_history: bool = True,
+                 file_format: str = "compact", history_segment: int = 100) -> None:
+        if file_format not in json_codec.FORMATS:
+            raise ValueError(f"Unknown file format: {file_format}")
+        self._directory = directory
+        self.keeps_history = keep_history
+        self.file_format = file_format
+        self.history_segment = history_segment
+        self._games = {}
+
+    def _path(self, game_id: int) -> str:
+        return os.path.join(self._directory, f"data_{game_id}.json")
+
+    def _segment_path(self, game_id: int, first_round: int) -> str:
+        return os.path.join(self._directory, f"history_{game_id}", f"segment_{first_round}.json")
+
+    # Internal function to get the cached data of a game (everything but the players), None if the game doesn't exist
+    def _cached(self, game_id: int):
+        if game_id not in self._games:
+            self._read(game_id)
+        return self._games.get(game_id)
+
+    def _read(self, game_id: int):
+        try:
+            data = json_codec.read_file(self._path(game_id))
+        except FileNotFoundError:
+            return None
+        # Files saved before the round params were introduced have one history entry per round
+        rounds = data.get("rounds", [None] * len(data.get("history", [])))
+        cached = self._games[game_id] = self._new_cache(data.get("history", []), rounds, data.get("meta"))
+        cached["history start"] = data.get("history start", 0)
+        cached["segments"] = data.get("segments", [])
+        return data
+
+    # Internal function to create the cached data of a game
+    # The "encoded" lists hold the items of the players, history and rounds lists as they are written in the file,
+    # they are filled on the first save (positions -> tribute id: position in the encoded players)
+    # "history" and "rounds" hold only the rounds not moved to the segments yet, the first one is the round
+    # "history start"
+    @staticmethod
+    def _new_cache(history: list, rounds: list, meta) -> dict:
+        return {"history": history, "rounds": rounds, "meta": meta,
+                "encoded players": None, "positions": None, "encoded history": None, "encoded rounds": None,
+                "encoded meta": None, "history start": 0, "segments": []}
+
+    # Internal function to encode a value as json.dump(indent=4) writes it at the given nesting level (minified in the
+    # compact formats)
+    def _encode(self, value, level: int) -> str:
+        if self.file_format != "indent":
+            return json_codec.dumps(value)
+        return json_codec.dumps_indent(value).replace("\n", "\n" + "    " * level)
+
+    # Internal function to write a list of items already encoded at level + 1 as a list
+    def _join(self, items: list, level: int) -> str:
+        if self.file_format != "indent":
+            return "[" + ",".join(items) + "]"
+        if not items:
+            return "[]"
+        indent = "    " * (level + 1)
+        return "[\n" + indent + (",\n" + indent).join(items) + "\n" + "    " * level + "]"
+
+    # Internal function to update the encoded players, the whole roster is encoded only when full is True (or on the
+    # first save of the game)
+    def _encode_players(self, cached: dict, players, changed: list, full: bool) -> None:
+        if full or cached["encoded players"] is None:
+            roster = players()
+            cached["encoded players"] = [self._encode(tribute, 2) for tribute in roster]
+            cached["positions"] = {tribute["id"]: position for position, tribute in enumerate(roster)}
+            return
+
+        encoded_players = cached["encoded players"]
+        positions = cached["positions"]
+        for tribute in changed:
+            position = positions.get(tribute["id"])
+            if position is None:
+                positions[tribute["id"]] = len(encoded_players)
+                encoded_players.append(self._encode(tribute, 2))
+            else:
+                encoded_players[position] = self._encode(tribute, 2)
+
+    # Internal function to encode the history, the rounds params and the meta loaded from the file
+    def _encode_history(self, cached: dict) -> None:
+        if cached["encoded meta"] is None:
+            cached["encoded meta"] = self._encode(cached["meta"], 1)
+        if cached["encoded history"] is None:
+            cached["encoded history"] = [self._encode(events, 2) for events in cached["history"]]
+            cached["encoded rounds"] = [self._encode(params, 2) for params in cached["rounds"]]
+
+    def _write(self, game_id: int, latest: list) -> None:
+        cached = self._games[game_id]
+        self._encode_history(cached)
+
+        sections = [
+            ("id", json_codec.dumps(game_id)),
+            ("players", self._join(cached["encoded players"], 1)),
+            ("history", self._join(cached["encoded history"], 1)),
+            ("latest", self._encode(latest, 1)),
+            ("rounds", self._join(cached["encoded rounds"], 1)),
+            ("meta", cached["encoded meta"])
+        ]
+        if cached["segments"]:
+            sections += [("history start", json_codec.dumps(cached["history start"])),
+                         ("segments", self._encode(cached["segments"], 1))]
+        if self.file_format == "indent":
+            text = "{\n" + ",\n".join(f'    "{key}": {value}' for key, value in sections) + "\n}"
+        else:
+            text = "{" + ",".join(f'"{key}":{value}' for key, value in sections) + "}"
+        json_codec.write_bytes(self._path(game_id), json_codec.encode(text, self.file_format))
+
+    def game_ids(self) -> list:
+        found = [self._FILENAME.match(name) for name in os.listdir(self._directory)]
+        return sorted(int(match.group(1)) for match in found if match)
+
+    def load_players(self, game_id: int):
+        data = self._read(game_id)
+        return None if data is None else data["players"]
+
+    def load_history(self, game_id: int) -> list:
+        cached = self._cached(game_id)
+        if cached is None:
+            return []
+        return self._load_segments(game_id, cached, "history", 0, cached["history start"]) + list(cached["history"])
+
+    def load_history_range(self, game_id: int, start: int, stop: int) -> list:
+        cached = self._cached(game_id)
+        if cached is None:
+            return []
+        history_start = cached["history start"]
+        return (self._load_segments(game_id, cached, "history", start, min(stop, history_start))
+                + cached["history"][max(start - history_start, 0):max(stop - history_start, 0)])
+
+    # Internal function to read the rounds from start to stop (excluded) from the segment files, only the segments
+    # with some of these rounds are read
+    # key -> "history" for the rendered events, "rounds" for the params
+    def _load_segments(self, game_id: int, cached: dict, key: str, start: int, stop: int) -> list:
+        items = []
+        segments = cached["segments"]
+        for position, first_round in enumerate(segments):
+            end_round = segments[position + 1] if position + 1 < len(segments) else cached["history start"]
+            if end_round <= start or first_round >= stop:
+                continue
+            segment = json_codec.read_file(self._segment_path(game_id, first_round))
+            items += segment[key][max(start - first_round, 0):stop - first_round]
+        return items
+
+    # Internal function to move the oldest rounds of the cached data (history and params) to new segment files,
+    # history_segment rounds at a time (the game file is written after the segments, a crash in the middle leaves the
+    # rounds in the file)
+    def _page_history(self, game_id: int, cached: dict) -> None:
+        size = self.history_segment
+        if not size:
+            return
+        while len(cached["rounds"]) >= size:
+            first_round = cached["history start"]
+            path = self._segment_path(game_id, first_round)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            json_codec.write_file(path, {"history": cached["history"][:size], "rounds": cached["rounds"][:size]},
+                                  self.file_format)
+            for key in ("history", "encoded history", "rounds", "encoded rounds"):
+                del cached[key][:size]
+            cached["segments"].append(first_round)
+            cached["history start"] = first_round + size
+
+    def load_meta(self, game_id: int):
+        cached = self._cached(game_id)
+        return None if cached is None else cached["meta"]
+
+    def load_round_params(self, game_id: int) -> list:
+        cached = self._cached(game_id)
+        if cached is None:
+            return []
+        return self._load_segments(game_id, cached, "rounds", 0, cached["history start"]) + list(cached["rounds"])
+
+    def round_count(self, game_id: int) -> int:
+        cached = self._cached(game_id)
+        return 0 if cached is None else cached["history start"] + len(cached["rounds"])
+
+    # Internal function to add a round to the cached data
+    def _add_round(self, cached: dict, latest_events: list, params: dict, meta: dict) -> None:
+        if self.keeps_history:
+            cached["history"].append(latest_events)
+            cached["encoded history"].append(self._encode(latest_events, 2))
+        cached["rounds"].append(params)
+        cached["encoded rounds"].append(self._encode(params, 2))
+        if meta is not None:
+            cached["meta"] = meta
+            cached["encoded meta"] = self._encode(meta, 1)
+
+    def save_round(self, game_id: int, players, changed: list, latest_events: list,
+                   roster_replaced: bool = False, params: dict = None, meta: dict = None) -> None:
+        self.save_rounds(game_id, players, [{"changed": changed, "latest_events": latest_events,
+                                             "roster_replaced": roster_replaced, "params": params, "meta": meta}])
+
+    # All the rounds are written with a single file write
+    def save_rounds(self, game_id: int, players, rounds: list) -> None:
+        if not rounds:
+            return
+        cached = self._cached(game_id)
+        if cached is None:
+            cached = self._games[game_id] = self._new_cache([], [], None)
+
+        # The latest version of every changed tribute
+        changed = {}
+        for saved in rounds:
+            for tribute in saved["changed"]:
+                changed[tribute["id"]] = tribute
+        roster_replaced = any(saved["roster_replaced"] for saved in rounds)
+        self._encode_players(cached, players, list(changed.values()), roster_replaced)
+
+        # Encoded before the new rounds are added, the new rounds are then encoded alone
+        self._encode_history(cached)
+        for saved in rounds:
+            self._add_round(cached, saved["latest_events"], saved["params"], saved["meta"])
+        self._page_history(game_id, cached)
+        self._write(game_id, rounds[-1]["latest_events"])
+
+    def import_game(self, game_id: int, players: list, history: list, round_params: list = None,
+                    meta: dict = None) -> None:
+        # Segments of a game saved before with the same id
+        shutil.rmtree(os.path.dirname(self._segment_path(game_id, 0)), ignore_errors=True)
+        rounds = list(round_params) if round_params is not None else [None] * len(history)
+        cached = self._games[game_id] = self._new_cache(list(history) if self.keeps_history else [], rounds, meta)
+        self._encode_players(cached, lambda: players, [], True)
+        self._encode_history(cached)
+        self._page_history(game_id, cached)
+        self._write(game_id, history[-1] if history else [])
+
+    def release(self, game_id: int) -> None:
+        self._games.pop(game_id, None)
+
+
+class JournalGameStore(GameStore):
+    """
+    Append-only storage: every game has a journal_{id}.jsonl round journal and a snapshot_{id}.json roster snapshot
+    Check game_journal.py for the details of the format.
+    """
+
+    _FILENAME = re.compile(r"(?:journal_(-?\d+)\.jsonl|snapshot_(-?\d+)\.json)$")
+
+    def __init__(self, directory: str = "./hunger_games_files", snapshot_every: int = 50,
+                 keep_history: bool = True) -> None:
+        self._directory = directory
+        self._snapshot_every = snapshot_every
+        self.keeps_history = keep_history
+        self._journals = {}
+
+    def _journal(self, game_id: int) -> GameJournal:
+        if game_id not in self._journals:
+            self._journals[game_id] = GameJournal(game_id, self._directory, self._snapshot_every)
+        return self._journals[game_id]
+
+    def game_ids(self) -> list:
+        found = [self._FILENAME.match(name) for name in os.listdir(self._directory)]
+        return sorted({int(match.group(1) or match.group(2)) for match in found if match})
+
+    def load_players(self, game_id: int):
+        journal = self._journal(game_id)
+        if not journal.exists:
+            return None
+        return journal.load_players()
+
+    def load_history(self, game_id: int) -> list:
+        return self._journal(game_id).load_history()
+
+    def load_history_range(self, game_id: int, start: int, stop: int) -> list:
+        return self._journal(game_id).load_history(start, stop)
+
+    def load_meta(self, game_id: int):
+        return self._journal(game_id).load_meta()
+
+    def load_round_params(self, game_id: int) -> list:
+        return self._journal(game_id).load_round_params()
+
+    def round_count(self, game_id: int) -> int:
+        return self._journal(game_id).round_count
+
+    def save_round(self, game_id: int, players, changed: list, latest_events: list,
+                   roster_replaced: bool = False, params: dict = None, meta: dict = None) -> None:
+        journal = self._journal(game_id)
+        if meta is not None:
+            journal.write_meta(meta)
+        if roster_replaced:
+            journal.write_snapshot(players())
+        journal.append_round(players, changed, latest_events if self.keeps_history else [], params)
+
+    def import_game(self, game_id: int, players: list, history: list, round_params: list = None,
+                    meta: dict = None) -> None:
+        # The files of a game saved before with the same id are replaced
+        # The history is journaled first, the final roster is then snapshotted after the last round
+        self._journals.pop(game_id, None)
+        journal = self._journal(game_id)
+        journal.delete()
+        if meta is not None:
+            journal.write_meta(meta)
+        round_params = round_params if round_params is not None else [None] * len(history)
+        for latest_events, params in zip(history, round_params):
+            journal.append_round(lambda: players, [], latest_events if self.keeps_history else [], params)
+        journal.write_snapshot(players)
+
+    def release(self, game_id: int) -> None:
+        self._journals.pop(game_id, None)
+
+
+class SQLiteGameStore(GameStore):
+    """
+    SQLite storage for many concurrent games in a single database file
+    Tables:
+    - games:..............one row per game with the number of the latest round
+    - tributes:...........one row per tribute with its position in the roster, indexed by (game_id, position)
+    - rounds:.............one row per round with the number of its events and its params (json)
+    - meta:...............replay data of every game (json)
+    - events:.............one row per rendered event, keyed by (game_id, round, position)
+
+    Every round is written in a single transaction: the changed tributes are upserted and the round events inserted.
+    Nothing else of the game is read or written, so the cost of a save doesn't grow with the game length.
+    The connection can be used from any thread (e.g. the thread pool of async_runner.py), a lock serializes the access.
+    """
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS games (
+            id INTEGER PRIMARY KEY,
+            rounds INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE TABLE IF NOT EXISTS tributes (
+            game_id INTEGER NOT NULL,
+            id INTEGER NOT NULL,
+            name TEXT NOT NULL,
+            district TEXT NOT NULL,
+            hp INTEGER NOT NULL,
+            alive INTEGER NOT NULL,
+            position INTEGER NOT NULL,
+            PRIMARY KEY (game_id, id)
+        );
+        CREATE INDEX IF NOT EXISTS tributes_position ON tributes (game_id, position);
+        CREATE TABLE IF NOT EXISTS rounds (
+            game_id INTEGER NOT NULL,
+            round INTEGER NOT NULL,
+            events INTEGER NOT NULL,
+            params TEXT,
+            PRIMARY KEY (game_id, round)
+        );
+        CREATE TABLE IF NOT EXISTS meta (
+            game_id INTEGER PRIMARY KEY,
+            data TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS events (
+            game_id INTEGER NOT NULL,
+            round INTEGER NOT NULL,
+            position INTEGER NOT NULL,
+            description TEXT NOT NULL,
+            PRIMARY KEY (game_id, round, position)
+        );
+    """
+
+    def __init__(self, path: str = "./hunger_games_files/games.sqlite3", keep_history: bool = True) -> None:
+        self.keeps_history = keep_history
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.RLock()
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(self._SCHEMA)
+
+    @staticmethod
+    def _tribute_row(game_id: int, tribute: dict) -> tuple:
+        return (game_id, int(tribute["id"]), str(tribute["name"]), str(tribute["district"]), int(tribute["hp"]),
+                int(bool(tribute["alive"])))
+
+    # Internal function to write a whole roster, the tributes keep their position in the list
+    def _insert_roster(self, game_id: int, players: list) -> None:
+        self._connection.executemany(
+            "INSERT INTO tributes (game_id, id, name, district, hp, alive, position) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [self._tribute_row(game_id, tribute) + (position,) for position, tribute in enumerate(players)]
+        )
+
+    @staticmethod
+    def _tribute_dict(row: tuple) -> dict:
+        return {"id": row[0], "name": row[1], "district": row[2], "hp": row[3], "alive": bool(row[4])}
+
+    def _rounds(self, game_id: int):
+        row = self._connection.execute("SELECT rounds FROM games WHERE id = ?", (game_id,)).fetchone()
+        return None if row is None else row[0]
+
+    # Internal function to group the event rows of a query by round
+    @staticmethod
+    def _group_rounds(rows, first_round: int, last_round: int) -> list:
+        history = [[] for _ in range(last_round - first_round + 1)]
+        for round_number, description in rows:
+            history[round_number - first_round].append(description)
+        return history
+
+    def game_ids(self) -> list:
+        with self._lock:
+            return [row[0] for row in self._connection.execute("SELECT id FROM games ORDER BY id")]
+
+    def load_players(self, game_id: int):
+        with self._lock:
+            if self._rounds(game_id) is None:
+                return None
+            # The roster order is the one of the game, the alive pool and the replays are built in this order
+            return [self._tribute_dict(row) for row in self._connection.execute(
+                "SELECT id, name, district, hp, alive FROM tributes WHERE game_id = ? ORDER BY position", (game_id,)
+            )]
+
+    def load_history(self, game_id: int) -> list:
+        with self._lock:
+            return self.load_rounds(game_id, 1, self._rounds(game_id) or 0)
+
+    def load_history_range(self, game_id: int, start: int, stop: int) -> list:
+        return self.load_rounds(game_id, start + 1, stop)
+
+    # Returns the rendered events of the rounds from first_round to last_round (both included, rounds start from 1)
+    def load_rounds(self, game_id: int, first_round: int, last_round: int) -> list:
+        if last_round < first_round:
+            return []
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT round, description FROM events WHERE game_id = ? AND round BETWEEN ? AND ? "
+                "ORDER BY round, position",
+                (game_id, first_round, last_round)
+            )
+            return self._group_rounds(rows, first_round, last_round)
+
+    def load_meta(self, game_id: int):
+        with self._lock:
+            row = self._connection.execute("SELECT data FROM meta WHERE game_id = ?", (game_id,)).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def load_round_params(self, game_id: int) -> list:
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT params FROM rounds WHERE game_id = ? ORDER BY round", (game_id,)
+            ).fetchall()
+        return [None if params is None else json.loads(params) for params, in rows]
+
+    def round_count(self, game_id: int) -> int:
+        with self._lock:
+            return self._rounds(game_id) or 0
+
+    def save_round(self, game_id: int, players, changed: list, latest_events: list,
+                   roster_replaced: bool = False, params: dict = None, meta: dict = None) -> None:
+        with self._lock, self._connection:
+            if meta is not None:
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO meta (game_id, data) VALUES (?, ?)", (game_id, json.dumps(meta))
+                )
+
+            rounds = self._rounds(game_id)
+            if rounds is None:
+                rounds = 0
+                self._connection.execute("INSERT INTO games (id, rounds) VALUES (?, 0)", (game_id,))
+                roster_replaced = True
+
+            if roster_replaced:
+                self._connection.execute("DELETE FROM tributes WHERE game_id = ?", (game_id,))
+                self._insert_roster(game_id, players())
+            else:
+                # The changed tributes keep their position, the enrolled ones are added at the end of the roster
+                self._connection.executemany(
+                    "INSERT INTO tributes (game_id, id, name, district, hp, alive, position) VALUES (?, ?, ?, ?, ?, ?, "
+                    "(SELECT COALESCE(MAX(position), -1) + 1 FROM tributes WHERE game_id = ?)) "
+                    "ON CONFLICT (game_id, id) DO UPDATE SET name = excluded.name, district = excluded.district, "
+                    "hp = excluded.hp, alive = excluded.alive",
+                    [self._tribute_row(game_id, tribute) + (game_id,) for tribute in changed]
+                )
+
+            self._connection.execute(
+                "INSERT INTO rounds (game_id, round, events, params) VALUES (?, ?, ?, ?)",
+                (game_id, rounds + 1, len(latest_events), None if params is None else json.dumps(params))
+            )
+            if self.keeps_history:
+                self._connection.executemany(
+                    "INSERT INTO events (game_id, round, position, description) VALUES (?, ?, ?, ?)",
+                    [(game_id, rounds + 1, position, event) for position, event in enumerate(latest_events)]
+                )
+            self._connection.execute("UPDATE games SET rounds = ? WHERE id = ?", (rounds + 1, game_id))
+
+    def import_game(self, game_id: int, players: list, history: list, round_params: list = None,
+                    meta: dict = None) -> None:
+        round_params = round_params if round_params is not None else [None] * len(history)
+        with self._lock, self._connection:
+            for table, column in (("events", "game_id"), ("rounds", "game_id"), ("tributes", "game_id"),
+                                  ("meta", "game_id"), ("games", "id")):
+                self._connection.execute(f"DELETE FROM {table} WHERE {column} = ?", (game_id,))
+            self._connection.execute("INSERT INTO games (id, rounds) VALUES (?, ?)", (game_id, len(history)))
+            if meta is not None:
+                self._connection.execute("INSERT INTO meta (game_id, data) VALUES (?, ?)", (game_id, json.dumps(meta)))
+            self._insert_roster(game_id, players)
+            self._connection.executemany(
+                "INSERT INTO rounds (game_id, round, events, params) VALUES (?, ?, ?, ?)",
+                [(game_id, round_number, len(events), None if params is None else json.dumps(params))
+                 for round_number, (events, params) in enumerate(zip(history, round_params), start=1)]
+            )
+            if self.keeps_history:
+                self._connection.executemany(
+                    "INSERT INTO events (game_id, round, position, description) VALUES (?, ?, ?, ?)",
+                    [(game_id, round_number, position, event)
+                     for round_number, events in enumerate(history, start=1)
+                     for position, event in enumerate(events)]
+                )
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+
+class WriteBehindGameStore(GameStore):
+    """
+    Store wrapper that keeps the saved rounds in memory and writes them to the wrapped store only when flushed
+    - store:..............the store the rounds are written to
+    - journal_directory:..directory of the pending rounds journals (None: the buffered rounds are only kept in memory)
+
+    A flush writes all the buffered rounds of a game with a single save_rounds() call of the wrapped store.
+    Loading anything of a game flushes it first, so the loaded data always includes the buffered rounds.
+
+    With a journal_directory every buffered round is also appended to pending_{id}.jsonl (one JSON line, a single
+    write) before save_round() returns, the file is removed when the rounds are flushed. If the process dies, the
+    pending journals found by the next WriteBehindGameStore are written to the wrapped store when it's created: every
+    line has the number of its round, so the rounds already flushed are never saved twice.
+    !! Without a journal_directory the buffered rounds are lost if the process dies before they are flushed (the saved
+    game stays consistent, it just goes back to the latest flushed round) !!
+    """
+
+    _PENDING = re.compile(r"pending_(-?\d+)\.jsonl$")
+
+    def __init__(self, store: GameStore, journal_directory: str = None) -> None:
+        self._store = store
+        self.keeps_history = store.keeps_history
+        # game_id -> {"players": roster function, "rounds": [buffered rounds], "since": time of the oldest round,
+        # "first round": number of the first buffered round}
+        self._pending = {}
+        self._lock = threading.RLock()
+        self.flushes = 0
+        self._journal_directory = journal_directory
+        if journal_directory is not None:
+            os.makedirs(journal_directory, exist_ok=True)
+            self._recover()
+
+    @property
+    def store(self):
+        return self._store
+
+    def pending_rounds(self, game_id: int = None) -> int:
+        with self._lock:
+            if game_id is not None:
+                return len(self._pending[game_id]["rounds"]) if game_id in self._pending else 0
+            return sum(len(pending["rounds"]) for pending in self._pending.values())
+
+    # Monotonic time of the oldest buffered round of the game, None if nothing is buffered
+    def pending_since(self, game_id: int):
+        with self._lock:
+            pending = self._pending.get(game_id)
+            return None if pending is None else pending["since"]
+
+    def pending_games(self) -> list:
+        with self._lock:
+            return list(self._pending)
+
+    def flush(self, game_id: int = None) -> None:
+        """Writes the buffered rounds of the game (of every game if None) to the wrapped store"""
+        with self._lock:
+            for flushed_id in ([game_id] if game_id is not None else list(self._pending)):
+                pending = self._pending.pop(flushed_id, None)
+                if pending is None:
+                    continue
+                try:
+                    self._store.save_rounds(flushed_id, pending["players"], pending["rounds"])
+                except Exception:
+                    # Kept for the next flush
+                    self._pending[flushed_id] = pending
+                    raise
+                self._remove_pending(flushed_id)
+                self.flushes += 1
+
+    def save_round(self, game_id: int, players, changed: list, latest_events: list,
+                   roster_replaced: bool = False, params: dict = None, meta: dict = None) -> None:
+        with self._lock:
+            if game_id not in self._pending:
+                first_round = self._store.round_count(game_id) if self._journal_directory is not None else None
+                self._pending[game_id] = {"players": players, "rounds": [], "since": time.monotonic(),
+                                          "first round": first_round}
+            pending = self._pending[game_id]
+            saved = {"changed": changed, "latest_events": latest_events, "roster_replaced": roster_replaced,
+                     "params": params, "meta": meta}
+            if self._journal_directory is not None:
+                self._append_pending(game_id, saved, pending["first round"] + len(pending["rounds"]), players)
+            pending["players"] = players
+            pending["rounds"].append(saved)
+
+    # PENDING ROUNDS JOURNAL
+    def _pending_path(self, game_id: int) -> str:
+        return os.path.join(self._journal_directory, f"pending_{game_id}.jsonl")
+
+    # Internal function to append a buffered round to the pending journal of the game, the whole roster is written
+    # with the rounds that replace it
+    def _append_pending(self, game_id: int, saved: dict, round_number: int, players) -> None:
+        line = dict(saved, round=round_number)
+        if saved["roster_replaced"]:
+            line["players"] = players()
+        with open(self._pending_path(game_id), mode="ab") as file:
+            file.write(json.dumps(line, separators=(",", ":")).encode() + b"\n")
+
+    def _remove_pending(self, game_id: int) -> None:
+        if self._journal_directory is None:
+            return
+        try:
+            os.remove(self._pending_path(game_id))
+        except FileNotFoundError:
+            pass
+
+    # Internal function to write the pending journals left by a process that died before flushing them
+    # The roster is the one of the wrapped store with the tributes changed by the pending rounds
+    def _recover(self) -> None:
+        for name in os.listdir(self._journal_directory):
+            match = self._PENDING.match(name)
+            if match is None:
+                continue
+            game_id = int(match.group(1))
+            rounds = []
+            with open(self._pending_path(game_id), mode="rb") as file:
+                for line in file:
+                    # A line cut by the crash, its round was never acknowledged
+                    if not line.endswith(b"\n"):
+                        break
+                    rounds.append(json.loads(line))
+
+            saved_rounds = self._store.round_count(game_id)
+            rounds = [saved for saved in rounds if saved.pop("round") >= saved_rounds]
+            if rounds:
+                roster = {tribute["id"]: tribute for tribute in self._store.load_players(game_id) or []}
+                for saved in rounds:
+                    if "players" in saved:
+                        roster = {tribute["id"]: tribute for tribute in saved.pop("players")}
+                    for tribute in saved["changed"]:
+                        roster[tribute["id"]] = tribute
+                self._store.save_rounds(game_id, lambda: list(roster.values()), rounds)
+            self._remove_pending(game_id)
+
+    def game_ids(self) -> list:
+        with self._lock:
+            return sorted(set(self._store.game_ids()) | set(self._pending))
+
+    def load_players(self, game_id: int):
+        self.flush(game_id)
+        return self._store.load_players(game_id)
+
+    def load_history(self, game_id: int) -> list:
+        self.flush(game_id)
+        return self._store.load_history(game_id)
+
+    def load_history_range(self, game_id: int, start: int, stop: int) -> list:
+        self.flush(game_id)
+        return self._store.load_history_range(game_id, start, stop)
+
+    def load_meta(self, game_id: int):
+        self.flush(game_id)
+        return self._store.load_meta(game_id)
+
+    def load_round_params(self, game_id: int) -> list:
+        self.flush(game_id)
+        return self._store.load_round_params(game_id)
+
+    def round_count(self, game_id: int) -> int:
+        self.flush(game_id)
+        return self._store.round_count(game_id)
+
+    def import_game(self, game_id: int, players: list, history: list, round_params: list = None,
+                    meta: dict = None) -> None:
+        with self._lock:
+            self._pending.pop(game_id, None)
+            self._remove_pending(game_id)
+            self._store.import_game(game_id, players, history, round_params, meta)
+
+    def release(self, game_id: int) -> None:
+        self.flush(game_id)
+        self._store.release(game_id)
+
+    def close(self) -> None:
+        self.flush()
+        self._store.close()
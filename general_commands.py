@@ -2,6 +2,7 @@ import random
 import time
 import discord
 from discord.ext import commands
+from ping_telemetry import PingTelemetry
 
 
 # SLAP CONVERTER
@@ -18,53 +19,20 @@ class General(commands.Cog, name="General"):
     """
     def __init__(self, bot):
         self.bot = bot
+        self.ping_telemetry = PingTelemetry(path="./files/ping_stats.json")
+
+    # Telemetry background task (websocket latency samples and flushes to disk)
+    async def cog_load(self):
+        self.ping_telemetry.start(self.bot)
+
+    async def cog_unload(self):
+        await self.ping_telemetry.stop()
 
     # Private class functions
     @staticmethod
     def _get_flip():
         return random.randint(0, 1)
 
-    @staticmethod
-    def _get_average_ping(current_ping: int) -> float:
-        """Keeps the ping log table up to date with the latest ping result and return the average scored ping"""
-        def average(nums: list) -> float:
-            num_sum = 0
-            nums_len = len(nums)
-            for num in nums:
-                num_sum += int(num)
-            return float(num_sum / nums_len)
-
-        # This is just to prevent a FileNotFound error
-        try:
-            with open("./files/ping_list.txt", mode="r"):
-                pass
-        except FileNotFoundError:
-            with open("./files/ping_list.txt", mode="w"):
-                pass
-        finally:
-            # Gets the last ping results and puts them in a list
-            with open("./files/ping_list.txt", mode="r") as file:
-                ping_lists = []
-                for line in file:
-                    stripped_line = line.strip()
-                    ping_lists.append(stripped_line)
-
-                ping_lists.append(current_ping)
-
-                result = round(average(ping_lists), 2)
-
-                # Keep only the last 30 ping results to prevent an endless log file
-                ping_lists = ping_lists[-20:]
-
-            # Put these results back into the log file
-            with open("./files/ping_list.txt", mode="w") as file:
-                to_log = ""
-                for log in ping_lists:
-                    to_log += f"{log}\n"
-                file.write(to_log)
-
-            return result
-
     # %flipcoin command
     @commands.hybrid_command(
         name="flipcoin",
@@ -93,8 +61,12 @@ class General(commands.Cog, name="General"):
         before = time.monotonic()
         await ctx.send("**Pinging...**")
         ping = (time.monotonic() - before) * 1000
+        self.ping_telemetry.record("command", ping)
+        self.ping_telemetry.record_websocket(self.bot)
+        stats = self.ping_telemetry.series["command"].stats
         await ctx.send(
-            content=f":ice_cube: **Sascia! Ping is {int(ping)}ms (average ping is {self._get_average_ping(int(ping))})** :ice_cube:")
+            content=f":ice_cube: **Sascia! Ping is {int(ping)}ms (average ping is {stats['mean']}, "
+                    f"p95 {stats['p95']})** :ice_cube:")
 
     # %clear command
     @commands.hybrid_command(
@@ -184,3 +156,8 @@ class General(commands.Cog, name="General"):
     )
     async def slap(self, ctx, *, argument: Slap):
         await ctx.send(argument)
+
+
+# Extension entry point, called by bot.load_extension()
+async def setup(bot):
+    await bot.add_cog(General(bot))
@@ -36,8 +36,85 @@ class Help(commands.Cog):
     Sends this help message
     """
 
+    # Variables to make the cog functional
+    prefix = "%"
+    version = "1.0"
+    # Setting owner name
+    owner_name = "eazyclap#1202"
+
     def __init__(self, bot):
         self.bot = bot
+        # Help embeds, built once and kept until a cog is added or removed
+        # None -> modules embed (without the "About" field, it depends on the server)
+        # lowercased cog name -> embed of the cog commands
+        self._embeds = None
+
+    # Cache invalidation, the cog_add and cog_remove events are dispatched by bot.HungerGamesBot
+    @commands.Cog.listener()
+    async def on_cog_add(self, cog):
+        self._embeds = None
+
+    @commands.Cog.listener()
+    async def on_cog_remove(self, cog):
+        self._embeds = None
+
+    def _build_embeds(self) -> dict:
+        embeds = {}
+
+        # Starting to build embed
+        emb = discord.Embed(title='Modules', color=discord.Color.blue(),
+                            description=f'Use `{self.prefix}help <module>` or `/help <module>` to gain more information '
+                                        f'about that module :ice_cube:\n')
+
+        # Gathering cogs descriptions
+        cogs_desc = "".join(f'`{name}` {cog.__doc__}\n' for name, cog in self.bot.cogs.items())
+        emb.add_field(name='Modules', value=cogs_desc, inline=False)
+
+        # Listing commands not associated with a cog (and not hidden)
+        commands_desc = "".join(
+            f'{command.name} - {command.help}\n'
+            for command in self.bot.walk_commands() if not command.cog_name and not command.hidden
+        )
+        if commands_desc:
+            emb.add_field(name='Not belonging to a module', value=commands_desc, inline=False)
+        emb.set_footer(text=f"Bot is running {self.version}")
+        embeds[None] = emb
+
+        # One embed per cog - getting description from doc-string below class
+        for name, cog in self.bot.cogs.items():
+            emb = discord.Embed(title=f'{name} - Commands', description=cog.__doc__, color=discord.Color.green())
+            for command in cog.get_commands():
+                if not command.hidden:
+                    emb.add_field(name=f"`{self.prefix}{command.name}`", value=command.help, inline=False)
+            # Two cogs with the same lowercased name: the first one is kept
+            embeds.setdefault(name.lower(), emb)
+
+        return embeds
+
+    def get_embed(self, module: str = None, owner: str = None) -> discord.Embed:
+        """Returns the help embed of the module (all the modules if None), built from the cached embeds"""
+        if self._embeds is None:
+            self._embeds = self._build_embeds()
+
+        if module is None:
+            # Only the field about the maintainer changes between servers
+            # (Embed.copy() shares the fields list with the cached embed, a new list is given to the new embed)
+            data = self._embeds[None].to_dict()
+            data["fields"] = data.get("fields", []) + [{
+                "name": "About",
+                "value": f"This embed was originally developed by Chriѕ#0001, based on discord.py.\n\
+                                    This version of it is maintained by {owner or self.owner_name}\n",
+                "inline": True
+            }]
+            return discord.Embed.from_dict(data)
+
+        emb = self._embeds.get(module.lower())
+        if emb is None:
+            # If input not found
+            emb = discord.Embed(title="What's that?!",
+                                description=f"I've never heard from a module called `{module}` before :scream:",
+                                color=discord.Color.orange())
+        return emb
 
     @commands.hybrid_command(
         name="help",
@@ -48,78 +125,17 @@ class Help(commands.Cog):
         """
         Shows all modules of that bot
         """
-
-        # Variables to make the cog functional
-        prefix = "%"
-        version = "1.0"
-
-        # Setting owner name
-        owner_name = "eazyclap#1202"
-
-        # Checks if cog parameter was given
-        # If not: sending all modules and commands not associated with a cog
+        owner = None
         if module is None:
             try:
                 owner = ctx.guild.owner.mention
-
             except AttributeError:
-                owner = owner_name
-
-            # Starting to build embed
-            emb = discord.Embed(title='Modules', color=discord.Color.blue(),
-                                description=f'Use `{prefix}help <module>` or `/help <module>` to gain more information about that module '
-                                            f':ice_cube:\n')
-
-            # Iterating trough cogs, gathering descriptions
-            cogs_desc = ''
-            for cog in self.bot.cogs:
-                cogs_desc += f'`{cog}` {self.bot.cogs[cog].__doc__}\n'
-
-            # Adding 'list' of cogs to embed
-            emb.add_field(name='Modules', value=cogs_desc, inline=False)
-
-            # Integrating trough uncategorized commands
-            commands_desc = ''
-            for command in self.bot.walk_commands():
-                # If cog not in a cog
-                # Listing command if cog name is None and command isn't hidden
-                if not command.cog_name and not command.hidden:
-                    commands_desc += f'{command.name} - {command.help}\n'
-
-            # Adding those commands to embed
-            if commands_desc:
-                emb.add_field(name='Not belonging to a module', value=commands_desc, inline=False)
-
-            # Setting information about author
-            emb.add_field(name="About", value=f"This embed was originally developed by Chriѕ#0001, based on discord.py.\n\
-                                    This version of it is maintained by {owner}\n")
-            emb.set_footer(text=f"Bot is running {version}")
-
-        # Block called when one cog-name is given
-        # Trying to find matching cog and it's commands
-        else:
-            # Iterating trough cogs
-            for cog in self.bot.cogs:
-                # Check if cog is the matching one
-                if cog.lower() == module.lower():
-
-                    # Making title - getting description from doc-string below class
-                    emb = discord.Embed(title=f'{cog} - Commands', description=self.bot.cogs[cog].__doc__,
-                                        color=discord.Color.green())
-
-                    # Getting commands from cog
-                    for command in self.bot.get_cog(cog).get_commands():
-                        # If cog is not hidden
-                        if not command.hidden:
-                            emb.add_field(name=f"`{prefix}{command.name}`", value=command.help, inline=False)
-                    # Found cog - breaking loop
-                    break
-
-            # If input not found
-            else:
-                emb = discord.Embed(title="What's that?!",
-                                    description=f"I've never heard from a module called `{module}` before :scream:",
-                                    color=discord.Color.orange())
+                owner = self.owner_name
 
         # Sending reply embed using our own function defined above
-        await send_embed(ctx, emb)
+        await send_embed(ctx, self.get_embed(module, owner))
+
+
+# Extension entry point, called by bot.load_extension()
+async def setup(bot):
+    await bot.add_cog(Help(bot))
@@ -0,0 +1,89 @@
+"""
+Serialization layer of the game and events files
+Uses orjson when it's installed (several times faster than the json module) and falls back to the standard library
+otherwise, the output is the same with both.
+
+Formats of the written files:
+- indent:.............json.dump(indent=4), the original format (easy to read and edit by hand)
+- compact:............minified JSON, no whitespace
+- gzip:...............compact JSON compressed with gzip (smallest files, slower to write)
+
+The format of a file is detected when it's loaded, every loader reads all of them.
+"""
+
+import gzip
+import json
+import os
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+FORMATS = ("indent", "compact", "gzip")
+GZIP_MAGIC = b"\x1f\x8b"
+# Fast compression, the files are rewritten often
+GZIP_LEVEL = 1
+
+
+def dumps(value) -> str:
+    """Compact JSON text of the value"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(value).decode("utf-8")
+        except TypeError:
+            # Values orjson doesn't support (integers over 64 bit, non string keys...)
+            pass
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+
+
+def dumps_indent(value) -> str:
+    """JSON text of the value as json.dump(indent=4) writes it"""
+    return json.dumps(value, indent=4)
+
+
+def loads(content):
+    """Decodes JSON text (str or bytes), gzip compressed bytes are decompressed first"""
+    if isinstance(content, (bytes, bytearray, memoryview)) and bytes(content[:2]) == GZIP_MAGIC:
+        content = gzip.decompress(content)
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def detect_format(content: bytes) -> str:
+    """Format of the content of a file"""
+    if content[:2] == GZIP_MAGIC:
+        return "gzip"
+    # An indented file has a newline right after the opening bracket
+    return "indent" if content.lstrip()[1:2] in (b"\n", b"\r") else "compact"
+
+
+def encode(text: str, file_format: str) -> bytes:
+    """Bytes written to a file of the given format, text must be already encoded as indent or compact JSON"""
+    if file_format not in FORMATS:
+        raise ValueError(f"Unknown file format: {file_format}")
+    content = text.encode("utf-8")
+    return gzip.compress(content, compresslevel=GZIP_LEVEL, mtime=0) if file_format == "gzip" else content
+
+
+def read_file(path: str):
+    """Loads a JSON file of any format, raises FileNotFoundError if it doesn't exist"""
+    with open(path, mode="rb") as file:
+        return loads(file.read())
+
+
+def write_file(path: str, value, file_format: str = "compact") -> None:
+    """Writes the value to the file, to a temporary file renamed when it's complete (atomic)"""
+    text = dumps_indent(value) if file_format == "indent" else dumps(value)
+    write_bytes(path, encode(text, file_format))
+
+
+def write_bytes(path: str, content: bytes) -> None:
+    """Writes the content to the file, to a temporary file renamed when it's complete (atomic)"""
+    temporary_path = f"{path}.tmp"
+    with open(temporary_path, mode="wb") as file:
+        file.write(content)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temporary_path, path)
@@ -0,0 +1,92 @@
+"""
+Migration tool for the Game storage backends (check game_store.py)
+Copies every game found in the source store to the destination store: roster, full event history, round params and
+replay data (seed included), a migrated game replays exactly like the original one.
+Use --no-history for the games saved with keep_history=False: their history is rebuilt by replay, the destination
+doesn't save the rendered events either.
+The source files are never modified.
+With json as both source and destination the json files are rewritten in the --json-format format instead, the
+content is kept as it is.
+
+Usage (from the bot folder):
+python migrate_store.py --source json --destination sqlite
+python migrate_store.py --source journal --destination sqlite --database ./hunger_games_files/games.sqlite3
+python migrate_store.py --source json --destination json --json-format compact
+"""
+
+import argparse
+import json_codec
+from game_store import JsonGameStore, JournalGameStore, SQLiteGameStore
+
+
+def open_store(kind: str, directory: str, database: str, json_format: str = "compact", keep_history: bool = True):
+    if kind == "json":
+        return JsonGameStore(directory, keep_history=keep_history, file_format=json_format)
+    elif kind == "journal":
+        return JournalGameStore(directory, keep_history=keep_history)
+    elif kind == "sqlite":
+        return SQLiteGameStore(database, keep_history=keep_history)
+    raise ValueError(f"Unknown store: {kind}")
+
+
+def migrate(source, destination) -> list:
+    migrated = []
+    for game_id in source.game_ids():
+        players = source.load_players(game_id)
+        if players is None:
+            continue
+        round_params = source.load_round_params(game_id)
+        history = source.load_history(game_id)
+        # The stores that don't keep the history have no rendered events, every round is kept anyway
+        history += [[] for _ in range(len(round_params) - len(history))]
+        destination.import_game(game_id, players, history, round_params, source.load_meta(game_id))
+        migrated.append(game_id)
+    return migrated
+
+
+# Rewrites the json files of the games in another format
+def convert_json_files(directory: str, json_format: str) -> list:
+    store = JsonGameStore(directory)
+    converted = []
+    for game_id in store.game_ids():
+        path = store._path(game_id)
+        with open(path, mode="rb") as file:
+            content = file.read()
+        if json_codec.detect_format(content) == json_format:
+            continue
+        json_codec.write_file(path, json_codec.loads(content), json_format)
+        converted.append(game_id)
+    return converted
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Copy the saved games from a storage backend to another one")
+    parser.add_argument("--source", choices=["json", "journal", "sqlite"], default="json")
+    parser.add_argument("--destination", choices=["json", "journal", "sqlite"], default="sqlite")
+    parser.add_argument("--directory", default="./hunger_games_files", help="folder of the json and journal files")
+    parser.add_argument("--database", default="./hunger_games_files/games.sqlite3", help="SQLite database file")
+    parser.add_argument("--json-format", choices=json_codec.FORMATS, default="compact",
+                        help="format of the written json files")
+    parser.add_argument("--no-history", action="store_true",
+                        help="the games don't keep their history (saved with keep_history=False)")
+    arguments = parser.parse_args()
+
+    if arguments.source == arguments.destination == "json":
+        games = convert_json_files(arguments.directory, arguments.json_format)
+        print(f"Converted {len(games)} games to the {arguments.json_format} format: {games}")
+        raise SystemExit
+    if arguments.source == arguments.destination:
+        parser.error("source and destination stores must be different")
+
+    keep_history = not arguments.no_history
+    source_store = open_store(arguments.source, arguments.directory, arguments.database, arguments.json_format,
+                              keep_history)
+    destination_store = open_store(arguments.destination, arguments.directory, arguments.database,
+                                   arguments.json_format, keep_history)
+    try:
+        games = migrate(source_store, destination_store)
+    finally:
+        source_store.close()
+        destination_store.close()
+
+    print(f"Migrated {len(games)} games from {arguments.source} to {arguments.destination}: {games}")
@@ -0,0 +1,193 @@
+import asyncio
+import json
+import math
+import os
+from array import array
+from bisect import bisect_left, insort
+
+
+class PingSeries:
+    """
+    Fixed-size ring buffer of latency samples (milliseconds)
+    - size:...............number of samples kept, the oldest sample is overwritten when the buffer is full
+
+    Adding a sample updates a running sum and a sorted copy of the samples, so the mean is O(1) and the percentiles
+    are a single lookup in the sorted copy.
+    """
+
+    __slots__ = ("size", "_samples", "_sorted", "_next", "_sum", "total")
+
+    def __init__(self, size: int = 1000) -> None:
+        self.size = size
+        self._samples = array("d")
+        self._sorted = []
+        self._next = 0
+        self._sum = 0.0
+        # Samples added since the series has been created, overwritten ones included
+        self.total = 0
+
+    def __len__(self):
+        return len(self._samples)
+
+    def add(self, value: float) -> None:
+        value = float(value)
+        if len(self._samples) < self.size:
+            self._samples.append(value)
+        else:
+            oldest = self._samples[self._next]
+            self._sum -= oldest
+            del self._sorted[bisect_left(self._sorted, oldest)]
+            self._samples[self._next] = value
+        self._next = (self._next + 1) % self.size
+        self._sum += value
+        if not self._next:
+            # Recomputed once per lap of the buffer, so the rounding errors of the running sum don't pile up
+            self._sum = sum(self._samples)
+        insort(self._sorted, value)
+        self.total += 1
+
+    @property
+    def mean(self):
+        return self._sum / len(self._samples) if self._samples else 0.0
+
+    @property
+    def latest(self):
+        return self._samples[self._next - 1] if self._samples else 0.0
+
+    def percentile(self, percent: float) -> float:
+        """Nearest-rank percentile of the kept samples"""
+        if not self._sorted:
+            return 0.0
+        rank = math.ceil(percent / 100 * len(self._sorted))
+        return self._sorted[min(max(rank, 1), len(self._sorted)) - 1]
+
+    # Samples from the oldest to the newest
+    def samples(self) -> list:
+        if len(self._samples) < self.size:
+            return self._samples.tolist()
+        return self._samples[self._next:].tolist() + self._samples[:self._next].tolist()
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "samples": len(self._samples),
+            "latest": round(self.latest, 2),
+            "mean": round(self.mean, 2),
+            "p50": round(self.percentile(50), 2),
+            "p95": round(self.percentile(95), 2),
+            "p99": round(self.percentile(99), 2)
+        }
+
+
+class PingTelemetry:
+    """
+    Latency telemetry of the bot, kept in memory
+    - size:...............samples kept for every series
+    - path:...............JSON file the samples are flushed to (None: nothing is written to disk)
+    - flush_every:........seconds between two flushes
+    - sample_every:.......seconds between two samples of the websocket latency
+
+    Series:
+    - command:............round trip time of the ping command
+    - websocket:..........websocket heartbeat latency (bot.latency), sampled by the background task
+
+    The background task (start() / stop()) samples the websocket latency and flushes the samples to disk, the file is
+    written in a thread of the event loop executor and only when new samples have been added since the latest flush.
+    The samples of the file are loaded back when the telemetry is created.
+    """
+
+    def __init__(self, size: int = 1000, path: str = None, flush_every: float = 300, sample_every: float = 60) -> None:
+        self.size = size
+        self.path = path
+        self.flush_every = flush_every
+        self.sample_every = sample_every
+        self.series = {"command": PingSeries(size), "websocket": PingSeries(size)}
+        self._flushed = 0
+        self._task = None
+        if path is not None:
+            self.load()
+
+    def record(self, series: str, value: float) -> None:
+        if series not in self.series:
+            self.series[series] = PingSeries(self.size)
+        self.series[series].add(value)
+
+    def record_websocket(self, bot) -> None:
+        # bot.latency is nan/inf until the first heartbeat
+        latency = bot.latency
+        if math.isfinite(latency):
+            self.record("websocket", latency * 1000)
+
+    @property
+    def stats(self) -> dict:
+        return {name: series.stats for name, series in self.series.items()}
+
+    # Total of samples ever added, used to skip the flushes when nothing changed
+    def _added(self) -> int:
+        return sum(series.total for series in self.series.values())
+
+    def load(self) -> None:
+        try:
+            with open(self.path, mode="r") as file:
+                data = json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return
+        for name, samples in data.get("series", {}).items():
+            for value in samples:
+                self.record(name, value)
+        self._flushed = self._added()
+
+    # Copy of the samples to write, None if there's nothing new since the latest flush
+    def _snapshot(self):
+        added = self._added()
+        if self.path is None or added == self._flushed:
+            return None
+        return added, {"series": {name: series.samples() for name, series in self.series.items()}}
+
+    def flush(self) -> bool:
+        """Writes the samples to the file, returns False if there was nothing new to write"""
+        snapshot = self._snapshot()
+        if snapshot is None:
+            return False
+        self._write(*snapshot)
+        return True
+
+    # The snapshot is taken in the event loop, only the file is written in the executor
+    async def _flush_async(self) -> None:
+        snapshot = self._snapshot()
+        if snapshot is not None:
+            await asyncio.get_running_loop().run_in_executor(None, self._write, *snapshot)
+
+    def _write(self, added: int, data: dict) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temporary_path = f"{self.path}.tmp"
+        with open(temporary_path, mode="w") as file:
+            json.dump(data, file, separators=(",", ":"))
+        os.replace(temporary_path, self.path)
+        self._flushed = added
+
+    async def _run(self, bot) -> None:
+        loop = asyncio.get_running_loop()
+        last_flush = loop.time()
+        while True:
+            await asyncio.sleep(self.sample_every)
+            if bot is not None:
+                self.record_websocket(bot)
+            if loop.time() - last_flush >= self.flush_every:
+                await self._flush_async()
+                last_flush = loop.time()
+
+    def start(self, bot=None) -> None:
+        """Starts the background task, must be called from the event loop"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run(bot))
+
+    async def stop(self) -> None:
+        """Stops the background task and flushes the latest samples"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self._flush_async()
@@ -0,0 +1,71 @@
+"""
+Replay tool for saved games
+Rebuilds the full event history of a game from its seed, the roster saved when the game started (or when the roster
+was last imported) and the params of every round (check Game.replay_history()).
+Stores created with keep_history=False don't save the rendered events at all, the history is always rebuilt this way.
+
+Usage (from the bot folder):
+python replay.py 3 --events ./testing_files/events_test.json --store sqlite
+python replay.py 3 --events ./testing_files/events_test.json --against stored
+python replay.py 3 --events ./testing_files/events_test.json --engine classic --against batch
+
+--against stored.......compares the replay with the history saved in the store (regression check)
+--against <engine>.....compares the replay with a second replay played with another engine (A/B comparison)
+"""
+
+import argparse
+import json
+import time
+
+from core_classes import Game
+from migrate_store import open_store
+
+
+# Returns the number of the first round (starting from 1) that differs between two histories, None if they are equal
+def first_difference(history: list, other_history: list):
+    for round_number, (events, other_events) in enumerate(zip(history, other_history), start=1):
+        if events != other_events:
+            return round_number
+    if len(history) != len(other_history):
+        return min(len(history), len(other_history)) + 1
+    return None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild the event history of a saved game from its seed")
+    parser.add_argument("game_id", type=int)
+    parser.add_argument("--events", required=True, help="events json file used by the game")
+    parser.add_argument("--store", choices=["json", "journal", "sqlite"], default="json")
+    parser.add_argument("--directory", default="./hunger_games_files", help="folder of the json and journal files")
+    parser.add_argument("--database", default="./hunger_games_files/games.sqlite3", help="SQLite database file")
+    parser.add_argument("--engine", choices=["classic", "batch"], default=None,
+                        help="replay every round with this engine (default: the engine used by each round)")
+    parser.add_argument("--against", default=None, help="stored, classic or batch")
+    arguments = parser.parse_args()
+
+    store = open_store(arguments.store, arguments.directory, arguments.database)
+    game = Game(game_id=arguments.game_id, events_pool=arguments.events, store=store)
+
+    start = time.perf_counter()
+    history = game.replay_history(engine=arguments.engine)
+    replay_time = time.perf_counter() - start
+    print(f"Replayed {len(history)} rounds of game {game.id} (seed {game.seed}) in {replay_time * 1000:.2f}ms")
+
+    if arguments.against is None:
+        print(json.dumps(history, indent=4))
+    else:
+        start = time.perf_counter()
+        if arguments.against == "stored":
+            other_history = store.load_history(game.id)
+        else:
+            other_history = game.replay_history(engine=arguments.against)
+        other_time = time.perf_counter() - start
+        print(f"Loaded {arguments.against} history in {other_time * 1000:.2f}ms")
+
+        difference = first_difference(history, other_history)
+        if difference is None:
+            print("Histories are identical")
+        else:
+            print(f"Histories differ from round {difference}")
+
+    store.close()
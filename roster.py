@@ -0,0 +1,185 @@
+import sys
+from array import array
+
+
+class TributeView:
+    """
+    Lightweight view of a tribute stored in a TributeRoster
+    It has the same attributes of core_classes.Tribute (id, name, district, hp, alive), hp and alive can be changed: the
+    value is written into the roster buffers and the owner of the roster is told about the change (check
+    TributeRoster.owner), so the Game saves the tribute and updates its alive pool.
+    Two views of the same tribute of the same roster are equal, even if they are different objects.
+    """
+
+    __slots__ = ("_roster", "_index")
+
+    def __init__(self, roster, index: int) -> None:
+        self._roster = roster
+        self._index = index
+
+    # Position of the tribute in the roster
+    @property
+    def index(self):
+        return self._index
+
+    @property
+    def id(self):
+        return self._roster.ids[self._index]
+
+    @property
+    def name(self):
+        return self._roster.names[self._index]
+
+    @property
+    def district(self):
+        return self._roster.districts[self._index]
+
+    @property
+    def hp(self):
+        return self._roster.hp[self._index]
+
+    @hp.setter
+    def hp(self, value):
+        self._roster.set_hp(self._index, value)
+
+    @property
+    def alive(self):
+        return bool(self._roster.alive[self._index])
+
+    @alive.setter
+    def alive(self, value):
+        self._roster.set_alive(self._index, value)
+
+    def __eq__(self, other):
+        if isinstance(other, TributeView):
+            return self._roster is other._roster and self._index == other._index
+        return NotImplemented
+
+    def __hash__(self):
+        return hash((id(self._roster), self._index))
+
+    def __repr__(self):
+        return (f"Tribute(id={self.id!r}, name={self.name!r}, district={self.district!r}, hp={self.hp!r}, "
+                f"alive={self.alive!r})")
+
+
+class TributeList:
+    """
+    Lazy list of tributes of a TributeRoster, used for the participants of the events given back by the round engines
+    Only the roster indexes are stored, the TributeView objects are created when the list is indexed or iterated.
+    - indexes:............roster indexes of the tributes
+    - names:..............names of the tributes, read straight from the roster (no views are created)
+    """
+
+    __slots__ = ("_roster", "_indexes")
+
+    def __init__(self, roster, indexes: list) -> None:
+        self._roster = roster
+        self._indexes = indexes
+
+    @property
+    def indexes(self):
+        return self._indexes
+
+    @property
+    def names(self):
+        names = self._roster.names
+        return [names[index] for index in self._indexes]
+
+    def __len__(self):
+        return len(self._indexes)
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return TributeList(self._roster, self._indexes[position])
+        return TributeView(self._roster, self._indexes[position])
+
+    def __iter__(self):
+        for index in self._indexes:
+            yield TributeView(self._roster, index)
+
+    def __eq__(self, other):
+        if isinstance(other, (TributeList, list)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self):
+        return repr(list(self))
+
+
+class TributeRoster:
+    """
+    Struct-of-arrays roster of tributes, used by the Game class instead of a list of Tribute objects
+    - ids:................array of signed 64 bit integers
+    - hp:.................array of doubles
+    - alive:..............bytearray, one byte per tribute (0 dead, 1 alive)
+    - names:..............list of interned strings
+    - districts:..........list of interned strings (tributes of the same district share the same string)
+
+    The numeric buffers support the buffer protocol, so NumPy can work on them without copies (check batch_engine.py).
+    !! A buffer exported to NumPy can't be resized, drop the NumPy arrays before appending tributes !!
+
+    The roster behaves like a list of tributes: indexing, slicing and iterating return TributeView objects.
+
+    owner -> object told about the changes made through the views, with owner._tribute_changed(index, alive) (alive is
+    None if only the hp changed). The Game sets itself as the owner of its roster; the round engines write the buffers
+    directly and keep the game up to date by themselves. The owner is not pickled with the roster.
+    """
+
+    __slots__ = ("ids", "hp", "alive", "names", "districts", "owner")
+
+    def __init__(self) -> None:
+        self.ids = array("q")
+        self.hp = array("d")
+        self.alive = bytearray()
+        self.names = []
+        self.districts = []
+        self.owner = None
+
+    # The rosters are sent to the worker processes without their owner (check async_runner.py)
+    def __getstate__(self):
+        return self.ids, self.hp, self.alive, self.names, self.districts
+
+    def __setstate__(self, state):
+        self.ids, self.hp, self.alive, self.names, self.districts = state
+        self.owner = None
+
+    def set_hp(self, index: int, value) -> None:
+        self.hp[index] = value
+        if self.owner is not None:
+            self.owner._tribute_changed(index, None)
+
+    def set_alive(self, index: int, value) -> None:
+        self.alive[index] = bool(value)
+        if self.owner is not None:
+            self.owner._tribute_changed(index, bool(value))
+
+    def append(self, tribute) -> TributeView:
+        return self.add(tribute.id, tribute.name, tribute.district, tribute.hp, tribute.alive)
+
+    def add(self, tribute_id: int, name: str, district: str, hp: float = 100, alive: bool = True) -> TributeView:
+        self.ids.append(int(tribute_id))
+        self.hp.append(hp)
+        self.alive.append(bool(alive))
+        self.names.append(sys.intern(str(name)))
+        self.districts.append(sys.intern(str(district)))
+        return TributeView(self, len(self.ids) - 1)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [TributeView(self, position) for position in range(*index.indices(len(self.ids)))]
+        if index < 0:
+            index += len(self.ids)
+        if not 0 <= index < len(self.ids):
+            raise IndexError("roster index out of range")
+        return TributeView(self, index)
+
+    def __iter__(self):
+        for index in range(len(self.ids)):
+            yield TributeView(self, index)
+
+    def __repr__(self):
+        return f"TributeRoster({len(self)} tributes)"
@@ -0,0 +1,82 @@
+class RoundProfiler:
+    """
+    Opt-in instrumentation of the Game rounds (check Game.enable_profiling())
+    Nothing is measured while the profiler is not attached to a game, the game runs its normal code path.
+
+    Timings (seconds, summed over every round):
+    - event selection:........drawing the events from the sampler
+    - participant sampling:...drawing the tributes of the events
+    - damage:.................applying the damage and removing the dead tributes from the alive pool
+    - batch engine:...........whole rounds played by the batch engine (selection, sampling and damage in bulk)
+    - rendering:..............rendering the event descriptions
+    - persistence:............saving the rounds (Game.save_players_stats())
+
+    Counters:
+    - rounds:.................rounds played
+    - draws:..................event draws, split by outcome: executed, discarded (probability check failed) and
+    ..........................no players (the event needs more tributes than the alive ones)
+    - saves:..................rounds saved
+
+    The same profiler can be attached to many games, the totals are then shared.
+    """
+
+    PHASES = ("event selection", "participant sampling", "damage", "batch engine", "rendering", "persistence")
+    OUTCOMES = ("executed", "discarded", "no players")
+
+    __slots__ = ("timings", "draws", "rounds", "saves")
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        self.timings = dict.fromkeys(self.PHASES, 0.0)
+        self.draws = dict.fromkeys(self.OUTCOMES, 0)
+        self.rounds = 0
+        self.saves = 0
+
+    def add_time(self, phase: str, seconds: float) -> None:
+        self.timings[phase] += seconds
+
+    def count_draw(self, outcome: str, amount: int = 1) -> None:
+        self.draws[outcome] += amount
+
+    def as_dict(self) -> dict:
+        return {
+            "timings": dict(self.timings),
+            "draws": dict(self.draws),
+            "rounds": self.rounds,
+            "saves": self.saves
+        }
+
+    def to_prometheus(self, prefix: str = "hunger_games", labels: dict = None) -> str:
+        """Returns the stats in the Prometheus text exposition format"""
+        def metric_labels(**extra) -> str:
+            merged = {**(labels or {}), **extra}
+            if not merged:
+                return ""
+            return "{" + ",".join(f'{key}="{value}"' for key, value in merged.items()) + "}"
+
+        lines = [
+            f"# HELP {prefix}_round_phase_seconds_total Time spent in each phase of the rounds",
+            f"# TYPE {prefix}_round_phase_seconds_total counter"
+        ]
+        for phase, seconds in self.timings.items():
+            lines.append(f"{prefix}_round_phase_seconds_total{metric_labels(phase=phase.replace(' ', '_'))} "
+                         f"{seconds:.9f}")
+
+        lines += [
+            f"# HELP {prefix}_event_draws_total Event draws by outcome",
+            f"# TYPE {prefix}_event_draws_total counter"
+        ]
+        for outcome, amount in self.draws.items():
+            lines.append(f"{prefix}_event_draws_total{metric_labels(outcome=outcome.replace(' ', '_'))} {amount}")
+
+        for name, value, description in (("rounds", self.rounds, "Rounds played"),
+                                          ("saves", self.saves, "Rounds saved")):
+            lines += [
+                f"# HELP {prefix}_{name}_total {description}",
+                f"# TYPE {prefix}_{name}_total counter",
+                f"{prefix}_{name}_total{metric_labels()} {value}"
+            ]
+
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,272 @@
+import asyncio
+import time
+from collections import deque
+
+import discord
+from discord.errors import Forbidden, HTTPException, RateLimited
+
+
+# Discord limits
+MESSAGE_LIMIT = 2000
+EMBED_TOTAL_LIMIT = 6000
+EMBED_FIELD_LIMIT = 1024
+EMBED_FIELDS = 25
+EMBEDS_PER_MESSAGE = 10
+
+
+class TokenBucket:
+    """
+    Token bucket rate limiter
+    - rate:...............tokens added every second
+    - capacity:...........maximum number of tokens, the size of a burst
+    acquire() waits until a token is available and takes it.
+    """
+
+    def __init__(self, rate: float, capacity: int) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self) -> float:
+        """Takes a token, returns the seconds waited for it"""
+        waited = 0.0
+        async with self._lock:
+            self._refill()
+            while self._tokens < 1:
+                delay = (1 - self._tokens) / self.rate
+                await asyncio.sleep(delay)
+                waited += delay
+                self._refill()
+            self._tokens -= 1
+        return waited
+
+    # Empties the bucket for the given seconds, used when Discord answers with a 429 anyway
+    def pause(self, seconds: float) -> None:
+        self._refill()
+        self._tokens = min(self._tokens, 0.0) - seconds * self.rate
+
+
+# Splits a text longer than the limit, on line breaks or spaces when possible
+def _split_text(text: str, limit: int) -> list:
+    chunks = []
+    while len(text) > limit:
+        cut = text.rfind("\n", 0, limit + 1)
+        if cut <= 0:
+            cut = text.rfind(" ", 0, limit + 1)
+        if cut <= 0:
+            cut = limit
+        chunks.append(text[:cut])
+        text = text[cut:].lstrip("\n ")
+    chunks.append(text)
+    return chunks
+
+
+def pack_messages(events: list, limit: int = MESSAGE_LIMIT) -> list:
+    """
+    Packs rendered events into as few messages as possible, one event per line
+    An event is never split between two messages, unless it's longer than a message by itself
+    """
+    messages = []
+    current = ""
+    for event in events:
+        for line in _split_text(event, limit):
+            if not current:
+                current = line
+            elif len(current) + 1 + len(line) <= limit:
+                current += "\n" + line
+            else:
+                messages.append(current)
+                current = line
+    if current:
+        messages.append(current)
+    return messages
+
+
+def pack_embeds(events: list, title: str = None, color: discord.Color = None) -> list:
+    """
+    Packs rendered events into embeds, one event per line of the embed fields
+    Returns a list of messages, each message is a list of up to 10 embeds
+    The limits of Discord are respected: 1024 characters per field, 25 fields per embed, 6000 characters for all the
+    embeds of a message (title and field names included)
+    """
+    field_name = "\u200b"
+    color = color or discord.Color.dark_red()
+
+    # Events -> fields
+    fields = []
+    for event in events:
+        for line in _split_text(event, EMBED_FIELD_LIMIT):
+            if fields and len(fields[-1]) + 1 + len(line) <= EMBED_FIELD_LIMIT:
+                fields[-1] += "\n" + line
+            else:
+                fields.append(line)
+
+    # Fields -> embeds -> messages
+    messages = []
+    embeds = []
+    embed = None
+    message_size = 0
+    for value in fields:
+        size = len(field_name) + len(value)
+        if embed is None or len(embed.fields) == EMBED_FIELDS or message_size + size > EMBED_TOTAL_LIMIT:
+            if embed is not None:
+                embeds.append(embed)
+            if len(embeds) == EMBEDS_PER_MESSAGE or (embeds and message_size + size > EMBED_TOTAL_LIMIT):
+                messages.append(embeds)
+                embeds = []
+                message_size = 0
+            # Only the first embed of the round has the title
+            embed_title = title if not messages and not embeds else None
+            embed = discord.Embed(title=embed_title, color=color)
+            message_size += len(embed_title or "")
+        embed.add_field(name=field_name, value=value, inline=False)
+        message_size += size
+    if embed is not None:
+        embeds.append(embed)
+    if embeds:
+        messages.append(embeds)
+    return messages
+
+
+class RoundPublisher:
+    """
+    Sends the output of a round to a channel with as few messages as possible
+    - rate:...............messages per second allowed in a channel
+    - burst:..............messages that can be sent at once in a channel
+    - max_retries:........attempts after a 429 response before giving up on a message
+    - use_embeds:.........pack the events into embeds instead of plain text messages
+
+    Every channel has its own token bucket, so a busy channel doesn't slow down the other ones.
+    When Discord answers with a 429 the bucket of the channel is paused for the "retry after" time and the message is
+    sent again.
+    If the bot can't send embeds in the channel the events are sent as plain text.
+
+    Metrics (check stats):
+    - messages:...........messages sent
+    - events:.............events published
+    - rate_limited:.......429 responses received
+    - retries:............messages sent again after a 429
+    - failed:.............messages given up after max_retries attempts
+    - throttled:..........seconds spent waiting for the token buckets
+    - latency:............average, 95th percentile and max send time of the latest messages (milliseconds)
+
+    Usage:
+    publisher = RoundPublisher()
+    await publisher.publish(ctx, game.execute_game(), title="Round 1")
+    """
+
+    def __init__(self, rate: float = 1.0, burst: int = 5, max_retries: int = 5, use_embeds: bool = True,
+                 latency_samples: int = 500) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.max_retries = max_retries
+        self.use_embeds = use_embeds
+        self._buckets = {}
+        self._latencies = deque(maxlen=latency_samples)
+        self.messages = 0
+        self.events = 0
+        self.rate_limited = 0
+        self.retries = 0
+        self.failed = 0
+        self.throttled = 0.0
+
+    def _bucket(self, channel) -> TokenBucket:
+        key = getattr(channel, "id", id(channel))
+        if key not in self._buckets:
+            self._buckets[key] = TokenBucket(self.rate, self.burst)
+        return self._buckets[key]
+
+    @property
+    def stats(self) -> dict:
+        latencies = sorted(self._latencies)
+        if latencies:
+            latency = {
+                "average": round(sum(latencies) / len(latencies) * 1000, 2),
+                "p95": round(latencies[min(int(len(latencies) * 0.95), len(latencies) - 1)] * 1000, 2),
+                "max": round(latencies[-1] * 1000, 2)
+            }
+        else:
+            latency = {"average": 0.0, "p95": 0.0, "max": 0.0}
+        return {
+            "messages": self.messages,
+            "events": self.events,
+            "rate_limited": self.rate_limited,
+            "retries": self.retries,
+            "failed": self.failed,
+            "throttled": round(self.throttled, 3),
+            "latency": latency
+        }
+
+    # Internal function to send a single message, waiting for the bucket and retrying on 429
+    async def _send(self, ctx, bucket: TokenBucket, **kwargs):
+        for attempt in range(self.max_retries + 1):
+            self.throttled += await bucket.acquire()
+            started = time.monotonic()
+            try:
+                message = await ctx.send(**kwargs)
+            except RateLimited as error:
+                retry_after = error.retry_after
+            except HTTPException as error:
+                if error.status != 429:
+                    raise
+                retry_after = self._retry_after(error, attempt)
+            else:
+                self._latencies.append(time.monotonic() - started)
+                self.messages += 1
+                return message
+
+            self.rate_limited += 1
+            if attempt == self.max_retries:
+                break
+            self.retries += 1
+            bucket.pause(retry_after)
+
+        self.failed += 1
+        raise RateLimited(retry_after)
+
+    @staticmethod
+    def _retry_after(error: HTTPException, attempt: int) -> float:
+        headers = getattr(getattr(error, "response", None), "headers", None) or {}
+        try:
+            return float(headers.get("Retry-After"))
+        except (TypeError, ValueError):
+            # No hint from Discord, exponential backoff
+            return 0.5 * 2 ** attempt
+
+    async def publish(self, ctx, events: list, title: str = None) -> list:
+        """
+        Publishes the events of a round in the channel of the context
+        - events:.............rendered events, or the list returned by Game.execute_game()
+        - title:..............title of the first embed (ignored for plain text messages)
+        Returns the sent messages
+        """
+        events = [event["event"] if isinstance(event, dict) else str(event) for event in events]
+        if not events:
+            return []
+        bucket = self._bucket(getattr(ctx, "channel", ctx))
+        sent = []
+
+        if self.use_embeds:
+            packed = pack_embeds(events, title)
+            try:
+                for embeds in packed:
+                    sent.append(await self._send(ctx, bucket, embeds=embeds))
+                self.events += len(events)
+                return sent
+            except Forbidden:
+                if sent:
+                    raise
+                # No permission to send embeds, falling back to plain text
+
+        for content in pack_messages(events):
+            sent.append(await self._send(ctx, bucket, content=content))
+        self.events += len(events)
+        return sent
+
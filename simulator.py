@@ -0,0 +1,179 @@
+"""
+Monte Carlo tournament simulator
+Plays N independent games from an events json and a players json until a winner is left (or everybody is dead) and
+aggregates the statistics useful to tune an events pool.
+Games live only in memory (NullGameStore), nothing is read from or written to hunger_games_files.
+
+Every game has its own seed, derived from the simulation seed and the number of the game, and the statistics are
+aggregated in game order: the results only depend on the seed, never on the number of workers.
+
+Usage (from the bot folder):
+python simulator.py ./testing_files/events_test.json ./testing_files/players_test.json --games 1000 --seed 42
+"""
+
+import argparse
+import json
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from statistics import mean, median
+
+import json_codec
+from core_classes import Game
+from game_store import NullGameStore
+
+# Per process data, loaded once by every worker
+_worker_setup = {}
+
+
+def _init_worker(events_path: str, players_path: str) -> None:
+    _worker_setup["players"] = json_codec.read_file(players_path)
+    _worker_setup["events"] = events_path
+
+
+# Seed of a single game, derived with a dedicated generator so that close seeds don't give related games
+def game_seed(seed: int, game_number: int) -> int:
+    return random.Random(f"{seed}:{game_number}").getrandbits(63)
+
+
+def play_game(game_number: int, seed: int, minimum_events: int, max_events: int, engine: str,
+              max_rounds: int) -> dict:
+    game = Game(game_id=game_number, events_pool=_worker_setup["events"], store=NullGameStore(),
+                seed=game_seed(seed, game_number))
+    game.import_players_from_json(_worker_setup["players"])
+
+    fired = [0] * len(game.events)
+    event_numbers = {id(event): number for number, event in enumerate(game.events)}
+    # Tributes already dead when the game starts survived 0 rounds
+    death_rounds = {player.index: 0 for player in game.players if not player.alive}
+    alive_curve = [game.alive_count]
+
+    rounds = 0
+    while game.alive_count > 1 and rounds < max_rounds:
+        rounds += 1
+        for event in game._play_round(minimum_events, max_events, engine):
+            fired[event_numbers[id(event["arena_event"])]] += 1
+            for player in event["passive"]:
+                if not player.alive and player.index not in death_rounds:
+                    death_rounds[player.index] = rounds
+        alive_curve.append(game.alive_count)
+
+    winner = game.alive_players[0] if game.alive_count == 1 else None
+    return {
+        "rounds": rounds,
+        "finished": game.alive_count <= 1,
+        "winner district": winner.district if winner else None,
+        "fired": fired,
+        "alive curve": alive_curve,
+        "survived rounds": [
+            (player.district, death_rounds.get(player.index, rounds)) for player in game.players
+        ],
+    }
+
+
+def _play_games(arguments) -> list:
+    game_numbers, seed, minimum_events, max_events, engine, max_rounds = arguments
+    return [play_game(number, seed, minimum_events, max_events, engine, max_rounds) for number in game_numbers]
+
+
+def aggregate(results: list, events: tuple) -> dict:
+    rounds = [result["rounds"] for result in results]
+    finished = [result for result in results if result["finished"]]
+    total_rounds = sum(rounds) or 1
+
+    distribution = {}
+    for result in finished:
+        distribution[result["rounds"]] = distribution.get(result["rounds"], 0) + 1
+
+    fired = [sum(result["fired"][number] for result in results) for number in range(len(events))]
+
+    wins = {}
+    survived = {}
+    for result in results:
+        if result["winner district"] is not None:
+            wins[result["winner district"]] = wins.get(result["winner district"], 0) + 1
+        for district, survived_rounds in result["survived rounds"]:
+            survived.setdefault(district, []).append(survived_rounds)
+
+    # Alive tributes per round, averaged over the games (finished games keep their final alive count)
+    longest = max((len(result["alive curve"]) for result in results), default=0)
+    alive_curve = [
+        mean(result["alive curve"][min(round_number, len(result["alive curve"]) - 1)] for result in results)
+        for round_number in range(longest)
+    ]
+
+    finished_rounds = [result["rounds"] for result in finished]
+    return {
+        "games": len(results),
+        "finished games": len(finished),
+        "rounds to winner": {
+            "mean": mean(finished_rounds) if finished_rounds else None,
+            "median": median(finished_rounds) if finished_rounds else None,
+            "min": min(finished_rounds, default=None),
+            "max": max(finished_rounds, default=None),
+            "distribution": dict(sorted(distribution.items())),
+        },
+        "event fire rates": [
+            {"description": event.description, "fired": count, "per round": count / total_rounds}
+            for event, count in zip(events, fired)
+        ],
+        "districts": {
+            district: {
+                "win rate": wins.get(district, 0) / len(results),
+                "mean survived rounds": mean(survived[district])
+            }
+            for district in sorted(survived)
+        },
+        "alive curve": alive_curve,
+    }
+
+
+def simulate(events_path: str, players_path: str, games: int = 100, seed: int = 0, workers: int = None,
+             minimum_events: int = 8, max_events: int = 12, engine: str = "classic", max_rounds: int = 10000) -> dict:
+    """
+    Plays the games on all the CPU cores (or on the given number of workers) and returns the aggregated statistics
+    - rounds to winner:...distribution of the rounds needed to have a winner (or no survivors)
+    - event fire rates:...times every event has been executed, in total and per round
+    - districts:..........win rate and average number of rounds survived by the tributes of every district
+    - alive curve:........average number of alive tributes after every round (death-rate curve)
+    """
+    workers = workers or os.cpu_count() or 1
+    chunk_size = max(1, games // (workers * 4))
+    chunks = [
+        (range(start, min(start + chunk_size, games)), seed, minimum_events, max_events, engine, max_rounds)
+        for start in range(0, games, chunk_size)
+    ]
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(events_path, players_path)) as executor:
+        results = [result for chunk in executor.map(_play_games, chunks) for result in chunk]
+
+    events = Game(events_pool=events_path, store=NullGameStore()).events
+    return aggregate(results, events)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Monte Carlo simulation of independent games")
+    parser.add_argument("events", help="events json file")
+    parser.add_argument("players", help="players json file")
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None, help="default: number of CPU cores")
+    parser.add_argument("--min-events", type=int, default=8)
+    parser.add_argument("--max-events", type=int, default=12)
+    parser.add_argument("--engine", choices=["classic", "batch"], default="classic")
+    parser.add_argument("--max-rounds", type=int, default=10000)
+    parser.add_argument("--output", default=None, help="json file for the statistics, printed if not given")
+    arguments = parser.parse_args()
+
+    statistics = simulate(
+        arguments.events, arguments.players, games=arguments.games, seed=arguments.seed, workers=arguments.workers,
+        minimum_events=arguments.min_events, max_events=arguments.max_events, engine=arguments.engine,
+        max_rounds=arguments.max_rounds
+    )
+
+    if arguments.output:
+        with open(arguments.output, mode="w") as file:
+            json.dump(statistics, file, indent=4)
+    else:
+        print(json.dumps(statistics, indent=4))